@@ -4,5 +4,31 @@ export YEAR_FROM=2024          # only fetch publications from 2024+
 export OUT_DIR=content/publication
 export SLEEP_BETWEEN_AUTHORS=8.0  # safer when using free proxies
 export DRY_RUN=0               # set 1 to test without writing files
+export MAX_RUNTIME=0           # wall-clock budget in seconds for the cron slot (0 = unlimited)
+CACHE_SNAPSHOT=""              # e.g. pub_cache.tar.gz: restored into CACHE_DIR before the run, refreshed after
+PDF_MIRROR=0                   # set 1 to mirror the PDFs into static/pdf and link bundles to the copies
+PUB_BIB=""                     # optional DBLP .bib file, merged with the Scholar records
 
-python scripts/scholar_IPs.py
\ No newline at end of file
+if [ -n "$CACHE_SNAPSHOT" ] && [ -f "$CACHE_SNAPSHOT" ]; then
+  python scripts/cache_snapshot.py import "$CACHE_SNAPSHOT" || echo "Snapshot not restored; starting with a cold cache"
+fi
+
+# (instead of running this from cron, `python scripts/scholar_IPs.py --daemon` stays resident,
+# refreshes every DAEMON_INTERVAL seconds and takes POST /refresh[?author=ID] on DAEMON_LISTEN;
+# it writes bundles itself, Scholar records only)
+if [ -n "$PUB_BIB" ]; then
+  # scholar_IPs.py only fills its cache; merge_sources.py dedups DBLP and Scholar records
+  # together and writes each paper once (unchanged bundles are left alone)
+  python scripts/scholar_IPs.py --fetch-only
+  python scripts/merge_sources.py --out "$OUT_DIR" --min_year "$YEAR_FROM" --bib "$PUB_BIB"
+else
+  python scripts/scholar_IPs.py
+fi
+
+if [ "$PDF_MIRROR" = "1" ] && [ "$DRY_RUN" != "1" ]; then
+  python scripts/pdf_mirror.py "$OUT_DIR"
+fi
+
+if [ -n "$CACHE_SNAPSHOT" ]; then
+  python scripts/cache_snapshot.py export "$CACHE_SNAPSHOT"
+fi
\ No newline at end of file
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Offline arXiv metadata: build a compact sorted index from the public arXiv metadata
+snapshot (arxiv-metadata-oai-snapshot.json, one JSON object per line, ~2.5M records)
+and look records up by arXiv id without touching the network.
+
+  python scripts/arxiv_index.py build arxiv-metadata-oai-snapshot.json ~/arxiv.idx
+  python scripts/arxiv_index.py get ~/arxiv.idx 2306.01234 hep-th/9901001v2
+
+The importers use it when ARXIV_INDEX points at a built file:
+  - scholar_IPs.py fills in the full author list (Scholar truncates long ones), the
+    exact v1 date and the journal-ref venue of arXiv-hosted records,
+  - post_google_scholar.py --rules default,arxiv_metadata sets date/publishDate and
+    the journal-ref venue of arXiv bundles.
+
+File layout (little-endian):
+  header   magic "ARXIDX1\\0", key width W, record count N
+  keys     N ids, each NUL-padded to W bytes, sorted bytewise
+  offsets  N uint64 record offsets, then N uint32 record lengths
+  records  compact JSON, one per id: title, authors, date, journal_ref, doi, categories
+The file is mmap'ed; get() is a binary search over the key block (O(log n), about 22
+probes for the full snapshot) plus one json.loads of the hit. Only the pages touched
+are read, so opening it is instant and N processes share one copy in the page cache.
+"""
+
+from __future__ import annotations
+import os
+import re
+import sys
+import json
+import mmap
+import array
+import struct
+import argparse
+import pathlib
+import tempfile
+from email.utils import parsedate
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+ARXIV_INDEX = os.environ.get("ARXIV_INDEX", "")  # path of a built index; empty = no enrichment
+
+MAGIC = b"ARXIDX1\0"
+_HEADER = struct.Struct("<8sII")
+_MONTHS = {m: i for i, m in enumerate(("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"), 1)}
+_ID_RE = re.compile(r"^(?:arxiv:\s*)?([a-z\-]+(?:\.[a-z]{2})?/\d{7}|\d{4}\.\d{4,5})(?:v\d+)?$", re.IGNORECASE)
+
+
+def normalize_id(arxiv_id: str) -> str:
+    """
+    'arXiv:2306.01234v2' -> '2306.01234'; old-style ids keep their archive, lowercased as
+    the snapshot spells it ('HEP-TH/9901001' -> 'hep-th/9901001').
+    """
+    m = _ID_RE.match((arxiv_id or "").strip())
+    if not m:
+        return ""
+    return m.group(1).lower()
+
+
+# ---------- build ----------
+
+def v1_date(versions: List[Dict[str, str]]) -> str:
+    """'Mon, 2 Apr 2007 19:18:42 GMT' of the first version -> '2007-04-02'."""
+    for v in versions or []:
+        if v.get("version") == "v1" and v.get("created"):
+            parts = v["created"].split()
+            if len(parts) >= 4 and parts[2] in _MONTHS and parts[1].isdigit() and parts[3].isdigit():
+                return f"{int(parts[3]):04d}-{_MONTHS[parts[2]]:02d}-{int(parts[1]):02d}"
+            t = parsedate(v["created"])  # not the snapshot's usual RFC 2822 layout
+            if t:
+                return f"{t[0]:04d}-{t[1]:02d}-{t[2]:02d}"
+    return ""
+
+
+def compact_record(obj: Dict) -> Dict:
+    """The fields the importers use, from one snapshot line."""
+    parsed = obj.get("authors_parsed") or []
+    if parsed:
+        authors = [" ".join(p for p in (a[1] if len(a) > 1 else "", a[0], a[2] if len(a) > 2 else "") if p)
+                   for a in parsed]
+    else:
+        authors = [a.strip() for a in re.split(r",\s*|\s+and\s+", obj.get("authors") or "") if a.strip()]
+    rec = {
+        "title": " ".join((obj.get("title") or "").split()),
+        "authors": authors,
+        "date": v1_date(obj.get("versions")),
+        "journal_ref": " ".join((obj.get("journal-ref") or "").split()),
+        "doi": (obj.get("doi") or "").strip(),
+        "categories": (obj.get("categories") or "").strip(),
+    }
+    return {k: v for k, v in rec.items() if v}
+
+
+def iter_snapshot(path: pathlib.Path) -> Iterator[Tuple[str, Dict]]:
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                obj = json.loads(line)
+            except ValueError:
+                continue  # a truncated download ends in half a line
+            aid = normalize_id(str(obj.get("id") or ""))
+            if aid:
+                yield aid, compact_record(obj)
+
+
+def build_index(records: Iterable[Tuple[str, Dict]], out: pathlib.Path) -> int:
+    """Write the index for (id, record) pairs; later duplicates win. Returns the record count."""
+    keys: List[bytes] = []
+    offs = array.array("Q")
+    lens = array.array("I")
+    where: Dict[bytes, int] = {}
+    out.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryFile(dir=out.parent) as blob:
+        pos = 0
+        for aid, rec in records:
+            data = json.dumps(rec, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            blob.write(data)
+            key = aid.encode("ascii")
+            i = where.get(key)
+            if i is None:
+                where[key] = len(keys)
+                keys.append(key)
+                offs.append(pos)
+                lens.append(len(data))
+            else:
+                offs[i], lens[i] = pos, len(data)
+            pos += len(data)
+        where.clear()
+
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        width = max((len(k) for k in keys), default=1)
+        tmp = out.with_name(out.name + ".tmp")
+        with tmp.open("wb") as f:
+            f.write(_HEADER.pack(MAGIC, width, len(keys)))
+            f.write(b"".join(keys[i].ljust(width, b"\0") for i in order))
+            array.array("Q", (offs[i] for i in order)).tofile(f)
+            array.array("I", (lens[i] for i in order)).tofile(f)
+            blob.seek(0)
+            while True:
+                chunk = blob.read(1 << 20)
+                if not chunk:
+                    break
+                f.write(chunk)
+        os.replace(tmp, out)
+    return len(keys)
+
+
+# ---------- lookup ----------
+
+class ArxivIndex:
+    def __init__(self, path: pathlib.Path):
+        self.path = pathlib.Path(path)
+        self._file = self.path.open("rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.width, self.count = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not an arXiv index")
+        self._keys = _HEADER.size
+        self._offs = self._keys + self.width * self.count
+        self._lens = self._offs + 8 * self.count
+        self._data = self._lens + 4 * self.count
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _find(self, key: bytes) -> int:
+        if len(key) > self.width:
+            return -1
+        key = key.ljust(self.width, b"\0")
+        mm, w, base = self._mm, self.width, self._keys
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            k = mm[base + mid * w: base + mid * w + w]
+            if k < key:
+                lo = mid + 1
+            elif k > key:
+                hi = mid
+            else:
+                return mid
+        return -1
+
+    def get(self, arxiv_id: str) -> Optional[Dict]:
+        """Record for an id in any of the usual spellings, or None."""
+        aid = normalize_id(arxiv_id)
+        if not aid:
+            return None
+        i = self._find(aid.encode("ascii"))
+        if i < 0:
+            return None
+        off = struct.unpack_from("<Q", self._mm, self._offs + 8 * i)[0]
+        n = struct.unpack_from("<I", self._mm, self._lens + 4 * i)[0]
+        start = self._data + off
+        return json.loads(self._mm[start:start + n])
+
+    def __contains__(self, arxiv_id: str) -> bool:
+        aid = normalize_id(arxiv_id)
+        return bool(aid) and self._find(aid.encode("ascii")) >= 0
+
+    def close(self):
+        self._mm.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+_OPENED: Dict[str, Optional[ArxivIndex]] = {}
+
+
+def identity() -> str:
+    """
+    Which index $ARXIV_INDEX is, for caches of results derived from it: path, size and
+    mtime (build_index replaces the file, so a rebuild changes them); "" when unset.
+    """
+    if not ARXIV_INDEX:
+        return ""
+    path = os.path.abspath(ARXIV_INDEX)
+    try:
+        st = os.stat(path)
+    except OSError:
+        return f"{path}:missing"
+    return f"{path}:{st.st_size}:{st.st_mtime_ns}"
+
+
+def open_default() -> Optional[ArxivIndex]:
+    """The index at $ARXIV_INDEX, opened once per process; None when unset or unreadable."""
+    if not ARXIV_INDEX:
+        return None
+    if ARXIV_INDEX not in _OPENED:
+        try:
+            _OPENED[ARXIV_INDEX] = ArxivIndex(pathlib.Path(ARXIV_INDEX))
+        except (OSError, ValueError) as e:
+            print(f"  warn: ARXIV_INDEX not usable ({e}); continuing without it")
+            _OPENED[ARXIV_INDEX] = None
+    return _OPENED[ARXIV_INDEX]
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = ap.add_subparsers(dest="command", required=True)
+    b = sub.add_parser("build", help="Snapshot JSON-lines -> index")
+    b.add_argument("snapshot", type=pathlib.Path)
+    b.add_argument("index", type=pathlib.Path)
+    g = sub.add_parser("get", help="Look ids up")
+    g.add_argument("index", type=pathlib.Path)
+    g.add_argument("ids", nargs="+")
+    args = ap.parse_args()
+
+    if args.command == "build":
+        n = build_index(iter_snapshot(args.snapshot), args.index)
+        print(f"Indexed {n} records into {args.index} ({args.index.stat().st_size / 1e6:.1f} MB)")
+        return
+    with ArxivIndex(args.index) as idx:
+        for aid in args.ids:
+            rec = idx.get(aid)
+            print(f"{aid}: " + (json.dumps(rec, ensure_ascii=False) if rec else "not found"))
+        if not all(idx.get(a) for a in args.ids):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
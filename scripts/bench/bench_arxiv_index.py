@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Build and lookup benchmark for scripts/arxiv_index.py.
+
+Runs on the real snapshot when given one (--snapshot arxiv-metadata-oai-snapshot.json,
+~2.5M records, ~4 GB), otherwise on a synthetic snapshot of --n records written in the
+same JSON-lines format (same fields, abstracts and version lists of similar size, a
+mix of new- and old-style ids).
+
+Reports:
+  build     records/s, wall time, peak RSS, index size vs snapshot size
+  open      time to open (mmap) the index
+  get       per-lookup latency (p50/p99) and lookups/s for hits, versioned ids and misses
+  check     every sampled hit returns the record it was built from
+
+  python scripts/bench/bench_arxiv_index.py                       # synthetic, 2.5M records
+  python scripts/bench/bench_arxiv_index.py --n 200000
+  python scripts/bench/bench_arxiv_index.py --snapshot ~/data/arxiv-metadata-oai-snapshot.json
+"""
+
+from __future__ import annotations
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+try:
+    import resource
+except ImportError:  # not on Windows
+    resource = None
+from pathlib import Path
+from typing import Dict, List
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE))
+sys.path.insert(0, str(HERE.parent))
+
+import gen_dblp
+import arxiv_index
+
+_OLD_ARCHIVES = ("hep-th", "hep-ph", "math", "cond-mat", "astro-ph", "quant-ph", "cs")
+_DAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+_MONTHS = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+
+
+def synthetic_ids(n: int) -> List[str]:
+    """About 10% old-style ids, the rest yymm.nnnnn, in snapshot (not sorted) order."""
+    rng = random.Random(7)
+    ids = set()
+    while len(ids) < n:
+        if rng.random() < 0.1:
+            ids.add(f"{rng.choice(_OLD_ARCHIVES)}/{rng.randint(91, 106) % 100:02d}{rng.randint(1, 12):02d}{rng.randint(1, 999):03d}")
+        else:
+            ids.add(f"{rng.randint(7, 25):02d}{rng.randint(1, 12):02d}.{rng.randint(1, 29999):05d}")
+    out = sorted(ids)
+    rng.shuffle(out)
+    return out
+
+
+def write_synthetic_snapshot(path: Path, n: int) -> List[str]:
+    rng = random.Random(3)
+    ids = synthetic_ids(n)
+    entries = gen_dblp.generate_entries(min(n, 50000))
+    pool = [(e["title"], e["author"].split(" and ")) for e in entries]
+    with path.open("w", encoding="utf-8") as f:
+        for i, aid in enumerate(ids):
+            title, authors = pool[i % len(pool)]
+            created = (f"{_DAYS[i % 7]}, {1 + i % 28} {_MONTHS[i % 12]} {2007 + i % 18} "
+                       f"{i % 24:02d}:{i % 60:02d}:{i % 59:02d} GMT")
+            obj = {
+                "id": aid,
+                "submitter": authors[0],
+                "authors": ", ".join(authors),
+                "title": title,
+                "comments": f"{rng.randint(4, 40)} pages, {rng.randint(1, 12)} figures",
+                "journal-ref": f"Phys. Rev. D {rng.randint(1, 110)}, {rng.randint(1000, 99999)} (2019)" if i % 4 == 0 else None,
+                "doi": f"10.1103/PhysRevD.{i}" if i % 4 == 0 else None,
+                "report-no": None,
+                "categories": "cs.CL cs.LG" if i % 2 else "hep-th",
+                "license": None,
+                "abstract": " ".join([title] * rng.randint(6, 14)),
+                "versions": [{"version": f"v{v + 1}", "created": created} for v in range(1 + i % 3)],
+                "update_date": "2023-01-01",
+                "authors_parsed": [[a.split()[-1], " ".join(a.split()[:-1]), ""] for a in authors],
+            }
+            f.write(json.dumps(obj) + "\n")
+    return ids
+
+
+def sample_records(snapshot: Path, k: int) -> Dict[str, Dict]:
+    """Reservoir-sample k (id, compact record) pairs, the expected answers."""
+    rng = random.Random(11)
+    sample: List = []
+    for i, pair in enumerate(arxiv_index.iter_snapshot(snapshot)):
+        if len(sample) < k:
+            sample.append(pair)
+        else:
+            j = rng.randint(0, i)
+            if j < k:
+                sample[j] = pair
+    return dict(sample)
+
+
+def _maxrss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024 if resource else 0.0
+
+
+def time_lookups(idx: arxiv_index.ArxivIndex, ids: List[str]) -> Dict[str, float]:
+    lat = []
+    t_all = time.perf_counter()
+    for aid in ids:
+        t0 = time.perf_counter()
+        idx.get(aid)
+        lat.append(time.perf_counter() - t0)
+    total = time.perf_counter() - t_all
+    lat.sort()
+    return {"p50_us": lat[len(lat) // 2] * 1e6, "p99_us": lat[int(len(lat) * 0.99)] * 1e6, "per_s": len(ids) / total}
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--snapshot", type=Path, default=None, help="Real arXiv snapshot (JSON lines)")
+    ap.add_argument("--n", type=int, default=2_500_000, help="Synthetic records when no --snapshot")
+    ap.add_argument("--lookups", type=int, default=100_000)
+    ap.add_argument("--workdir", type=Path, default=None, help="Where the synthetic snapshot and index go (default: a temp dir)")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench-arxiv-", dir=args.workdir) as tmp:
+        tmp = Path(tmp)
+        snapshot = args.snapshot
+        if snapshot is None:
+            snapshot = tmp / "snapshot.jsonl"
+            t0 = time.perf_counter()
+            write_synthetic_snapshot(snapshot, args.n)
+            print(f"synthetic snapshot: {args.n} records, {snapshot.stat().st_size / 1e9:.2f} GB "
+                  f"in {time.perf_counter() - t0:.0f}s")
+
+        index = tmp / "arxiv.idx"
+        rss0 = _maxrss_mb()
+        t0 = time.perf_counter()
+        n = arxiv_index.build_index(arxiv_index.iter_snapshot(snapshot), index)
+        build_s = time.perf_counter() - t0
+        print(f"build: {n} records in {build_s:.1f}s ({n / build_s:,.0f} records/s), "
+              f"peak RSS +{_maxrss_mb() - rss0:.0f} MB, index {index.stat().st_size / 1e6:.0f} MB "
+              f"({index.stat().st_size / snapshot.stat().st_size:.1%} of the snapshot)")
+
+        expected = sample_records(snapshot, min(args.lookups, n))
+        t0 = time.perf_counter()
+        idx = arxiv_index.ArxivIndex(index)
+        print(f"open: {(time.perf_counter() - t0) * 1e3:.2f} ms")
+
+        rng = random.Random(5)
+        hits = list(expected)
+        versioned = [f"arXiv:{a}v{rng.randint(1, 9)}" for a in hits]
+        misses = [f"{rng.randint(0, 6):02d}{rng.randint(1, 12):02d}.{rng.randint(30000, 99999):05d}" for _ in hits]
+        for name, ids in (("hit", hits), ("versioned", versioned), ("miss", misses)):
+            r = time_lookups(idx, ids)
+            print(f"get {name:<10} p50 {r['p50_us']:6.1f} us  p99 {r['p99_us']:6.1f} us  {r['per_s']:>10,.0f} lookups/s")
+
+        bad = sum(1 for aid, rec in expected.items() if idx.get(aid) != rec)
+        bad += sum(1 for aid in misses if idx.get(aid) is not None)
+        idx.close()
+        print(f"check: {len(expected)} sampled hits, {len(misses)} misses, {bad} wrong")
+        if bad:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
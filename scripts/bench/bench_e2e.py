@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark of scripts/scholar_IPs.py against a fake Scholar backend.
+
+Nothing leaves the machine:
+  - `FakeScholarly` replaces the scholarly singleton with a deterministic synthetic roster
+    (shared titles across authors, years on both sides of YEAR_FROM, optional latency);
+  - a local HTTP server plays the publishers: direct PDFs, HTML landing pages,
+    slow PDFs, and hosts that reject HEAD.
+
+Each roster size runs cold in a fresh temp CACHE_DIR/OUT_DIR and reports throughput,
+request counts (Scholar and HTTP, by route), and p50/p95/p99 per-publication latency.
+
+  python scripts/bench/bench_e2e.py                     # compare with baselines/e2e.json
+  python scripts/bench/bench_e2e.py --sizes 5,20        # quick run
+  python scripts/bench/bench_e2e.py --update-baseline   # accept current numbers
+
+Exits 1 when request counts grow or throughput drops by more than --tolerance.
+"""
+
+from __future__ import annotations
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import threading
+import importlib
+from pathlib import Path
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List
+
+SCRIPTS = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(SCRIPTS))
+
+BASELINE = Path(__file__).resolve().parent / "baselines" / "e2e.json"
+PDF_BODY = b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n1 0 obj <<>> endobj\ntrailer <<>>\n%%EOF\n"
+
+
+# ---------- local publisher ----------
+
+class PublisherHandler(BaseHTTPRequestHandler):
+    """
+    /pdf/<id>.pdf      application/pdf
+    /landing/<id>      text/html landing page (never a PDF)
+    /slow/<id>.pdf     application/pdf after `slow_s`
+    /nohead/<id>.pdf   405 on HEAD, application/pdf on GET
+    """
+    slow_s = 0.05
+    hits: Counter = Counter()
+    lock = threading.Lock()
+
+    def log_message(self, *args):
+        pass
+
+    def _route(self) -> str:
+        return self.path.strip("/").split("/", 1)[0]
+
+    def _send(self, status: int, ctype: str, body: bytes):
+        self.send_response(status)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _serve(self):
+        route = self._route()
+        with self.lock:
+            self.hits[f"{self.command} /{route}"] += 1
+        if route == "nohead" and self.command == "HEAD":
+            return self._send(405, "text/plain", b"")
+        if route == "slow":
+            time.sleep(self.slow_s)
+        if route in ("pdf", "slow", "nohead"):
+            return self._send(200, "application/pdf", PDF_BODY)
+        if route == "landing":
+            return self._send(200, "text/html; charset=utf-8", b"<html><body>Abstract</body></html>")
+        return self._send(404, "text/plain", b"not found")
+
+    do_GET = _serve
+    do_HEAD = _serve
+
+
+def start_publisher(slow_s: float) -> ThreadingHTTPServer:
+    PublisherHandler.slow_s = slow_s
+    PublisherHandler.hits = Counter()
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), PublisherHandler)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    return srv
+
+
+# ---------- fake Scholar ----------
+
+class FakeScholarly:
+    """
+    Deterministic stand-in for the scholarly singleton. Author k has `pubs_per_author`
+    pubs; every 4th title is shared with the next author so the cross-author merge has
+    real work to do.
+    """
+
+    def __init__(self, base_url: str, pubs_per_author: int, latency_s: float, seed: int = 0):
+        self.base_url = base_url
+        self.pubs_per_author = pubs_per_author
+        self.latency_s = latency_s
+        self.seed = seed
+        self.calls: Counter = Counter()
+
+    def _pause(self):
+        if self.latency_s:
+            time.sleep(self.latency_s)
+
+    def _stub(self, sid: str, k: int, j: int) -> Dict[str, Any]:
+        owner = k - 1 if j % 4 == 0 and k > 0 else k
+        rng = random.Random(f"{self.seed}:{owner}:{j}")
+        year = 2018 + rng.randrange(8)
+        return {
+            "container_type": "Publication",
+            "source": "AUTHOR_PUBLICATION_ENTRY",
+            "author_pub_id": f"{sid}:{owner}-{j}",
+            "filled": False,
+            "bib": {"title": f"Synthetic Study {owner}-{j} of Scalable {rng.choice(['Parsing', 'Retrieval', 'Alignment'])}",
+                    "pub_year": str(year)},
+        }
+
+    def search_author_id(self, sid: str) -> Dict[str, Any]:
+        self.calls["search_author_id"] += 1
+        self._pause()
+        return {"container_type": "Author", "scholar_id": sid, "filled": [], "source": "AUTHOR_PROFILE_PAGE"}
+
+    def fill(self, obj: Dict[str, Any], sections=None, sortby="citedby", publication_limit: int = 0):
+        self.calls["fill"] += 1
+        self._pause()
+        obj = dict(obj)
+        if obj["container_type"] == "Author":
+            k = int(obj["scholar_id"].rsplit("x", 1)[-1])
+            pubs = [self._stub(obj["scholar_id"], k, j) for j in range(self.pubs_per_author)]
+            pubs.sort(key=lambda p: p["bib"]["pub_year"], reverse=True)
+            if publication_limit:
+                pubs = pubs[:publication_limit]
+            obj.update(publications=pubs, citedby=1000 + k, name=f"Author {k}",
+                       filled=list(obj.get("filled", [])) + list(sections or []))
+            return obj
+        paper = obj["author_pub_id"].split(":", 1)[1]  # "<owner>-<j>", shared by co-authors
+        j = int(paper.rsplit("-", 1)[-1])
+        kind = ("pdf", "landing", "nohead", "slow", None)[j % 5]
+        bib = dict(obj["bib"], author="Ada Lovelace and Alan M. Turing and Grace Hopper",
+                   venue="Proceedings of Synthetic NLP" if j % 3 else "", abstract="x" * 400)
+        obj.update(bib=bib, filled=True)
+        if kind == "landing":
+            obj["pub_url"] = f"{self.base_url}/landing/{paper}"
+        elif kind:
+            obj["eprint_url"] = f"{self.base_url}/{kind}/{paper}.pdf"
+        return obj
+
+    def bibtex(self, obj: Dict[str, Any]) -> str:
+        self.calls["bibtex"] += 1
+        month = ("jan", "mar", "jun", "sep")[sum(map(ord, obj.get("author_pub_id", ""))) % 4]
+        return "@inproceedings{x,\n title={%s},\n month=%s\n}" % (obj["bib"]["title"], month)
+
+    def use_proxy(self, *args, **kwargs):
+        pass
+
+
+# ---------- one scenario ----------
+
+def percentile(samples: List[float], q: float) -> float:
+    if not samples:
+        return 0.0
+    s = sorted(samples)
+    return s[min(len(s) - 1, int(round(q * (len(s) - 1))))]
+
+
+def run_scenario(n_authors: int, args: argparse.Namespace, base_url: str) -> Dict[str, Any]:
+    work = Path(tempfile.mkdtemp(prefix=f"bench-e2e-{n_authors}-"))
+    os.environ.update(CACHE_DIR=str(work / "cache"), OUT_DIR=str(work / "out"), YEAR_FROM="2020",
+                      SCHOLAR_MIN_DELAY="0", SLEEP_BETWEEN_AUTHORS="0", DRY_RUN="0")
+    os.environ.pop("SCHOLAR_URLS", None)
+    sys.modules.pop("scholar_IPs", None)  # module-level config and state are per run
+    S = importlib.import_module("scholar_IPs")
+
+    fake = FakeScholarly(base_url, args.pubs_per_author, args.scholar_latency)
+    S.scholarly = fake
+    S.setup_scholar = lambda: None
+    latencies: List[float] = []
+    collect_pub = S.collect_pub
+
+    def timed_collect_pub(*a, **kw):
+        t0 = time.perf_counter()
+        try:
+            return collect_pub(*a, **kw)
+        finally:
+            latencies.append(time.perf_counter() - t0)
+
+    S.collect_pub = timed_collect_pub
+    PublisherHandler.hits = Counter()
+    ids = [f"benchauthorx{k}" for k in range(n_authors)]
+
+    devnull = open(os.devnull, "w")
+    stdout, sys.stdout = sys.stdout, devnull
+    t0 = time.perf_counter()
+    try:
+        S.main(ids + ["--metrics-out", str(work / "metrics.json")])
+    finally:
+        sys.stdout = stdout
+        devnull.close()
+    wall = time.perf_counter() - t0
+
+    metrics = json.loads((work / "metrics.json").read_text(encoding="utf-8"))
+    bundles = sum(1 for _ in (work / "out").glob("*/index.md"))
+    shutil.rmtree(work, ignore_errors=True)
+    n_pubs = len(latencies)
+    return {
+        "authors": n_authors,
+        "pubs_processed": n_pubs,
+        "bundles": bundles,
+        "wall_s": round(wall, 3),
+        "pubs_per_s": round(n_pubs / wall, 1) if wall else 0.0,
+        "latency_ms": {q: round(percentile(latencies, p) * 1000, 2)
+                       for q, p in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99))},
+        "scholar_calls": dict(sorted(fake.calls.items())),
+        "http_requests": dict(sorted(PublisherHandler.hits.items())),
+        "stages_s": {k: v["s"] for k, v in metrics["stages"].items()},
+    }
+
+
+# ---------- baseline ----------
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    problems = []
+    for size, cur in results.items():
+        old = baseline.get(size)
+        if not old:
+            continue
+        for group in ("scholar_calls", "http_requests"):
+            for k, v in cur[group].items():
+                if v > old[group].get(k, 0):
+                    problems.append(f"{size} authors: {group}[{k}] {old[group].get(k, 0)} -> {v}")
+        if cur["pubs_per_s"] < old["pubs_per_s"] * (1 - tolerance):
+            problems.append(f"{size} authors: throughput {old['pubs_per_s']} -> {cur['pubs_per_s']} pubs/s")
+        if cur["latency_ms"]["p99"] > old["latency_ms"]["p99"] * (1 + tolerance) + 1.0:
+            problems.append(f"{size} authors: p99 {old['latency_ms']['p99']} -> {cur['latency_ms']['p99']} ms")
+    return problems
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sizes", default="5,50,200", help="Comma-separated roster sizes (default: 5,50,200)")
+    ap.add_argument("--pubs-per-author", type=int, default=8)
+    ap.add_argument("--scholar-latency", type=float, default=0.0, help="Simulated seconds per Scholar call")
+    ap.add_argument("--slow-latency", type=float, default=0.05, help="Seconds the /slow/ PDF host takes")
+    ap.add_argument("--baseline", type=Path, default=BASELINE)
+    ap.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative throughput/p99 regression")
+    ap.add_argument("--update-baseline", action="store_true")
+    ap.add_argument("--json", type=Path, default=None, help="Also write the results here")
+    args = ap.parse_args()
+
+    srv = start_publisher(args.slow_latency)
+    base_url = f"http://127.0.0.1:{srv.server_address[1]}"
+    results: Dict[str, Any] = {}
+    try:
+        for n in (int(x) for x in args.sizes.split(",") if x.strip()):
+            res = results[str(n)] = run_scenario(n, args, base_url)
+            print(f"{n:>4} authors: {res['pubs_processed']:>5} pubs in {res['wall_s']:>7.2f}s "
+                  f"({res['pubs_per_s']} pubs/s) p50/p95/p99 "
+                  f"{res['latency_ms']['p50']}/{res['latency_ms']['p95']}/{res['latency_ms']['p99']} ms, "
+                  f"{sum(res['http_requests'].values())} HTTP, {sum(res['scholar_calls'].values())} Scholar calls")
+    finally:
+        srv.shutdown()
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    if args.update_baseline:
+        merged = json.loads(args.baseline.read_text(encoding="utf-8")) if args.baseline.exists() else {}
+        merged.update(results)
+        args.baseline.write_text(json.dumps(merged, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        print(f"Baseline updated: {args.baseline}")
+        return
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}; run with --update-baseline to create one.")
+        return
+    problems = compare(results, json.loads(args.baseline.read_text(encoding="utf-8")), args.tolerance)
+    for p in problems:
+        print(f"REGRESSION {p}")
+    if problems:
+        sys.exit(1)
+    print("No regressions against baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Benchmark and check for scripts/pdf_mirror.py against a local HTTP server.
+
+The server (stdlib ThreadingHTTPServer) serves --n synthetic PDFs, a few HTML landing
+pages under .pdf-looking URLs and pairs of URLs with identical content, with --latency
+ms added to every response (a remote publisher's round trip). It honours Range and
+If-Range like a CDN does. In its flaky mode, the first GET of every PDF is cut off
+halfway through the body.
+
+Reports:
+  cold      time to mirror everything with --jobs 1 and with --jobs N
+  warm      a second run: no requests at all, only stats
+  resume    a flaky first run, then the run that resumes it: bytes sent in the second
+            run vs the total (ranged requests should need only about half)
+  check     every stored file has its content hash, landing pages are not stored,
+            duplicate URLs share one file
+
+  python scripts/bench/bench_pdf_mirror.py
+  python scripts/bench/bench_pdf_mirror.py --n 200 --latency 80 --jobs 16
+"""
+
+from __future__ import annotations
+import os
+import sys
+import time
+import random
+import hashlib
+import argparse
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE.parent))
+
+import pdf_mirror
+
+
+class Files:
+    """What the server serves, plus what it has sent."""
+
+    def __init__(self):
+        self.docs: Dict[str, bytes] = {}
+        self.latency = 0.0
+        self.flaky = False
+        self.cut: set = set()  # paths whose first GET was already cut
+        self.requests = 0
+        self.bytes_sent = 0
+        self.lock = threading.Lock()
+
+
+FILES = Files()
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        with FILES.lock:
+            FILES.requests += 1
+        time.sleep(FILES.latency)
+        body = FILES.docs.get(self.path)
+        if body is None:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        etag = '"' + hashlib.md5(body).hexdigest() + '"'
+        ctype = "application/pdf" if body.startswith(b"%PDF-") else "text/html"
+        start = 0
+        rng = self.headers.get("Range", "")
+        if rng.startswith("bytes=") and self.headers.get("If-Range", etag) == etag:
+            start = int(rng[6:].split("-")[0])
+            if start >= len(body):
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{len(body)}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{len(body) - 1}/{len(body)}")
+        else:
+            self.send_response(200)
+        part = body[start:]
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(part)))
+        self.send_header("ETag", etag)
+        self.send_header("Accept-Ranges", "bytes")
+        self.end_headers()
+        with FILES.lock:
+            cut = FILES.flaky and ctype == "application/pdf" and self.path not in FILES.cut
+            if cut:
+                FILES.cut.add(self.path)
+        if cut:
+            part = part[:len(part) // 2]
+            self.close_connection = True
+        self.wfile.write(part)
+        with FILES.lock:
+            FILES.bytes_sent += len(part)
+
+
+def make_docs(n: int, size_kb: int) -> Dict[str, bytes]:
+    rng = random.Random(1)
+    docs: Dict[str, bytes] = {}
+    for i in range(n):
+        docs[f"/papers/{i}.pdf"] = b"%PDF-1.5\n" + rng.randbytes(size_kb * 1024 + rng.randint(0, 4096)) + b"\n%%EOF\n"
+    for i in range(0, n, 10):  # a second URL for the same file (publisher + preprint server)
+        docs[f"/mirror/{i}.pdf"] = docs[f"/papers/{i}.pdf"]
+    for i in range(max(1, n // 20)):  # landing pages behind PDF-looking links
+        docs[f"/landing/{i}.pdf"] = b"<html><body>Sign in to download</body></html>"
+    return docs
+
+
+def run(root: Path, urls, jobs: int):
+    m = pdf_mirror.PdfMirror(root, "/pdf/").load()
+    FILES.requests = FILES.bytes_sent = 0
+    t0 = time.perf_counter()
+    local = m.mirror(urls, jobs)
+    elapsed = time.perf_counter() - t0
+    m.save()
+    return m, local, elapsed
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--n", type=int, default=60, help="Distinct PDFs")
+    ap.add_argument("--size-kb", type=int, default=256)
+    ap.add_argument("--latency", type=float, default=50, help="Per-response latency in ms")
+    ap.add_argument("--jobs", type=int, default=pdf_mirror.PDF_MIRROR_JOBS)
+    args = ap.parse_args()
+
+    FILES.docs = make_docs(args.n, args.size_kb)
+    FILES.latency = args.latency / 1000
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    urls = [base + p for p in FILES.docs]
+    pdfs = {base + p: body for p, body in FILES.docs.items() if body.startswith(b"%PDF-")}
+    total = sum(len(b) for b in FILES.docs.values())
+    print(f"{len(urls)} URLs ({len(pdfs)} PDFs, {len(set(pdfs.values()))} distinct), "
+          f"{total / 1e6:.1f} MB, {args.latency:.0f} ms latency")
+
+    bad = 0
+    with tempfile.TemporaryDirectory(prefix="bench-pdf-mirror-") as tmp:
+        tmp = Path(tmp)
+        for jobs in (1, args.jobs):
+            m, local, s = run(tmp / f"cold{jobs}", urls, jobs)
+            print(f"cold  jobs={jobs:<3} {s:6.2f}s  {FILES.requests} requests  {len(local)} mirrored  {m.stats}")
+        m, local, s = run(tmp / f"cold{args.jobs}", urls, args.jobs)
+        print(f"warm  jobs={args.jobs:<3} {s * 1e3:6.1f}ms {FILES.requests} requests  {len(local)} mirrored")
+        bad += FILES.requests != 0
+
+        for url, body in pdfs.items():
+            site = local.get(url)
+            sha = hashlib.sha256(body).hexdigest()
+            if site is None or not site.endswith(f"/{sha}.pdf") or m.blob_path(sha).read_bytes() != body:
+                bad += 1
+        bad += sum(1 for u in urls if "/landing/" in u and u in local)
+        stored = sum(1 for p in (tmp / f"cold{args.jobs}").glob("*/*.pdf"))
+        bad += stored != len(set(pdfs.values()))
+
+        FILES.flaky = True
+        m, local, s = run(tmp / "resume", urls, args.jobs)
+        first = FILES.bytes_sent
+        print(f"flaky run       {s:6.2f}s  {len(local)} mirrored, {m.stats['failed']} interrupted, {first / 1e6:.1f} MB sent")
+        m, local, s = run(tmp / "resume", urls, args.jobs)
+        print(f"resume run      {s:6.2f}s  {len(local)} mirrored, {m.stats['resumed']} resumed, "
+              f"{FILES.bytes_sent / 1e6:.1f} MB sent ({FILES.bytes_sent / max(1, total):.0%} of the total)")
+        bad += len(local) != len(pdfs)
+        bad += any(m.blob_path(hashlib.sha256(b).hexdigest()).read_bytes() != b for b in pdfs.values())
+        bad += any((tmp / "resume" / ".partial").glob("*.part"))
+
+    server.shutdown()
+    print(f"check: {bad} wrong")
+    if bad:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for the parsing and text-normalization helpers, on synthetic DBLP data
+(see gen_dblp.py):
+
+  parse_bibtex_entries, dedup_entries, slugify   (scripts/extract.py)
+  sanitize_text                                  (scripts/scholar_IPs.py)
+  yaml_get_field, clean_front_matter             (scripts/post_google_scholar.py)
+
+Every (function, size) case runs in its own subprocess, so peak memory is not polluted
+by earlier cases and a case that blows the --budget is killed and reported as a timeout
+instead of hanging the suite. Cases shorter than MIN_TIMED_S are repeated (each pass
+with cold textnorm memos) and the fastest pass counts, so small sizes are not dominated
+by timer noise. Peak memory comes from a second, tracemalloc'ed pass when the budget
+allows it, otherwise from the growth of the process's max RSS during the timed pass.
+
+  python scripts/bench/bench_text.py                      # 1k / 100k / 1M, compare with baseline
+  python scripts/bench/bench_text.py --sizes 1000,10000 --only slugify,sanitize_text
+  python scripts/bench/bench_text.py --update-baseline
+
+Exits 1 when ops/sec drops, or peak memory grows, by more than --threshold.
+"""
+
+from __future__ import annotations
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+import tracemalloc
+try:
+    import resource
+except ImportError:  # not on Windows
+    resource = None
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+HERE = Path(__file__).resolve().parent
+SCRIPTS = HERE.parent
+sys.path.insert(0, str(HERE))
+sys.path.insert(0, str(SCRIPTS))
+
+BASELINE = HERE / "baselines" / "text.json"
+CASES = ("parse_bibtex_entries", "dedup_entries", "slugify", "sanitize_text", "yaml_get_field",
+         "clean_front_matter")
+
+# what Scholar titles actually look like before sanitize_text: tags, entities, math letters, ZWSP
+_NOISE = ("<i>{}</i>", "{} &amp; more", "𝐋𝐋𝐌𝐬 for {}", "{}​", "  {}  ", "{}")
+
+
+def build_case(name: str, n: int) -> Tuple[Callable[[], Any], int]:
+    """Return (op, units): calling op() once processes `units` items."""
+    import gen_dblp
+
+    if name == "parse_bibtex_entries":
+        import extract
+        text = gen_dblp.generate_bibtex(n)
+        return (lambda: extract.parse_bibtex_entries(text)), n
+    if name == "dedup_entries":
+        import extract
+        entries = list(gen_dblp.generate_entries(n))
+        return (lambda: extract.dedup_entries(list(entries))), n
+    if name == "slugify":
+        import extract
+        pairs = [(e["title"], e["year"]) for e in gen_dblp.generate_entries(n)]
+        return (lambda: [extract.slugify(t, y) for t, y in pairs]), n
+    if name == "sanitize_text":
+        os.environ.setdefault("CACHE_DIR", tempfile.mkdtemp(prefix="bench-text-"))
+        import scholar_IPs
+        titles = [_NOISE[i % len(_NOISE)].format(e["title"]) for i, e in enumerate(gen_dblp.generate_entries(n))]
+        return (lambda: [scholar_IPs.sanitize_text(t) for t in titles]), n
+    if name == "yaml_get_field":
+        import post_google_scholar
+        docs = [gen_dblp.render_index_md(e).splitlines(keepends=True) for e in gen_dblp.generate_entries(n)]
+        return (lambda: [post_google_scholar.yaml_get_field(d, "url_pdf") for d in docs]), n
+    if name == "clean_front_matter":
+        import post_google_scholar as pgs
+        texts = [gen_dblp.render_index_md(e) for e in gen_dblp.generate_entries(n)]
+        # what process_index_md does per bundle, minus the file I/O
+        return (lambda: [pgs.clean_front_matter(pgs.FrontMatter(t.splitlines(keepends=True))) for t in texts]), n
+    raise ValueError(f"unknown case {name}")
+
+
+# timed passes of a case are repeated until they add up to this (best pass is reported)
+MIN_TIMED_S = 1.0
+MAX_REPEATS = 50
+
+# tracemalloc slows allocation-heavy code down by roughly this factor
+_TRACEMALLOC_OVERHEAD = 6.0
+
+
+def _maxrss_kb() -> int:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource else 0  # KiB on Linux
+
+
+def _clear_memos():
+    """Every pass starts cold, like one run of the scripts (textnorm memoizes per process)."""
+    textnorm = sys.modules.get("textnorm")
+    for fn in vars(textnorm).values() if textnorm else ():
+        if hasattr(fn, "cache_clear"):
+            fn.cache_clear()
+
+
+def run_case(name: str, n: int, budget: float) -> Dict[str, Any]:
+    started = time.perf_counter()
+    op, units = build_case(name, n)
+    rss0 = _maxrss_kb()
+    # small cases finish in milliseconds, where one pass is mostly scheduler noise:
+    # repeat them for MIN_TIMED_S and keep the fastest pass
+    elapsed, spent, reps = float("inf"), 0.0, 0
+    while reps < 1 or (spent < MIN_TIMED_S and reps < MAX_REPEATS):
+        _clear_memos()
+        t0 = time.perf_counter()
+        op()
+        dt = time.perf_counter() - t0
+        elapsed, spent, reps = min(elapsed, dt), spent + dt, reps + 1
+    res = {"case": name, "n": n, "s": round(elapsed, 4), "repeats": reps,
+           "ops_per_s": round(units / elapsed, 1) if elapsed else 0.0}
+    remaining = budget - (time.perf_counter() - started)
+    if elapsed * _TRACEMALLOC_OVERHEAD < remaining * 0.8 or not resource:
+        _clear_memos()
+        tracemalloc.start()
+        op()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        res.update(peak_kb=peak // 1024, peak_from="tracemalloc")
+    else:
+        res.update(peak_kb=max(0, _maxrss_kb() - rss0), peak_from="maxrss")
+    return res
+
+
+def spawn_case(name: str, n: int, budget: float) -> Dict[str, Any]:
+    cmd = [sys.executable, __file__, "--case", name, str(n), str(budget)]
+    try:
+        out = subprocess.run(cmd, capture_output=True, text=True, timeout=budget, check=True).stdout
+    except subprocess.TimeoutExpired:
+        return {"case": name, "n": n, "timeout": budget}
+    except subprocess.CalledProcessError as e:
+        return {"case": name, "n": n, "error": (e.stderr or "").strip().splitlines()[-1:]}
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]], threshold: float) -> List[str]:
+    problems = []
+    for key, cur in results.items():
+        old = baseline.get(key)
+        if not old or "ops_per_s" not in old:
+            continue
+        if "ops_per_s" not in cur:
+            problems.append(f"{key}: {'timed out' if 'timeout' in cur else 'failed'} (baseline {old['ops_per_s']} ops/s)")
+            continue
+        if cur["ops_per_s"] < old["ops_per_s"] * (1 - threshold):
+            problems.append(f"{key}: {old['ops_per_s']} -> {cur['ops_per_s']} ops/s")
+        if cur.get("peak_from") == old.get("peak_from") and cur["peak_kb"] > old["peak_kb"] * (1 + threshold) + 64:
+            problems.append(f"{key}: peak {old['peak_kb']} -> {cur['peak_kb']} KiB")
+    return problems
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sizes", default="1000,100000,1000000")
+    ap.add_argument("--only", default=",".join(CASES), help="Comma-separated subset of: " + ", ".join(CASES))
+    ap.add_argument("--budget", type=float, default=300.0, help="Seconds per case before it is killed")
+    ap.add_argument("--threshold", type=float, default=0.3, help="Allowed relative regression")
+    ap.add_argument("--baseline", type=Path, default=BASELINE)
+    ap.add_argument("--update-baseline", action="store_true")
+    ap.add_argument("--case", nargs=3, metavar=("NAME", "N", "BUDGET"), help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.case:
+        print(json.dumps(run_case(args.case[0], int(args.case[1]), float(args.case[2]))))
+        return
+
+    results: Dict[str, Dict[str, Any]] = {}
+    for name in (c.strip() for c in args.only.split(",") if c.strip()):
+        for n in (int(x) for x in args.sizes.split(",") if x.strip()):
+            res = results[f"{name}@{n}"] = spawn_case(name, n, args.budget)
+            if "ops_per_s" in res:
+                print(f"{name:<22} {n:>9}: {res['ops_per_s']:>12,.0f} ops/s  peak {res['peak_kb']:>9,} KiB")
+            else:
+                print(f"{name:<22} {n:>9}: {'timeout' if 'timeout' in res else 'error'} {res.get('error', '')}")
+                break  # larger sizes would only take longer
+
+    if args.update_baseline:
+        merged = json.loads(args.baseline.read_text(encoding="utf-8")) if args.baseline.exists() else {}
+        merged.update({k: v for k, v in results.items() if "ops_per_s" in v})
+        args.baseline.write_text(json.dumps(merged, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        print(f"Baseline updated: {args.baseline}")
+        return
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}; run with --update-baseline to create one.")
+        return
+    problems = compare(results, json.loads(args.baseline.read_text(encoding="utf-8")), args.threshold)
+    for p in problems:
+        print(f"REGRESSION {p}")
+    if problems:
+        sys.exit(1)
+    print("No regressions against baseline.")
+
+
+if __name__ == "__main__":
+    main()
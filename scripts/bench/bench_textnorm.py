@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Equivalence check and throughput benchmark for scripts/textnorm.py.
+
+The per-script normalizers textnorm.py replaced are kept below, verbatim, as the
+reference. Every textnorm function is run against its reference on synthetic DBLP
+titles/authors (gen_dblp.py), Scholar-style noisy titles and a seeded random fuzz corpus
+heavy on non-ASCII, and must agree on every input. Then each pair is timed on the DBLP
+corpus, both "cold" (textnorm's memo cleared first) and "warm" (memo populated, which
+is what the dedup stages and titles_overlap see after the first pass).
+
+  python scripts/bench/bench_textnorm.py                # 20k titles
+  python scripts/bench/bench_textnorm.py --n 100000 --fuzz 50000
+
+Exits 1 on any mismatch.
+"""
+
+from __future__ import annotations
+import re
+import sys
+import html
+import time
+import random
+import argparse
+import unicodedata
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE))
+sys.path.insert(0, str(HERE.parent))
+
+import gen_dblp
+import textnorm
+
+
+# ---------- reference implementations (as they were in the importers) ----------
+_TAG_RE = re.compile(r"<[^>]+>")
+
+
+def ref_sanitize_text(s: str) -> str:  # scholar_IPs.py
+    if not s:
+        return s
+    # 1) Remove any HTML tags Scholar might leak
+    s = _TAG_RE.sub("", s)
+    # 2) Unescape HTML entities (&amp; → &)
+    s = html.unescape(s)
+    # 3) Normalize Unicode: fold math/compat chars to plain ASCII letters
+    s = unicodedata.normalize("NFKC", s)
+    # 4) Drop zero-width & odd control chars
+    s = s.replace("\u200b", "").replace("\ufeff", "").replace("\u200c", "").replace("\u200d", "")
+    # 5) Optional: strip residual combining marks that sometimes encircle/overlay letters
+    s = "".join(ch for ch in s if unicodedata.category(ch) != "Mn")
+    # 6) Collapse whitespace
+    s = re.sub(r"\s+", " ", s).strip()
+    return s
+
+
+def ref_normalize_title_key(title: str) -> str:  # scholar_IPs.py
+    t = title.lower()
+    t = re.sub(r"[^a-z0-9\s]", " ", t)
+    t = re.sub(r"\s+", " ", t).strip()
+    return t
+
+
+def ref_norm_title(t: str) -> str:  # extract.py
+    t = t.lower()
+    t = re.sub(r"[{}]", "", t)
+    t = re.sub(r"[^a-z0-9]+", " ", t)
+    t = re.sub(r"\s+", " ", t).strip()
+    return t
+
+
+def ref_title_first_n_words(title: str, n: int = 4) -> str:  # extract.py
+    t = title.lower()
+    t = re.sub(r"[{}]", "", t)
+    t = re.sub(r"[^a-z0-9]+", " ", t)
+    t = re.sub(r"\s+", " ", t).strip()
+    words = t.split()
+    return " ".join(words[:n])
+
+
+def ref_slugify(title: str, year: str, max_len: int = 80) -> str:  # extract.py
+    s = title.lower()
+    s = s.replace("&", "and")
+    s = re.sub(r"[{}]", "", s)
+    s = re.sub(r"[^a-z0-9]+", "-", s)
+    s = re.sub(r"-+", "-", s).strip("-")
+    if len(s) > max_len:
+        parts = s.split("-")
+        out = []
+        total = 0
+        for p in parts:
+            if not p:
+                continue
+            add = len(p) + (1 if out else 0)
+            if total + add > max_len:
+                break
+            out.append(p)
+            total += add
+        s = "-".join(out) if out else s[:max_len].rstrip("-")
+    return f"{s}-{year}"
+
+
+def ref_normalize_authors(bib_authors: str) -> List[str]:  # scholar_IPs.py, import_scholar_multi.py
+    if not bib_authors:
+        return []
+    parts = [p.strip() for p in re.split(r"\s+and\s+", bib_authors)]
+    return [re.sub(r"\s*\.\s*", ". ", p).strip() for p in parts if p]
+
+
+# name -> (reference, textnorm, how to call it on one corpus string)
+PAIRS: Dict[str, Tuple[Callable, Callable, Callable]] = {
+    "sanitize_text": (ref_sanitize_text, textnorm.sanitize_text, lambda f, s: f(s)),
+    "title_key": (ref_normalize_title_key, textnorm.title_key, lambda f, s: f(s)),
+    "norm_title": (ref_norm_title, textnorm.norm_title, lambda f, s: f(s)),
+    "title_first_n_words": (ref_title_first_n_words, textnorm.title_first_n_words, lambda f, s: f(s, 5)),
+    "slugify": (ref_slugify, textnorm.slugify, lambda f, s: f(s, "2024")),
+    "slugify_short": (ref_slugify, textnorm.slugify, lambda f, s: f(s, "2024", 12)),
+    "normalize_authors": (ref_normalize_authors, textnorm.normalize_authors, lambda f, s: f(s)),
+}
+
+_NOISE = ("<i>{}</i>", "{} &amp; more", "𝐋𝐋𝐌𝐬 for {}", "{}\u200b", "  {}\t\n", "Ｆｕｌｌ-width {}",
+          "Café {}", "{} — “quoted” ½", "{}")
+# codepoints that stress the unicode paths: Latin-1, combining marks, math letters,
+# fullwidth, zero-width, odd whitespace, case-changing specials (İ, ß, ﬁ), CJK
+_FUZZ_POOL = ("abcXYZ019 {}&<>-._,;:'\"\t\n\x0b\x1c\xa0\u2003\u3000"
+              "éÉüÜñßİıﬁﬂ½²\u0301\u0308\u20dd\u200b\u200c\u200d\ufeff"
+              "𝐀𝐁𝑎𝒷ＡＢｃ１２—–“”…中文日本語")
+
+
+def corpus(n: int, fuzz: int) -> List[str]:
+    rng = random.Random(1)
+    out: List[str] = []
+    for i, e in enumerate(gen_dblp.generate_entries(n)):
+        out.append(e["title"])
+        out.append(_NOISE[i % len(_NOISE)].format(e["title"]))
+        out.append(e["author"])
+    out += ["", " ", "&amp;", "<b></b>", "-" * 100, "x" * 100, "a" * 90 + " b"]
+    for _ in range(fuzz):
+        out.append("".join(rng.choice(_FUZZ_POOL) for _ in range(rng.randint(0, 40))))
+    return out
+
+
+def check(texts: List[str]) -> int:
+    bad = 0
+    for name, (ref, new, call) in PAIRS.items():
+        for s in texts:
+            a, b = call(ref, s), call(new, s)
+            if a != b:
+                bad += 1
+                if bad <= 20:
+                    print(f"MISMATCH {name}({s!r}): {a!r} != {b!r}")
+    return bad
+
+
+def clear_memos():
+    for fn in (textnorm.sanitize_text, textnorm.title_key, textnorm.norm_title,
+               textnorm._slug_stem, textnorm._author_tuple):
+        fn.cache_clear()
+
+
+def timed(fn: Callable, call: Callable, texts: List[str]) -> float:
+    t0 = time.perf_counter()
+    for s in texts:
+        call(fn, s)
+    return time.perf_counter() - t0
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--n", type=int, default=20000, help="Synthetic DBLP entries")
+    ap.add_argument("--fuzz", type=int, default=20000, help="Random unicode strings for the equivalence check")
+    args = ap.parse_args()
+
+    texts = corpus(args.n, args.fuzz)
+    bad = check(texts)
+    print(f"Equivalence: {len(texts)} inputs x {len(PAIRS)} functions, {bad} mismatches")
+
+    dblp = corpus(args.n, 0)
+    print(f"\n{'function':<22} {'reference':>12} {'cold':>12} {'warm':>12}   (strings/s, {len(dblp)} inputs)")
+    for name, (ref, new, call) in PAIRS.items():
+        t_ref = timed(ref, call, dblp)
+        clear_memos()
+        t_cold = timed(new, call, dblp)
+        t_warm = timed(new, call, dblp)
+        n = len(dblp)
+        print(f"{name:<22} {n / t_ref:>12,.0f} {n / t_cold:>12,.0f} {n / t_warm:>12,.0f}   x{t_ref / t_cold:.1f} cold")
+    if bad:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
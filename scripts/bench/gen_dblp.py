@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Synthetic DBLP-style BibTeX (and matching Hugo bundle trees) for benchmarks.
+
+The output looks like what dblp.org exports for a group's members:
+  - conference papers whose booktitle carries the acronym in braces and the dates,
+    e.g. "... {ACL} 2024, Bangkok, Thailand, August 11-16, 2024"
+  - journal papers, and CoRR/arXiv preprints, a share of which duplicate a
+    conference paper's title (the case dedup_entries exists for)
+  - {Braced} capitalisation and {{nested}} braces in titles, multi-line author lists,
+    "quoted" values and bare month macros.
+
+  python scripts/bench/gen_dblp.py --entries 100000 --bib /tmp/dblp.bib
+  python scripts/bench/gen_dblp.py --entries 1000 --bundles /tmp/pub
+"""
+
+from __future__ import annotations
+import re
+import random
+import argparse
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+VENUES = [
+    ("ACL", "Proceedings of the {year_ord} Annual Meeting of the Association for Computational Linguistics (Volume 1: Long Papers)", "Bangkok, Thailand", "August"),
+    ("EMNLP", "Proceedings of the {year_ord} Conference on Empirical Methods in Natural Language Processing", "Miami, FL, USA", "November"),
+    ("NAACL", "Proceedings of the {year_ord} Conference of the North American Chapter of the Association for Computational Linguistics: Human Language Technologies", "Mexico City, Mexico", "June"),
+    ("ICLR", "The {year_ord} International Conference on Learning Representations", "Vienna, Austria", "May"),
+    ("NeurIPS", "Advances in Neural Information Processing Systems {year_ord}: Annual Conference on Neural Information Processing Systems", "Vancouver, BC, Canada", "December"),
+]
+JOURNALS = ["Trans. Assoc. Comput. Linguistics", "Comput. Linguistics", "J. Mach. Learn. Res.", "Nat. Lang. Eng."]
+WORDS = ("language model reasoning retrieval alignment benchmark dataset multilingual evaluation "
+         "efficient scalable robust belief narrative clinical graph agents instruction tuning "
+         "distillation contrastive generation summarization entity event temporal causal").split()
+ACRONYMS = ["LLM", "NLP", "BERT", "GPT", "RAG", "QA", "NLI", "LoRA"]
+FIRST = ["Ada", "Alan", "Grace", "Wei", "Priya", "Jiawei", "Owen", "Niranjan", "Tuhin", "Salam", "Zhengxiang", "Huajian"]
+LAST = ["Lovelace", "Turing", "Hopper", "Zhang", "Balasubramanian", "Zhou", "Rambow", "Chakrabarty", "Müller", "O'Neil"]
+
+
+def _title(rng: random.Random) -> str:
+    words = [rng.choice(WORDS) for _ in range(rng.randint(4, 12))]
+    words[0] = words[0].capitalize()
+    if rng.random() < 0.5:
+        words.insert(rng.randrange(len(words)), "{" + rng.choice(ACRONYMS) + "}")
+    if rng.random() < 0.1:
+        words.insert(0, "{{" + rng.choice(ACRONYMS) + "}-" + rng.choice(WORDS).capitalize() + "}:")
+    return " ".join(words)
+
+
+def _authors(rng: random.Random) -> List[str]:
+    return [f"{rng.choice(FIRST)} {rng.choice(LAST)}" for _ in range(rng.randint(1, 8))]
+
+
+def _ordinal(n: int) -> str:
+    suffix = "th" if 10 <= n % 100 <= 20 else {1: "st", 2: "nd", 3: "rd"}.get(n % 10, "th")
+    return f"{n}{suffix}"
+
+
+def generate_entries(n: int, seed: int = 0, corr_dup_rate: float = 0.25) -> Iterator[Dict[str, str]]:
+    """Yield n entry dicts (ENTRYTYPE, ID and fields) in DBLP field order."""
+    rng = random.Random(seed)
+    recent: List[Dict[str, str]] = []
+    for i in range(n):
+        year = rng.randint(2018, 2025)
+        if recent and rng.random() < corr_dup_rate:
+            # arXiv version of a paper we already emitted
+            src = rng.choice(recent)
+            yy, mm = int(src["year"]) % 100, rng.randint(1, 12)
+            arx = f"{yy:02d}{mm:02d}.{rng.randint(0, 99999):05d}"
+            yield {
+                "ENTRYTYPE": "article", "ID": f"DBLP:journals/corr/abs-{arx.replace('.', '-')}",
+                "author": src["author"], "title": src["title"], "journal": "CoRR",
+                "volume": f"abs/{arx}", "year": src["year"], "url": f"https://doi.org/10.48550/arXiv.{arx}",
+                "doi": f"10.48550/ARXIV.{arx}", "eprinttype": "arXiv", "eprint": arx,
+            }
+            continue
+        kind = rng.random()
+        e: Dict[str, str] = {"author": " and ".join(_authors(rng)), "title": _title(rng), "year": str(year)}
+        if kind < 0.6:
+            acr, name, place, month = rng.choice(VENUES)
+            day = rng.randint(1, 25)
+            e.update(ENTRYTYPE="inproceedings", ID=f"DBLP:conf/{acr.lower()}/X{year % 100}{i}",
+                     booktitle=f"{name.format(year_ord=_ordinal(year - 1962))}, {{{acr}}} {year}, "
+                               f"{place}, {month} {day}-{day + 4}, {year}",
+                     pages=f"{i % 900 + 1}--{i % 900 + 12}", publisher="Association for Computational Linguistics",
+                     url=f"https://aclanthology.org/{year}.{acr.lower()}-long.{i}", doi=f"10.18653/v1/{year}.{acr.lower()}-long.{i}")
+        elif kind < 0.8:
+            e.update(ENTRYTYPE="article", ID=f"DBLP:journals/x/X{year % 100}{i}", journal=rng.choice(JOURNALS),
+                     volume=str(year - 2010), number=str(rng.randint(1, 4)), pages=f"{i % 500 + 1}--{i % 500 + 30}",
+                     url=f"https://doi.org/10.1162/x_{i}", doi=f"10.1162/x_{i}")
+        else:
+            yy, mm = year % 100, rng.randint(1, 12)
+            arx = f"{yy:02d}{mm:02d}.{rng.randint(0, 99999):05d}"
+            e.update(ENTRYTYPE="article", ID=f"DBLP:journals/corr/abs-{arx.replace('.', '-')}", journal="CoRR",
+                     volume=f"abs/{arx}", url=f"https://doi.org/10.48550/arXiv.{arx}",
+                     doi=f"10.48550/ARXIV.{arx}", eprinttype="arXiv", eprint=arx)
+        if rng.random() < 0.05:
+            e["note"] = '"Findings track, {Oral}"'   # quoted value
+        if rng.random() < 0.05:
+            e["month"] = rng.choice(["jan", "jun", "sep", "dec"])  # bare macro
+        recent.append(e)
+        if len(recent) > 200:
+            recent.pop(0)
+        yield e
+
+
+def render_bibtex(e: Dict[str, str]) -> str:
+    lines = [f"@{e['ENTRYTYPE']}{{{e['ID']},"]
+    fields = [(k, v) for k, v in e.items() if k not in ("ENTRYTYPE", "ID")]
+    for idx, (k, v) in enumerate(fields):
+        if k == "author":
+            v = v.replace(" and ", " and\n                  ")
+        if k == "month" or (v.startswith('"') and v.endswith('"')):
+            val = v
+        else:
+            val = "{" + v + "}"
+        lines.append(f"  {k:<12} = {val}" + ("," if idx < len(fields) - 1 else ""))
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def generate_bibtex(n: int, seed: int = 0) -> str:
+    return "\n".join(render_bibtex(e) for e in generate_entries(n, seed))
+
+
+def render_index_md(e: Dict[str, str]) -> str:
+    """Front matter in the layout the importers write into content/publication."""
+    title = e["title"].replace("{", "").replace("}", "")
+    lines = ["---", 'title: "{}"'.format(title.replace('"', '\\"')), "authors:"]
+    lines += ['  - "{}"'.format(a) for a in e["author"].split(" and ")]
+    date = f"{e['year']}-01-01T00:00:00Z"
+    pdf = f"https://arxiv.org/pdf/{e['eprint']}.pdf" if e.get("eprint") else ""
+    lines += [f"date: '{date}'", f"publishDate: '{date}'", "draft: false",
+              'publication: "{}"'.format("arXiv" if pdf else e.get("journal") or e.get("booktitle", "")[:60]),
+              f'url_pdf: "{pdf}"', "image:", "  preview_only: true", "---", ""]
+    return "\n".join(lines)
+
+
+def bundle_slug(e: Dict[str, str], i: int) -> str:
+    words = re.sub(r"[^a-z0-9]+", "-", " ".join(e["title"].lower().split()[:8])).strip("-")
+    return f"{words}-{i}-{e['year']}"
+
+
+def write_bundle_tree(root: Path, n: int, seed: int = 0):
+    root.mkdir(parents=True, exist_ok=True)
+    for i, e in enumerate(generate_entries(n, seed)):
+        d = root / bundle_slug(e, i)
+        d.mkdir(exist_ok=True)
+        (d / "index.md").write_text(render_index_md(e), encoding="utf-8")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--entries", type=int, required=True)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--bib", type=Path, default=None, help="Write BibTeX here")
+    ap.add_argument("--bundles", type=Path, default=None, help="Write a Hugo bundle tree (<slug>/index.md) here")
+    args = ap.parse_args()
+    if not args.bib and not args.bundles:
+        ap.error("give --bib and/or --bundles")
+    if args.bib:
+        with args.bib.open("w", encoding="utf-8") as f:
+            for e in generate_entries(args.entries, args.seed):
+                f.write(render_bibtex(e) + "\n")
+        print(f"Wrote {args.entries} entries to {args.bib}")
+    if args.bundles:
+        write_bundle_tree(args.bundles, args.entries, args.seed)
+        print(f"Wrote {args.entries} bundles under {args.bundles}")
+
+
+if __name__ == "__main__":
+    main()
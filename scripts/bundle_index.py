@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Persistent index of the bundles already in content/publication: normalized title,
+arXiv id and DOI -> bundle folder.
+
+The importers slug the same paper differently (python-slugify of title[:80]-year in the
+Scholar scripts, extract.py's own slugify for DBLP), so "does <out>/<slug> exist" misses
+papers that are already there under another name. Writers ask the index instead:
+
+    index = BundleIndex(out_dir).refresh()
+    pub_folder = index.place(out_dir / slug, title=title, url_pdf=pdf, publication=venue, doi=doi)
+    ... write pub_folder / "index.md" ...
+    index.record(pub_folder)
+    index.save()
+
+place() returns the existing folder for the paper when there is one (update in place)
+and the writer's own path otherwise; every lookup is a dict hit. refresh() re-reads only
+the index.md files whose mtime changed since the index was saved, so keeping it current
+costs one scandir + stat per bundle.
+
+The index is kept out of the site tree, next to the importers' other state in
+$BUNDLE_INDEX_DIR (default $CACHE_DIR/bundle_index), one file per content directory;
+deleting it is always safe.
+
+  python scripts/bundle_index.py content/publication                 # refresh + summary
+  python scripts/bundle_index.py content/publication --find "Some Title"
+"""
+
+from __future__ import annotations
+import os
+import re
+import json
+import hashlib
+import pathlib
+import argparse
+from typing import Dict, List, Optional
+
+from textnorm import title_key
+from front_matter import FrontMatter
+
+CACHE_DIR = pathlib.Path(os.environ.get("CACHE_DIR", "/home/huajzhang/pub_cache"))  # as in scholar_IPs.py
+BUNDLE_INDEX_DIR = pathlib.Path(os.environ.get("BUNDLE_INDEX_DIR", str(CACHE_DIR / "bundle_index")))
+INDEX_VERSION = 2  # 2: arXiv ids also from "arXiv.<id>" (the 10.48550/arXiv.<id> DOIs)
+
+# the one arXiv id rule of the importers: BundleIndex keys and merge_sources' dedup use it
+_ARXIV_RE = re.compile(r"(?:arxiv\.org/(?:abs|pdf)/|arxiv[:.]\s*)(\d{4}\.\d{4,5})", re.IGNORECASE)
+_DOI_RE = re.compile(r"(?:doi\.org/|/doi/(?:pdf/|abs/|full/)*)(10\.\d{4,9}/[^\s?#\"']+)", re.IGNORECASE)
+
+
+def arxiv_id_of(*texts: str) -> str:
+    for t in texts:
+        m = _ARXIV_RE.search(t or "")
+        if m:
+            return m.group(1)
+    return ""
+
+
+def doi_of(doi: str = "", url: str = "") -> str:
+    if not doi:
+        m = _DOI_RE.search(url or "")
+        doi = m.group(1) if m else ""
+    doi = doi.strip().lower()
+    return doi[:-4] if doi.endswith(".pdf") else doi
+
+
+def bundle_keys(title: str = "", url_pdf: str = "", publication: str = "", doi: str = "") -> Dict[str, str]:
+    return {
+        "title": title_key(title or ""),
+        "arxiv": arxiv_id_of(url_pdf, publication),
+        "doi": doi_of(doi, url_pdf),
+    }
+
+
+class BundleIndex:
+    def __init__(self, root: pathlib.Path, path: Optional[pathlib.Path] = None):
+        self.root = pathlib.Path(root)
+        if path is None:
+            digest = hashlib.sha1(str(self.root.resolve()).encode("utf-8")).hexdigest()[:16]
+            path = BUNDLE_INDEX_DIR / f"{digest}.json"
+        self.path = path
+        self.entries: Dict[str, Dict] = {}   # folder name -> {"mtime_ns", "title", "arxiv", "doi"}
+        self._by: Dict[str, Dict[str, str]] = {"doi": {}, "arxiv": {}, "title": {}}
+        self._dirty = False
+
+    # ---------- build ----------
+
+    def _load(self):
+        try:
+            saved = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if saved.get("version") == INDEX_VERSION and saved.get("root") == str(self.root.resolve()):
+            self.entries = saved.get("bundles", {})
+
+    @staticmethod
+    def _read_keys(index_md: pathlib.Path) -> Dict[str, str]:
+        fm = FrontMatter.read(index_md)
+        return bundle_keys(
+            title=fm.get("title") or "",
+            url_pdf=fm.get("url_pdf") or "",
+            publication=fm.get("publication") or "",
+            doi=fm.get("doi") or "",
+        )
+
+    def refresh(self) -> "BundleIndex":
+        """Load the saved index, then re-read only bundles that are new or changed on disk."""
+        if not self.entries:
+            self._load()
+        seen = set()
+        if self.root.is_dir():
+            with os.scandir(self.root) as it:
+                for d in it:
+                    if not d.is_dir():
+                        continue
+                    index_md = pathlib.Path(d.path) / "index.md"
+                    try:
+                        mtime_ns = index_md.stat().st_mtime_ns
+                    except OSError:
+                        continue
+                    seen.add(d.name)
+                    old = self.entries.get(d.name)
+                    if old is None or old["mtime_ns"] != mtime_ns:
+                        self.entries[d.name] = dict(self._read_keys(index_md), mtime_ns=mtime_ns)
+                        self._dirty = True
+        for gone in set(self.entries) - seen:
+            del self.entries[gone]
+            self._dirty = True
+        self._rebuild_maps()
+        return self
+
+    def _rebuild_maps(self):
+        self._by = {"doi": {}, "arxiv": {}, "title": {}}
+        for name in sorted(self.entries):
+            self._post(name, self.entries[name])
+
+    def _post(self, name: str, entry: Dict):
+        for kind, table in self._by.items():
+            if entry.get(kind):
+                table.setdefault(entry[kind], name)
+
+    # ---------- lookups ----------
+
+    def find(self, title: str = "", url_pdf: str = "", publication: str = "", doi: str = "") -> Optional[pathlib.Path]:
+        """Existing folder of this paper, by DOI, then arXiv id, then normalized title."""
+        keys = bundle_keys(title, url_pdf, publication, doi)
+        for kind in ("doi", "arxiv", "title"):
+            name = keys[kind] and self._by[kind].get(keys[kind])
+            if name:
+                return self.root / name
+        return None
+
+    def place(self, default_dir: pathlib.Path, **keys: str) -> pathlib.Path:
+        """Where a writer should put this paper: its existing folder, else default_dir."""
+        return self.find(**keys) or pathlib.Path(default_dir)
+
+    def record(self, bundle_dir: pathlib.Path):
+        """Index a bundle the caller has just (re)written."""
+        bundle_dir = pathlib.Path(bundle_dir)
+        index_md = bundle_dir / "index.md"
+        if bundle_dir.parent.resolve() != self.root.resolve() or not index_md.exists():
+            return
+        old = self.entries.get(bundle_dir.name)
+        entry = dict(self._read_keys(index_md), mtime_ns=index_md.stat().st_mtime_ns)
+        self.entries[bundle_dir.name] = entry
+        self._dirty = True
+        if old and any(old.get(k) != entry.get(k) for k in self._by):
+            self._rebuild_maps()  # keys changed: drop the stale ones
+        else:
+            self._post(bundle_dir.name, entry)
+
+    def forget(self, bundle_dir: pathlib.Path):
+        if self.entries.pop(pathlib.Path(bundle_dir).name, None) is not None:
+            self._dirty = True
+            self._rebuild_maps()
+
+    def save(self):
+        if not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"version": INDEX_VERSION, "root": str(self.root.resolve()),
+                                   "bundles": self.entries}, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, self.path)
+        self._dirty = False
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("root", type=pathlib.Path, help="content/publication directory")
+    ap.add_argument("--find", default="", help="Title to look up")
+    ap.add_argument("--url", default="", help="url_pdf to look up (arXiv id / DOI)")
+    args = ap.parse_args()
+
+    index = BundleIndex(args.root).refresh()
+    index.save()
+    counts: List[str] = [f"{len(table)} {kind}" for kind, table in index._by.items()]
+    print(f"{len(index.entries)} bundles indexed in {index.path} ({', '.join(counts)} keys)")
+    if args.find or args.url:
+        print(index.find(title=args.find, url_pdf=args.url) or "not found")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Pack the Scholar importer's cache into one versioned, checksummed snapshot, and restore
+it elsewhere, so a fresh CI runner starts as warm as the machine that made it.
+
+  python scripts/cache_snapshot.py export pub_cache.tar.gz      # CACHE_DIR -> snapshot
+  python scripts/cache_snapshot.py import pub_cache.tar.gz      # snapshot -> CACHE_DIR
+  python scripts/cache_snapshot.py verify pub_cache.tar.gz
+
+What goes in (from CACHE_DIR and its shard-i-of-N dirs):
+  scholar_<id>.jsonl             per-author publication cache
+  scholar_<id>.fingerprint.json  profile fingerprints (conditional refresh)
+  run_journal.jsonl              fetch journal (resume + per-author freshness)
+  pdf_ok.json                    PDF link verdicts
+Left out on purpose: rate_state.json (the pacing/breaker state belongs to the IP that
+earned it), stage_digests.json (refers to bundle files on the exporting machine),
+run_metrics.json and *.lock.
+
+The archive (gzip, or xz for a .xz name) starts with MANIFEST.json: the snapshot
+format version and the sha256 and size of every file. Import checks all of them before
+anything in CACHE_DIR is touched, then moves the files in one by one with os.replace
+under the same sidecar locks the importer uses. Existing files are kept unless
+--overwrite is given.
+"""
+
+from __future__ import annotations
+import io
+import os
+import re
+import sys
+import json
+import lzma
+import time
+import zlib
+import socket
+import hashlib
+import pathlib
+import tarfile
+import argparse
+import tempfile
+from typing import Dict, Iterator, List, Tuple
+
+from file_lock import file_lock  # the sidecar locks the importer takes on the same files
+
+CACHE_DIR = pathlib.Path(os.environ.get("CACHE_DIR", "/home/huajzhang/pub_cache"))
+
+SNAPSHOT_FORMAT = 1
+MANIFEST = "MANIFEST.json"
+# every name a snapshot may contain; anything else (or any path trickery) is rejected
+_NAME_RE = re.compile(
+    r"(?:shard-\d+-of-\d+/)?"
+    r"(?:scholar_[A-Za-z0-9_-]+\.(?:jsonl|fingerprint\.json)|run_journal\.jsonl|pdf_ok\.json)"
+)
+
+
+class SnapshotError(Exception):
+    pass
+
+
+def cache_files(cache_dir: pathlib.Path) -> Iterator[Tuple[str, pathlib.Path]]:
+    """(snapshot name, path) of every file that belongs in a snapshot."""
+    dirs = [cache_dir, *sorted(cache_dir.glob("shard-*-of-*"))]
+    for d in dirs:
+        prefix = "" if d == cache_dir else f"{d.name}/"
+        for path in sorted(d.iterdir()):
+            name = prefix + path.name
+            if path.is_file() and _NAME_RE.fullmatch(name):
+                yield name, path
+
+
+def export_snapshot(cache_dir: pathlib.Path, out: pathlib.Path) -> Dict[str, dict]:
+    blobs: Dict[str, Tuple[bytes, float]] = {}
+    for name, path in cache_files(cache_dir):
+        with file_lock(path, shared=True):
+            blobs[name] = (path.read_bytes(), path.stat().st_mtime)
+    files = {name: {"sha256": hashlib.sha256(data).hexdigest(), "size": len(data)}
+             for name, (data, _) in blobs.items()}
+    manifest = {
+        "format": SNAPSHOT_FORMAT,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "host": socket.gethostname(),
+        "files": files,
+    }
+    out.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out.with_name(out.name + ".tmp")
+    with tarfile.open(tmp, "w:xz" if out.suffix == ".xz" else "w:gz") as tar:
+        entries = [(MANIFEST, json.dumps(manifest, indent=1, sort_keys=True).encode("utf-8"), time.time())]
+        entries += [(name, data, mtime) for name, (data, mtime) in sorted(blobs.items())]
+        for name, data, mtime in entries:
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mtime = int(mtime)
+            tar.addfile(info, io.BytesIO(data))
+    os.replace(tmp, out)
+    return files
+
+
+def read_snapshot(src: pathlib.Path) -> Tuple[dict, Dict[str, bytes]]:
+    """Return (manifest, name -> bytes), or raise SnapshotError if anything does not check out."""
+    try:
+        tar = tarfile.open(src, "r:*")
+    except (OSError, EOFError, tarfile.TarError, zlib.error, lzma.LZMAError) as e:
+        raise SnapshotError(f"cannot open {src}: {e}")
+    with tar:
+        blobs: Dict[str, bytes] = {}
+        try:
+            for member in tar:
+                if not member.isfile():
+                    raise SnapshotError(f"unexpected non-file entry {member.name!r}")
+                if member.name != MANIFEST and not _NAME_RE.fullmatch(member.name):
+                    raise SnapshotError(f"unexpected entry {member.name!r}")
+                blobs[member.name] = tar.extractfile(member).read()
+        except (OSError, EOFError, tarfile.TarError, zlib.error, lzma.LZMAError) as e:
+            raise SnapshotError(f"{src} is truncated or corrupt: {e}")
+    if MANIFEST not in blobs:
+        raise SnapshotError("no MANIFEST.json; not a cache snapshot")
+    try:
+        manifest = json.loads(blobs.pop(MANIFEST))
+    except ValueError as e:
+        raise SnapshotError(f"unreadable MANIFEST.json: {e}")
+    if not isinstance(manifest, dict):
+        raise SnapshotError("MANIFEST.json is not an object")
+    fmt = manifest.get("format")
+    if fmt != SNAPSHOT_FORMAT:
+        raise SnapshotError(f"snapshot format {fmt!r}; this script reads format {SNAPSHOT_FORMAT}")
+    expected = manifest.get("files", {})
+    missing = sorted(set(expected) - set(blobs))
+    extra = sorted(set(blobs) - set(expected))
+    if missing or extra:
+        raise SnapshotError(f"manifest mismatch: missing {missing[:5]}, unlisted {extra[:5]}")
+    for name, data in blobs.items():
+        want = expected[name]
+        if len(data) != want["size"] or hashlib.sha256(data).hexdigest() != want["sha256"]:
+            raise SnapshotError(f"checksum mismatch for {name}")
+    return manifest, blobs
+
+
+def import_snapshot(src: pathlib.Path, cache_dir: pathlib.Path, overwrite: bool = False) -> Tuple[List[str], List[str]]:
+    """Verify everything first, then move files into cache_dir. Returns (restored, kept)."""
+    _, blobs = read_snapshot(src)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    restored: List[str] = []
+    kept: List[str] = []
+    with tempfile.TemporaryDirectory(prefix=".snapshot-", dir=cache_dir) as staging:
+        for name, data in sorted(blobs.items()):
+            dst = cache_dir / name
+            if dst.exists() and not overwrite:
+                kept.append(name)
+                continue
+            dst.parent.mkdir(parents=True, exist_ok=True)
+            tmp = pathlib.Path(staging) / name.replace("/", "__")
+            tmp.write_bytes(data)
+            with file_lock(dst):
+                os.replace(tmp, dst)
+            restored.append(name)
+    return restored, kept
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("command", choices=("export", "import", "verify"))
+    ap.add_argument("snapshot", type=pathlib.Path)
+    ap.add_argument("--cache-dir", type=pathlib.Path, default=CACHE_DIR, help="Default: $CACHE_DIR")
+    ap.add_argument("--overwrite", action="store_true", help="import: replace files that already exist")
+    args = ap.parse_args()
+
+    try:
+        if args.command == "export":
+            if not args.cache_dir.is_dir():
+                raise SnapshotError(f"no cache at {args.cache_dir}")
+            files = export_snapshot(args.cache_dir, args.snapshot)
+            total = sum(f["size"] for f in files.values())
+            print(f"Exported {len(files)} files ({total / 1e6:.1f} MB) from {args.cache_dir} "
+                  f"to {args.snapshot} ({args.snapshot.stat().st_size / 1e6:.1f} MB)")
+        elif args.command == "verify":
+            manifest, blobs = read_snapshot(args.snapshot)
+            print(f"OK: format {manifest['format']}, {len(blobs)} files, "
+                  f"created {manifest.get('created')} on {manifest.get('host')}")
+        else:
+            restored, kept = import_snapshot(args.snapshot, args.cache_dir, args.overwrite)
+            print(f"Restored {len(restored)} files into {args.cache_dir}"
+                  + (f"; kept {len(kept)} existing (use --overwrite to replace)" if kept else ""))
+    except SnapshotError as e:
+        print(f"Snapshot error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
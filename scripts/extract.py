@@ -7,6 +7,10 @@ import argparse
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
+from textnorm import norm_title, title_first_n_words, slugify
+from bundle_index import BundleIndex
+from publications_data import PublicationsData, importer_entry
+
 MONTHS = {
     "January": 1, "February": 2, "March": 3, "April": 4,
     "May": 5, "June": 6, "July": 7, "August": 8,
@@ -134,21 +138,6 @@ def parse_bibtex_entries(text: str) -> List[Dict[str, str]]:
 # ----------------------------
 # Helpers
 # ----------------------------
-def norm_title(t: str) -> str:
-    t = t.lower()
-    t = re.sub(r"[{}]", "", t)
-    t = re.sub(r"[^a-z0-9]+", " ", t)
-    t = re.sub(r"\s+", " ", t).strip()
-    return t
-
-def title_first_n_words(title: str, n: int = 4) -> str:
-    t = title.lower()
-    t = re.sub(r"[{}]", "", t)
-    t = re.sub(r"[^a-z0-9]+", " ", t)
-    t = re.sub(r"\s+", " ", t).strip()
-    words = t.split()
-    return " ".join(words[:n])
-
 def split_authors(author_field: str) -> List[str]:
     return [p.strip() for p in author_field.split(" and ") if p.strip()]
 
@@ -341,26 +330,38 @@ def dedup_entries(entries: List[Dict[str, str]]) -> List[Dict[str, str]]:
 # ----------------------------
 # Hugo writer
 # ----------------------------
-def slugify(title: str, year: str, max_len: int = 80) -> str:
-    s = title.lower()
-    s = s.replace("&", "and")
-    s = re.sub(r"[{}]", "", s)
-    s = re.sub(r"[^a-z0-9]+", "-", s)
-    s = re.sub(r"-+", "-", s).strip("-")
-    if len(s) > max_len:
-        parts = s.split("-")
-        out = []
-        total = 0
-        for p in parts:
-            if not p:
-                continue
-            add = len(p) + (1 if out else 0)
-            if total + add > max_len:
-                break
-            out.append(p)
-            total += add
-        s = "-".join(out) if out else s[:max_len].rstrip("-")
-    return f"{s}-{year}"
+def entry_bundle(e: Dict[str, str]) -> Optional[Dict[str, object]]:
+    """
+    Front-matter fields for one deduped entry (title, authors, date_iso, publication,
+    url_pdf, plus year and arxiv id); None when it has no title or authors.
+    """
+    title = (e.get("title") or "").strip()
+    if not title:
+        return None
+
+    year = e.get("year", "1900").strip()
+    arx = extract_arxiv_id(e)
+
+    if arx and not is_non_arxiv_pub(e):
+        publication = f"arXiv:{arx}"
+    else:
+        publication = venue_with_year(e)
+        # publication = venue_short(e)
+
+    date_iso = extract_date_iso(e, arx)
+    authors = split_authors(e.get("author", ""))
+    if not authors:
+        return None  # (1) no author => ignore
+
+    return {
+        "title": strip_bib_braces(title),
+        "authors": [strip_bib_braces(a) for a in authors],
+        "date_iso": date_iso,
+        "publication": publication,
+        "url_pdf": pick_pdf_url(e, arx),
+        "year": year,
+        "arxiv": arx,
+    }
 
 
 def to_index_md(title, authors, date_iso, publication, url_pdf):
@@ -390,11 +391,15 @@ def main():
     ap.add_argument("--bib", type=str, required=True, help="Path to .bib file (downloaded from DBLP)")
     ap.add_argument("--out", type=str, required=True, help="Path to content/publication directory")
     ap.add_argument("--min_year", type=int, default=2022, help="Keep publications with year >= min_year")
+    ap.add_argument("--data", type=str, default=None,
+                    help="Write entries to this Hugo data file (e.g. data/publications.json) instead of bundles")
     args = ap.parse_args()
 
     bib_path = Path(args.bib)
     out_dir = Path(args.out)
     out_dir.mkdir(parents=True, exist_ok=True)
+    bundles = BundleIndex(out_dir).refresh()  # papers already there, whatever their slug
+    data = PublicationsData(Path(args.data)).load() if args.data else None
 
     text = bib_path.read_text(encoding="utf-8", errors="ignore")
     raw_entries = parse_bibtex_entries(text)
@@ -413,42 +418,37 @@ def main():
 
     # write
     for e in final_entries:
-        title = (e.get("title") or "").strip()
-        if not title:
+        b = entry_bundle(e)
+        if b is None:
             continue
 
-        year = e.get("year", "1900").strip()
-        arx = extract_arxiv_id(e)
-
-        if arx and not is_non_arxiv_pub(e):
-            publication = f"arXiv:{arx}"
-        else:
-            publication = venue_with_year(e)
-            # publication = venue_short(e)
-
-        date_iso = extract_date_iso(e, arx)
-        authors = split_authors(e.get("author", ""))
-        if not authors:
-            continue  # (1) no author => ignore
-
-        title = strip_bib_braces((e.get("title") or "").strip())
-        authors = [strip_bib_braces(a) for a in split_authors(e.get("author", ""))]
-
-        url_pdf = pick_pdf_url(e, arx)
-
-        slug = slugify(title, year)
-        pub_folder = out_dir / slug
+        slug = slugify(b["title"], b["year"])
+        pub_folder = bundles.place(out_dir / slug, title=b["title"], url_pdf=b["url_pdf"] or "",
+                                   publication=b["publication"], doi=e.get("doi", ""))
+        if data is not None:
+            if not pub_folder.exists():
+                pub_folder = out_dir / data.place(pub_folder.name, title=b["title"], url_pdf=b["url_pdf"] or "",
+                                                  publication=b["publication"], doi=e.get("doi", ""))
+            data.put(importer_entry(pub_folder, b["title"], b["authors"], b["date_iso"],
+                                    b["publication"], b["url_pdf"] or ""))
+            continue
         pub_folder.mkdir(parents=True, exist_ok=True)
 
         index_md = to_index_md(
-            title=title,
-            authors=authors,
-            date_iso=date_iso,
-            publication=publication,
-            url_pdf=url_pdf,
+            title=b["title"],
+            authors=b["authors"],
+            date_iso=b["date_iso"],
+            publication=b["publication"],
+            url_pdf=b["url_pdf"],
         )
         (pub_folder / "index.md").write_text(index_md, encoding="utf-8")
+        bundles.record(pub_folder)
 
+    if data is not None:
+        data.save()
+        print(f"Done. Wrote {len(final_entries)} publications into: {args.data}")
+        return
+    bundles.save()
     print(f"Done. Wrote {len(final_entries)} publication folders into: {out_dir}")
 
 
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+Advisory sidecar locks on the Scholar cache files, shared by scholar_IPs.py (shards
+appending to one CACHE_DIR) and cache_snapshot.py (export/import next to a running
+importer), so restoring a snapshot does not have to import the importer.
+"""
+
+from __future__ import annotations
+import pathlib
+from contextlib import contextmanager
+
+try:
+    import fcntl  # POSIX only; without it cache appends are simply unlocked
+except ImportError:
+    fcntl = None
+
+
+@contextmanager
+def file_lock(path: pathlib.Path, shared: bool = False):
+    """
+    Advisory lock on a sidecar `<path>.lock`, so shards sharing a CACHE_DIR can append
+    to the same files safely (the sidecar survives os.replace of the real file).
+    """
+    if fcntl is None:
+        yield
+        return
+    lock_path = path.with_name(path.name + ".lock")
+    with lock_path.open("a") as lf:
+        fcntl.flock(lf.fileno(), fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lf.fileno(), fcntl.LOCK_UN)
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+index.md front matter, parsed once and written back in place: FrontMatter, the
+single-field helpers yaml_get_field/yaml_set_field, and write_atomic.
+
+Shared by the scripts that read or write page bundles (post_google_scholar.py,
+bundle_index.py, publications_data.py, pdf_mirror.py), so none of them has to import
+another script's CLI to get at it.
+"""
+
+from __future__ import annotations
+import os
+import shutil
+from pathlib import Path
+from typing import Optional
+
+
+def _scalar(line: str) -> str:
+    raw = line.split(":", 1)[1].strip()
+    # strip surrounding quotes if present
+    if (raw.startswith('"') and raw.endswith('"')) or (raw.startswith("'") and raw.endswith("'")):
+        raw = raw[1:-1]
+    return raw.strip()
+
+class FrontMatter:
+    """
+    An index.md parsed once: the front matter lines plus a key -> line index, so get()
+    and set() are dict lookups. Lines that are not set() are written back byte for byte;
+    new keys go before the closing '---'. Files without front matter read as empty and
+    ignore set().
+    """
+
+    def __init__(self, lines: list[str]):
+        self.head: Optional[list[str]] = None  # '---' + front matter lines
+        self.rest = lines                       # closing '---' and the body
+        self.changed = False
+        self._top: dict[str, int] = {}          # key -> first unindented "key:" line (get)
+        self._any: dict[str, int] = {}          # key -> first "key:" line, any indent (set)
+        if not lines or lines[0].strip() != "---":
+            return
+        for end in range(1, len(lines)):
+            if lines[end].strip() == "---":
+                break
+        else:
+            return
+        self.head, self.rest = lines[:end], lines[end:]
+        for i in range(1, end):
+            line = self.head[i]
+            stripped = line.strip()
+            key, sep, _ = stripped.partition(":")
+            key = key.rstrip()
+            if not sep or not key or key.startswith("#"):
+                continue  # not a "key:" line (a comment may contain a colon)
+            self._any.setdefault(key, i)
+            if line[:1] == stripped[:1]:
+                self._top.setdefault(key, i)
+
+    @classmethod
+    def read(cls, path: Path) -> "FrontMatter":
+        return cls(path.read_text(encoding="utf-8", errors="ignore").splitlines(keepends=True))
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Read a simple YAML scalar from front matter: key: "..." or key: '...'
+        """
+        i = self._top.get(key)
+        if i is None:
+            return None
+        return _scalar(self.head[i])
+
+    def set(self, key: str, value: str):
+        """
+        Replace a field like  key: '...'  (the site's style: single quotes), or add it
+        before the closing '---' if it is not there.
+        """
+        if self.head is None:
+            return  # not a standard front matter file
+        new_line = f"{key}: '{value}'\n"
+        i = self._any.get(key)
+        if i is None:
+            i = len(self.head)
+            self.head.append(new_line)
+            self._any[key] = i
+        elif self.head[i] == new_line:
+            return
+        else:
+            self.head[i] = new_line
+        self._top[key] = i
+        self.changed = True
+
+    def keys(self) -> list[str]:
+        """Top-level keys, in file order."""
+        return sorted(self._top, key=self._top.get)
+
+    def raw(self, key: str) -> Optional[str]:
+        """The text after 'key:' with its quotes and escapes, for callers that unquote themselves."""
+        i = self._top.get(key)
+        return None if i is None else self.head[i].split(":", 1)[1].strip()
+
+    def raw_items(self, key: str) -> list[str]:
+        """Entries of a block list under a top-level key ('  - "A"' -> '"A"'), quotes kept."""
+        i = self._top.get(key)
+        items: list[str] = []
+        if i is None:
+            return items
+        for line in self.head[i + 1:]:
+            stripped = line.strip()
+            if line[:1] == stripped[:1] and stripped:
+                break  # next top-level key
+            if stripped.startswith("- "):
+                items.append(stripped[2:].strip())
+        return items
+
+    def body(self) -> str:
+        """Everything after the closing '---'."""
+        return "".join(self.rest[1:]) if self.head is not None else "".join(self.rest)
+
+    def lines(self) -> list[str]:
+        return self.rest if self.head is None else self.head + self.rest
+
+    def text(self) -> str:
+        return "".join(self.lines())
+
+
+def yaml_set_field(lines: list[str], key: str, value: str) -> list[str]:
+    """Single-field FrontMatter.set() on a list of lines (updated in place)."""
+    fm = FrontMatter(lines)
+    fm.set(key, value)
+    lines[:] = fm.lines()
+    return lines
+
+def yaml_get_field(lines: list[str], key: str) -> Optional[str]:
+    """Single-field FrontMatter.get() without building the index; use FrontMatter to read several."""
+    if not lines or lines[0].strip() != "---":
+        return None
+    found = None
+    for i in range(1, len(lines)):
+        line = lines[i]
+        if line.strip() == "---":
+            return None if found is None else _scalar(found)
+        if found is None and line.startswith(key):
+            head, sep, _ = line.partition(":")
+            if sep and head.rstrip() == key:
+                found = line
+    return None
+
+
+def write_atomic(path: Path, text: str, mode_from: Path):
+    """Write via a temp file + rename: readers never see half a file, and a hardlink at path is replaced, not written through."""
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(text, encoding="utf-8")
+    shutil.copymode(mode_from, tmp)
+    os.replace(tmp, path)
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Pre-generate the resized JPEG/WebP images the templates show, so Hugo does not resize
+multi-MB originals (author avatars, event featured images) on every cold build.
+
+  python scripts/image_derivatives.py                 # from the site root
+  python scripts/image_derivatives.py --jobs 4 --dry-run
+
+For every source matched by DERIVATIVES it writes
+  static/derived/<page dir>/<stem>-<size>.jpg (.png for PNG sources) and .webp
+and records them in data/derived_images.json:
+  {"format", "specs", "images": {"authors/G-Biddut/avatar.jpg":
+      {"sha1": ..., "270x270": {"jpg": "derived/...", "webp": "derived/...", "width", "height"}}}}
+layouts/partials/derived_image.html looks them up; people.html and the event layouts
+use them when the source has an entry and fall back to Hugo's own resizing (or the
+original) when it has not. Only images a layout here reads get a DERIVATIVES entry:
+post pages are rendered by the theme module, so post images are left to Hugo.
+
+The data file is also the cache: a source whose content hash (and the spec set) is
+unchanged and whose outputs exist is skipped, so a rerun only processes new or changed
+images. Hashing and resizing run in a process pool (--jobs, default one per CPU).
+Outputs of deleted sources are removed. Commit static/derived and the data file with
+the images, like the content they come from.
+
+Needs Pillow (scripts/requirements.txt) only when something has to be generated.
+"""
+
+from __future__ import annotations
+import os
+import json
+import hashlib
+import argparse
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # only needed when an image has to be (re)generated
+    Image = ImageOps = None
+
+QUALITY = 75  # Hugo's default JPEG/WebP quality
+DERIVE_VERSION = 1  # bump when the resizing/encoding below changes output
+DATA_FORMAT = 1
+
+
+class Derivative:
+    """Sources matching pattern (relative to content/) get one image of this size."""
+
+    def __init__(self, pattern: str, op: str, width: int, height: int = 0):
+        self.pattern = pattern
+        self.op = op  # "fill": crop to width x height around the centre; "fit": scale down to width
+        self.width = width
+        self.height = height
+        self.size = f"{width}x{height or ''}"
+
+
+DERIVATIVES = (
+    Derivative("authors/*/avatar.*", "fill", 270, 270),  # people.html: $avatar.Fill "270x270 Center"
+    Derivative("event/*/featured.*", "fit", 720),        # event list cards and page sidebar
+)
+_EXTS = {".jpg", ".jpeg", ".png", ".webp"}
+
+
+def specs_signature() -> str:
+    return f"{DERIVE_VERSION}:{QUALITY}:" + ",".join(f"{d.pattern}={d.op}{d.size}" for d in DERIVATIVES)
+
+
+def find_sources(content: Path) -> Dict[str, List[Derivative]]:
+    """content-relative source path -> the derivatives it gets."""
+    sources: Dict[str, List[Derivative]] = {}
+    for d in DERIVATIVES:
+        for p in sorted(content.glob(d.pattern)):
+            if p.suffix.lower() in _EXTS and p.is_file():
+                sources.setdefault(p.relative_to(content).as_posix(), []).append(d)
+    return sources
+
+
+def file_sha1(path: Path) -> str:
+    h = hashlib.sha1()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+# ---------- resizing (runs in the workers) ----------
+
+def _resize(img, d: Derivative):
+    if d.op == "fill":
+        return ImageOps.fit(img, (d.width, d.height), Image.LANCZOS, centering=(0.5, 0.5))
+    if img.width <= d.width:
+        return img  # never upscale
+    return img.resize((d.width, max(1, round(img.height * d.width / img.width))), Image.LANCZOS)
+
+
+def _save(img, path: Path, fmt: str):
+    """Encode via a temp file + rename, so a killed run never leaves half an image."""
+    tmp = path.with_name(path.name + ".tmp")
+    if fmt == "JPEG":
+        if img.mode not in ("RGB", "L"):
+            img = img.convert("RGB")
+        img.save(tmp, fmt, quality=QUALITY, optimize=True, progressive=True)
+    elif fmt == "PNG":
+        img.save(tmp, fmt, optimize=True)
+    else:
+        img.save(tmp, fmt, quality=QUALITY)
+    os.replace(tmp, path)
+
+
+def derive(content: Path, static: Path, rel: str, sizes: List[Derivative], prev: Optional[dict],
+           dry_run: bool = False) -> Tuple[dict, bool]:
+    """The data entry for one source and whether its images were (or would be) generated."""
+    src = content / rel
+    sha1 = file_sha1(src)
+    stem, ext = os.path.splitext(rel)
+    base = "jpg" if ext.lower() in (".jpg", ".jpeg", ".webp") else "png"
+    entry: dict = {"sha1": sha1}
+    for d in sizes:
+        entry[d.size] = {base: f"derived/{stem}-{d.size}.{base}", "webp": f"derived/{stem}-{d.size}.webp"}
+    if prev is not None and prev.get("sha1") == sha1 and all(
+            d.size in prev and all((static / prev[d.size][k]).exists() for k in (base, "webp")) for d in sizes):
+        return prev, False
+    if dry_run:
+        return entry, True
+    if Image is None:
+        raise RuntimeError("Pillow is not installed (pip install -r scripts/requirements.txt)")
+    with Image.open(src) as im:
+        im = ImageOps.exif_transpose(im)  # Hugo honours EXIF orientation too
+        for d in sizes:
+            out = _resize(im, d)
+            jpg = static / entry[d.size][base]
+            jpg.parent.mkdir(parents=True, exist_ok=True)
+            _save(out, jpg, "JPEG" if base == "jpg" else "PNG")
+            _save(out, static / entry[d.size]["webp"], "WEBP")
+            entry[d.size].update(width=out.width, height=out.height)
+    return entry, True
+
+
+def _derive_job(args):
+    return derive(*args)
+
+
+# ---------- data file ----------
+
+def load_data(path: Path) -> Tuple[Dict[str, dict], bool]:
+    """Entries of the last run, and whether they were made with the current specs."""
+    try:
+        saved = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}, False
+    current = saved.get("format") == DATA_FORMAT and saved.get("specs") == specs_signature()
+    return saved.get("images", {}), current
+
+
+def save_data(path: Path, images: Dict[str, dict]):
+    text = json.dumps({"format": DATA_FORMAT, "specs": specs_signature(), "images": images},
+                      indent=1, sort_keys=True) + "\n"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def output_paths(entry: dict) -> List[str]:
+    return [v for size in entry.values() if isinstance(size, dict) for k, v in size.items() if isinstance(v, str)]
+
+
+def remove_outputs(static: Path, paths: List[str]):
+    for rel in paths:
+        p = static / rel
+        try:
+            p.unlink()
+            p.parent.rmdir()  # only if nothing else lives there
+        except OSError:
+            pass
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--content", type=Path, default=Path("content"), help="Hugo content directory")
+    ap.add_argument("--static", type=Path, default=Path("static"), help="Hugo static directory (outputs go to <static>/derived)")
+    ap.add_argument("--data", type=Path, default=Path("data/derived_images.json"), help="Data file the templates read")
+    ap.add_argument("--jobs", type=int, default=0, help="Images processed in parallel (0 = one per CPU)")
+    ap.add_argument("--full", action="store_true", help="Ignore the data file and regenerate every image")
+    ap.add_argument("--dry-run", action="store_true", help="Report what would be generated")
+    args = ap.parse_args()
+
+    if not args.content.is_dir():
+        raise SystemExit(f"Content directory not found: {args.content}")
+    saved, current = load_data(args.data)
+    prev = saved if current and not args.full else {}
+    sources = find_sources(args.content)
+    # biggest first, so one large original does not finish last on an otherwise idle pool
+    order = sorted(sources, key=lambda rel: -(args.content / rel).stat().st_size)
+    jobs_in = [(args.content, args.static, rel, sources[rel], prev.get(rel), args.dry_run) for rel in order]
+
+    jobs = args.jobs or os.cpu_count() or 1
+    try:
+        if jobs <= 1 or len(jobs_in) < 2:
+            results = [_derive_job(j) for j in jobs_in]
+        else:
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                results = list(pool.map(_derive_job, jobs_in))
+    except RuntimeError as e:
+        raise SystemExit(f"image_derivatives.py: {e}")
+
+    images = {rel: entry for rel, (entry, _) in zip(order, results)}
+    generated = [rel for rel, (_, gen) in zip(order, results) if gen]
+    if args.dry_run:
+        for rel in generated:
+            print(f"[DRY_RUN] would generate {', '.join(d.size for d in sources[rel])} for {rel}")
+        print(f"[DRY_RUN] {len(generated)} of {len(images)} images need generating")
+        return
+
+    removed = 0
+    for rel, old in saved.items():
+        stale = set(output_paths(old)) - set(output_paths(images.get(rel, {})))
+        remove_outputs(args.static, sorted(stale))
+        removed += rel not in images
+    save_data(args.data, images)
+    print(f"{len(images)} source images: generated {len(generated)}, "
+          f"{len(images) - len(generated)} unchanged skipped; outputs of {removed} deleted sources removed.")
+
+
+if __name__ == "__main__":
+    main()
@@ -23,15 +23,18 @@ import pathlib
 from urllib.parse import urlparse, parse_qs
 from datetime import datetime
 from typing import Iterable, List, Dict, Any
-from slugify import slugify
 
 from scholarly import scholarly, ProxyGenerator
+import scholar_cassette  # record/replay via SCHOLAR_CASSETTE (scripts/scholar_cassette.py)
+from textnorm import normalize_authors, scholar_slug
+from bundle_index import BundleIndex
 
 # ----------------- CONFIG -----------------
 YEAR_FROM = int(os.environ.get("YEAR_FROM", "2024"))
 OUT_DIR   = pathlib.Path(os.environ.get("OUT_DIR", "content/publication"))
 DRY_RUN   = os.environ.get("DRY_RUN", "0") == "1"
 SLEEP_BETWEEN_AUTHORS = float(os.environ.get("SLEEP_BETWEEN_AUTHORS", "2.0"))  # seconds
+BUNDLES = BundleIndex(OUT_DIR)  # what content/publication already holds (scripts/bundle_index.py)
 # ------------------------------------------
 
 
@@ -228,15 +231,6 @@ def read_inputs() -> List[str]:
             seen.add(sid)
     return out
 
-def normalize_authors(bib_authors: str) -> List[str]:
-    """
-    Convert 'A. Author and B. Author' -> ['A. Author', 'B. Author']
-    """
-    if not bib_authors:
-        return []
-    parts = [p.strip() for p in re.split(r"\s+and\s+", bib_authors)]
-    return [re.sub(r"\s*\.\s*", ". ", p).strip() for p in parts if p]
-
 def year_to_iso(year: int) -> str:
     return f"{int(year):04d}-01-01T00:00:00Z"
 
@@ -305,8 +299,9 @@ def write_bundle(title: str, authors: List[str], year: int, month: int,
     fm.append("  preview_only: true")
     fm.append("---\n")
 
-    slug = slugify(f"{title[:80]}-{year}-{month:02d}")
-    dst_dir = OUT_DIR / slug
+    slug = scholar_slug(f"{title[:80]}-{year}-{month:02d}")
+    # update the paper in place if content/publication already has it under another slug
+    dst_dir = BUNDLES.place(OUT_DIR / slug, title=title, url_pdf=pdf_url, publication=venue)
     dst_dir.mkdir(parents=True, exist_ok=True)
     dst = dst_dir / "index.md"
     content = "\n".join(fm)
@@ -315,6 +310,7 @@ def write_bundle(title: str, authors: List[str], year: int, month: int,
         print(f"[DRY_RUN] Would write {dst}:\n{content}")
     else:
         dst.write_text(content, encoding="utf-8")
+        BUNDLES.record(dst_dir)
         print(f"Wrote {dst}")
 
 
@@ -401,6 +397,7 @@ def main():
         sys.exit(1)
 
     OUT_DIR.mkdir(parents=True, exist_ok=True)
+    BUNDLES.refresh()
 
     seen_titles = set()
     for sid in ids:
@@ -409,6 +406,9 @@ def main():
         except Exception as e:
             print(f"Error with {sid}: {e}")
         time.sleep(SLEEP_BETWEEN_AUTHORS)
+    if not DRY_RUN:
+        BUNDLES.save()
 
 if __name__ == "__main__":
+    scholar_cassette.install_from_env(sys.modules[__name__])
     main()
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+One merge stage for both publication sources: DBLP BibTeX (as read by extract.py) and
+the cached Scholar records of scholar_IPs.py. Each paper is written to content/publication once.
+
+  python scripts/merge_sources.py --bib publications.bib --out content/publication
+  python scripts/merge_sources.py --out content/publication          # Scholar cache only
+
+When PUB_BIB is set, run.sh runs it after `scholar_IPs.py --fetch-only`, which fills the
+Scholar cache and writes nothing; extract.py's DBLP import is replaced by --bib. Without
+PUB_BIB, run.sh lets scholar_IPs.py write the bundles itself. Per source, the existing rules run
+first: dedup_entries() for DBLP, merge_pub_lists() for Scholar. Then every surviving
+record gets:
+  - an arXiv id, if one can be found (bundle_index.arxiv_id_of, the same ids the
+    BundleIndex matches existing bundles on), and the normalized title key of titles_overlap(),
+  - the info_richness_score() of scholar_IPs.py, computed the same way for both
+    sources, so a DBLP entry with venue, DOI and pages beats a bare Scholar stub.
+Records that share an arXiv id, or whose titles are equal or overlap without carrying
+different arXiv ids, are one paper, and the richer record wins with scholar_IPs.supersedes().
+New bundles get extract.py's slug, so the slug does not change when the winning source
+does. Every bundle is rendered by scholar_IPs.render_bundle() (the url_pdf_local of a
+mirrored PDF included), and an index.md that already holds that text is not rewritten,
+so an unchanged paper keeps the mtime the BundleIndex, stage and manifest caches key on.
+With PUB_OUTPUT=data the entries go to PUB_DATA, as scholar_IPs.py does.
+"""
+
+from __future__ import annotations
+import argparse
+import pathlib
+from typing import Dict, List, Optional
+
+import extract
+import scholar_IPs
+from scholar_IPs import PubRecord, TitleIndex, info_richness_score, is_likely_pdf_url, supersedes
+from textnorm import title_key
+from bundle_index import BundleIndex, arxiv_id_of
+import publications_data
+from publications_data import PublicationsData, importer_entry
+
+
+class Paper:
+    """One candidate bundle, whichever source it came from."""
+
+    def __init__(self, source: str, title: str, authors: List[str], date_iso: str, publication: str,
+                 url_pdf: str, year: int, arxiv: Optional[str], score: int, doi: str = ""):
+        self.source = source
+        self.title = title
+        self.authors = authors
+        self.date_iso = date_iso
+        self.publication = publication
+        self.url_pdf = url_pdf
+        self.year = year
+        self.arxiv = arxiv
+        self.score = score
+        self.doi = doi
+        self.key = title_key(title)
+
+    def rank(self):
+        # same order as scholar_IPs.merge_rank, down to a total tie-break on the record
+        return self.score, len(self.title), self.year, (self.source, self.title, self.url_pdf,
+                                                        self.publication, self.date_iso)
+
+
+def scholar_arxiv_id(rec: PubRecord) -> Optional[str]:
+    return arxiv_id_of(rec.pdf_url, rec.publication, *(str(v) for v in (rec.bib or {}).values())) or None
+
+
+def paper_from_dblp(e: Dict[str, str]) -> Optional[Paper]:
+    b = extract.entry_bundle(e)
+    if b is None:
+        return None
+    url_pdf = b["url_pdf"] or ""
+    score = info_richness_score(e, url_pdf if is_likely_pdf_url(url_pdf) else "", b["publication"])
+    return Paper("dblp", b["title"], b["authors"], b["date_iso"], b["publication"], url_pdf,
+                 int(b["year"] or 0), b["arxiv"], score, e.get("doi", ""))
+
+
+def paper_from_scholar(rec: PubRecord) -> Paper:
+    return Paper("scholar", rec.title, rec.authors, scholar_IPs.ymd_to_hugo_iso(rec.year, rec.month, rec.day),
+                 rec.publication, rec.pdf_url, rec.year, scholar_arxiv_id(rec), rec.richness(),
+                 (rec.bib or {}).get("doi", ""))
+
+
+class SourceMerge:
+    """Index by arXiv id and by title key; add() keeps the richer record per paper."""
+
+    def __init__(self):
+        self.papers: List[Paper] = []
+        self.titles = TitleIndex()
+        self.by_arxiv: Dict[str, int] = {}
+        self.stats: Dict[str, int] = {"arxiv_matches": 0, "title_matches": 0, "replaced": 0}
+
+    def _find(self, p: Paper) -> Optional[int]:
+        if p.arxiv and p.arxiv in self.by_arxiv:
+            self.stats["arxiv_matches"] += 1
+            return self.by_arxiv[p.arxiv]
+        i = self.titles.find(p.key)
+        if i is None:
+            return None
+        other = self.papers[i].arxiv
+        if p.arxiv and other and other != p.arxiv and self.titles.keys[i] != p.key:
+            return None  # overlapping titles, different preprints (equal titles would share a slug)
+        self.stats["title_matches"] += 1
+        return i
+
+    def add(self, p: Paper):
+        i = self._find(p)
+        if i is None:
+            i = self.titles.add(p.key)
+            self.papers.append(p)
+        else:
+            if not supersedes(p.rank(), self.papers[i].rank()):
+                if p.arxiv:
+                    self.by_arxiv.setdefault(p.arxiv, i)
+                return
+            self.stats["replaced"] += 1
+            self.titles.replace(i, p.key)
+            self.papers[i] = p
+        if p.arxiv:
+            self.by_arxiv.setdefault(p.arxiv, i)
+
+
+def load_scholar_records(cache_dir: pathlib.Path) -> List[PubRecord]:
+    dirs = [cache_dir, *sorted(cache_dir.glob("shard-*-of-*"))]
+    per_author = scholar_IPs.collect_cached_records(dirs, [])
+    return scholar_IPs.merge_pub_lists([rec for _, recs in per_author for rec in recs])
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--bib", type=pathlib.Path, default=None, help="DBLP .bib file")
+    ap.add_argument("--cache-dir", type=pathlib.Path, default=scholar_IPs.CACHE_DIR, help="scholar_IPs.py cache (default: $CACHE_DIR)")
+    ap.add_argument("--out", type=pathlib.Path, required=True, help="Path to content/publication directory")
+    ap.add_argument("--min_year", type=int, default=2022, help="Keep publications with year >= min_year")
+    ap.add_argument("--data", type=pathlib.Path,
+                    default=publications_data.PUB_DATA if scholar_IPs.PUB_OUTPUT == "data" else None,
+                    help="Write entries to this Hugo data file (e.g. data/publications.json) instead of bundles "
+                         "(default: $PUB_DATA when PUB_OUTPUT=data)")
+    ap.add_argument("--dry-run", action="store_true", default=scholar_IPs.DRY_RUN,
+                    help="Report what would be written (default: $DRY_RUN)")
+    args = ap.parse_args()
+
+    merged = SourceMerge()
+    n_dblp = n_scholar = 0
+    if args.bib:
+        text = args.bib.read_text(encoding="utf-8", errors="ignore")
+        for e in extract.dedup_entries(extract.parse_bibtex_entries(text)):
+            p = paper_from_dblp(e)
+            if p is not None and p.year >= args.min_year:
+                merged.add(p)
+                n_dblp += 1
+    for rec in load_scholar_records(args.cache_dir):
+        if rec.year >= args.min_year:
+            merged.add(paper_from_scholar(rec))
+            n_scholar += 1
+
+    args.out.mkdir(parents=True, exist_ok=True)
+    bundles = BundleIndex(args.out).refresh()
+    data = PublicationsData(args.data).load() if args.data else None
+    written: Dict[str, int] = {"dblp": 0, "scholar": 0}
+    unchanged = 0
+    for p in merged.papers:
+        pub_folder = bundles.place(args.out / extract.slugify(p.title, str(p.year)), title=p.title,
+                                   url_pdf=p.url_pdf, publication=p.publication, doi=p.doi)
+        if data is not None and not pub_folder.exists():
+            pub_folder = args.out / data.place(pub_folder.name, title=p.title, url_pdf=p.url_pdf,
+                                               publication=p.publication, doi=p.doi)
+        local = scholar_IPs.mirrored_pdf(p.url_pdf)
+        if data is not None:
+            if args.dry_run:
+                print(f"[DRY_RUN] {p.source:<7} {pub_folder.name}")
+            else:
+                data.put(importer_entry(pub_folder, p.title, p.authors, p.date_iso, p.publication, p.url_pdf,
+                                        url_pdf_local=local or ""))
+            written[p.source] += 1
+            continue
+        index_md = pub_folder / "index.md"
+        content = scholar_IPs.render_bundle(p.title, p.authors, p.date_iso, p.publication, p.url_pdf, local)
+        try:
+            if index_md.read_bytes() == content.encode("utf-8"):
+                unchanged += 1  # rewriting would only bump the mtime the caches key on
+                continue
+        except OSError:
+            pass
+        if args.dry_run:
+            print(f"[DRY_RUN] {p.source:<7} {pub_folder.name}")
+        else:
+            pub_folder.mkdir(parents=True, exist_ok=True)
+            index_md.write_text(content, encoding="utf-8")
+            bundles.record(pub_folder)
+        written[p.source] += 1
+    if not args.dry_run and data is not None:
+        data.save()
+    elif not args.dry_run:
+        bundles.save()
+
+    s = merged.stats
+    print(f"DBLP {n_dblp} + Scholar {n_scholar} records -> {len(merged.papers)} papers "
+          f"({s['arxiv_matches']} arXiv-id and {s['title_matches']} title matches, {s['replaced']} replaced)")
+    print(f"Done. Wrote {written['dblp']} DBLP and {written['scholar']} Scholar "
+          f"{'entries' if data is not None else 'bundles'} into: {args.data or args.out}"
+          f"{f' ({unchanged} unchanged bundles left alone)' if data is None else ''}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Local mirror of the publication PDFs: download every url_pdf once, store it by content
+hash under static/, and point the front matter at the copy: url_pdf_local is the mirror
+path, url_pdf keeps the source URL (arXiv id, DOI and dedup keys are read from it).
+
+  python scripts/pdf_mirror.py content/publication
+  python scripts/pdf_mirror.py content/publication --data data/publications.json --jobs 16
+  python scripts/pdf_mirror.py content/publication --no-rewrite     # fill the mirror only
+
+Store (PDF_MIRROR_DIR, default static/pdf, served at PDF_MIRROR_URL, default /pdf/):
+  <sha256[:2]>/<sha256>.pdf   one file per distinct PDF, however many URLs serve it
+  .mirror.json                url -> {sha256, size, fetched}, or {rejected} for non-PDFs and
+                              for PDFs over PDF_MIRROR_MAX_MB (with their size and ETag);
+                              rejected URLs are tried again after PDF_MIRROR_RETRY_DAYS
+  .partial/                   interrupted downloads, resumed with a Range request
+A URL is only stored when the response really is a PDF (it starts with "%PDF-").
+Downloads run on a thread pool over one requests.Session, so connections to the same
+host are pooled and reused. An interrupted download keeps its .part file plus the
+ETag/Last-Modified it was started with; the next run asks for the remaining bytes
+with If-Range, and starts over if the server's copy has changed.
+
+scholar_IPs.py reads the mirror when .mirror.json exists: a mirrored URL counts as a
+verified PDF after a local stat (no HEAD/GET), and bundles get url_pdf_local.
+"""
+
+from __future__ import annotations
+import os
+import json
+import time
+import hashlib
+import argparse
+import pathlib
+import threading
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from front_matter import FrontMatter, write_atomic
+from publications_data import PublicationsData
+
+PDF_MIRROR_DIR = pathlib.Path(os.environ.get("PDF_MIRROR_DIR", "static/pdf"))
+PDF_MIRROR_URL = os.environ.get("PDF_MIRROR_URL", "/pdf/")  # where Hugo serves PDF_MIRROR_DIR
+PDF_MIRROR_JOBS = int(os.environ.get("PDF_MIRROR_JOBS", "8"))  # concurrent downloads (and pooled connections)
+PDF_MIRROR_MAX_MB = float(os.environ.get("PDF_MIRROR_MAX_MB", "100"))  # larger files are not mirrored
+PDF_MIRROR_RETRY_DAYS = float(os.environ.get("PDF_MIRROR_RETRY_DAYS", "30"))  # re-try URLs that were not PDFs after this long
+INDEX_NAME = ".mirror.json"
+
+_HTTP_TIMEOUT = 30
+_HTTP_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (compatible; ScholarFetcher/1.0; +https://example.org)"
+}
+_CHUNK = 1 << 16
+
+
+class PdfMirror:
+    def __init__(self, root: pathlib.Path = PDF_MIRROR_DIR, url_prefix: str = PDF_MIRROR_URL):
+        self.root = pathlib.Path(root)
+        self.url_prefix = url_prefix if url_prefix.endswith("/") else url_prefix + "/"
+        # source url -> {sha256, size, fetched}, or {rejected: epoch} (plus size, validator when too large)
+        self.urls: Dict[str, Dict] = {}
+        self.stats: Dict[str, int] = {"downloaded": 0, "resumed": 0, "deduplicated": 0, "already": 0,
+                                      "not_pdf": 0, "too_large": 0, "failed": 0}
+        self._lock = threading.Lock()  # fetch() runs on several threads
+
+    def _count(self, name: str):
+        with self._lock:
+            self.stats[name] += 1
+
+    # ---------- index ----------
+
+    @property
+    def index_path(self) -> pathlib.Path:
+        return self.root / INDEX_NAME
+
+    def load(self) -> "PdfMirror":
+        try:
+            self.urls = json.loads(self.index_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self.urls = {}
+        return self
+
+    def save(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.index_path.with_name(INDEX_NAME + ".tmp")
+        tmp.write_text(json.dumps(self.urls, ensure_ascii=False, indent=1, sort_keys=True), encoding="utf-8")
+        os.replace(tmp, self.index_path)
+
+    # ---------- lookups ----------
+
+    def blob_path(self, sha256: str) -> pathlib.Path:
+        return self.root / sha256[:2] / f"{sha256}.pdf"
+
+    def site_url(self, sha256: str) -> str:
+        return f"{self.url_prefix}{sha256[:2]}/{sha256}.pdf"
+
+    def is_site_url(self, url: str) -> bool:
+        return url.startswith(self.url_prefix)
+
+    def local(self, url: str) -> Optional[str]:
+        """Site URL of the mirrored copy of url, or None; one stat, no network."""
+        rec = self.urls.get(url)
+        if rec is None or "sha256" not in rec:
+            return None
+        try:
+            if os.stat(self.blob_path(rec["sha256"])).st_size == rec["size"]:
+                return self.site_url(rec["sha256"])
+        except OSError:
+            pass
+        return None
+
+    # ---------- download ----------
+
+    def _partial(self, url: str) -> pathlib.Path:
+        return self.root / ".partial" / (hashlib.sha1(url.encode("utf-8")).hexdigest() + ".part")
+
+    def rejected(self, url: str) -> bool:
+        """Served something other than a PDF, or a PDF over PDF_MIRROR_MAX_MB, less than PDF_MIRROR_RETRY_DAYS ago."""
+        rec = self.urls.get(url)
+        return rec is not None and rec.get("rejected", 0) >= time.time() - PDF_MIRROR_RETRY_DAYS * 86400
+
+    def _too_large(self, size: int, validator: str) -> Dict:
+        self._count("too_large")
+        return {"rejected": int(time.time()), "size": size, "validator": validator}
+
+    def fetch(self, session: requests.Session, url: str) -> Optional[Dict]:
+        """
+        Download url into the store; returns its index record ({rejected} when it is not a
+        PDF or too large), or None when the download failed (an interrupted one is resumed
+        next time).
+        """
+        part = self._partial(url)
+        meta = part.with_suffix(".json")
+        part.parent.mkdir(parents=True, exist_ok=True)
+        have = part.stat().st_size if part.exists() else 0
+        headers = dict(_HTTP_HEADERS)
+        if have:
+            try:
+                validator = json.loads(meta.read_text(encoding="utf-8"))["validator"]
+            except (OSError, ValueError, KeyError):
+                validator = ""
+            if validator:
+                headers["Range"] = f"bytes={have}-"
+                headers["If-Range"] = validator
+            else:
+                have = 0  # no way to tell whether the server's copy is still the same
+        limit = int(PDF_MIRROR_MAX_MB * 1e6)
+        try:
+            with session.get(url, headers=headers, stream=True, allow_redirects=True, timeout=_HTTP_TIMEOUT) as r:
+                if r.status_code == 206 and have and r.headers.get("Content-Range", "").startswith(f"bytes {have}-"):
+                    mode = "ab"
+                elif r.status_code == 200:
+                    mode, have = "wb", 0
+                elif r.status_code in (206, 416):
+                    part.unlink(missing_ok=True)  # the .part does not fit the server's copy: start over next time
+                    self._count("failed")
+                    return None
+                else:
+                    self._count("failed")
+                    return None
+                validator = r.headers.get("ETag") or r.headers.get("Last-Modified") or ""
+                announced = have + int(r.headers.get("Content-Length") or 0)
+                if announced > limit:
+                    part.unlink(missing_ok=True)
+                    meta.unlink(missing_ok=True)
+                    return self._too_large(announced, validator)
+                meta.write_text(json.dumps({"url": url, "validator": validator}), encoding="utf-8")
+                resumed = mode == "ab"
+                with part.open(mode) as f:
+                    first = have == 0
+                    for chunk in r.iter_content(_CHUNK):
+                        if first:
+                            if chunk.lstrip()[:5] != b"%PDF-":
+                                break  # an HTML landing page or a login wall
+                            first = False
+                        f.write(chunk)
+                        have += len(chunk)
+                        if have > limit:
+                            break
+        except requests.RequestException:
+            self._count("failed")  # keep the .part for the next run
+            return None
+
+        size = part.stat().st_size
+        with part.open("rb") as f:
+            ok = f.read(1024).lstrip()[:5] == b"%PDF-"
+        if not ok or size > limit:
+            part.unlink()
+            meta.unlink(missing_ok=True)
+            if ok:
+                return self._too_large(size, validator)
+            self._count("not_pdf")
+            return {"rejected": int(time.time())}
+        h = hashlib.sha256()
+        with part.open("rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        sha = h.hexdigest()
+        dst = self.blob_path(sha)
+        if dst.exists() and dst.stat().st_size == size:
+            part.unlink()
+            self._count("deduplicated")
+        else:
+            dst.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(part, dst)
+        meta.unlink()
+        self._count("resumed" if resumed else "downloaded")
+        return {"sha256": sha, "size": size, "fetched": int(time.time())}
+
+    def mirror(self, urls: Iterable[str], jobs: int = PDF_MIRROR_JOBS) -> Dict[str, str]:
+        """Mirror every url not mirrored yet; returns url -> site URL for all mirrored ones."""
+        urls = [u for u in dict.fromkeys(urls) if u and not self.is_site_url(u)]
+        todo = [u for u in urls if self.local(u) is None]
+        self.stats["already"] += len(urls) - len(todo)
+        skip = {u for u in todo if self.rejected(u)}
+        for u in skip:
+            self.stats["too_large" if "size" in self.urls[u] else "not_pdf"] += 1
+        todo = [u for u in todo if u not in skip]
+        if todo:
+            jobs = max(1, min(jobs, len(todo)))
+            with requests.Session() as session:
+                adapter = HTTPAdapter(pool_connections=jobs, pool_maxsize=jobs)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                with ThreadPoolExecutor(max_workers=jobs) as pool:
+                    for url, rec in zip(todo, pool.map(partial(self.fetch, session), todo)):
+                        if rec is not None:
+                            self.urls[url] = rec
+        return {u: self.local(u) for u in urls if self.local(u)}
+
+
+_OPENED: Dict[str, Optional[PdfMirror]] = {}
+
+
+def open_default() -> Optional[PdfMirror]:
+    """The mirror at $PDF_MIRROR_DIR, loaded once per process; None when it has no index yet."""
+    key = str(PDF_MIRROR_DIR)
+    if key not in _OPENED:
+        m = PdfMirror()
+        _OPENED[key] = m.load() if m.index_path.exists() else None
+    return _OPENED[key]
+
+
+def reset_default():
+    """Re-read the index on the next open_default() (a long-running importer after a mirror run)."""
+    _OPENED.clear()
+
+
+# ---------- front matter ----------
+
+def bundle_pdf_urls(root: pathlib.Path) -> Dict[pathlib.Path, str]:
+    """index.md -> its url_pdf, for the bundles under root that have one."""
+    out: Dict[pathlib.Path, str] = {}
+    with os.scandir(root) as it:
+        for d in sorted(it, key=lambda d: d.name):
+            index_md = pathlib.Path(d.path) / "index.md"
+            if d.is_dir() and index_md.exists():
+                url = FrontMatter.read(index_md).get("url_pdf") or ""
+                if url:
+                    out[index_md] = url
+    return out
+
+
+def rewrite_bundles(urls: Dict[pathlib.Path, str], local: Dict[str, str]) -> int:
+    n = 0
+    for index_md, url in urls.items():
+        if url in local:
+            fm = FrontMatter.read(index_md)
+            fm.set("url_pdf_local", local[url])
+            if fm.changed:  # an untouched bundle keeps the mtime the bundle and stage caches key on
+                write_atomic(index_md, fm.text(), index_md)
+                n += 1
+    return n
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("root", type=pathlib.Path, nargs="?", default=None, help="content/publication directory")
+    ap.add_argument("--data", type=pathlib.Path, default=None, help="Also mirror the entries of this publications data file")
+    ap.add_argument("--jobs", type=int, default=PDF_MIRROR_JOBS, help="Concurrent downloads")
+    ap.add_argument("--no-rewrite", action="store_true", help="Mirror only; do not set url_pdf_local")
+    ap.add_argument("--dry-run", action="store_true", help="Report what would be downloaded")
+    args = ap.parse_args()
+    if args.root is None and args.data is None:
+        ap.error("give a bundle root, --data, or both")
+
+    mirror = PdfMirror().load()
+    bundles = bundle_pdf_urls(args.root) if args.root else {}
+    data = None
+    if args.data:
+        data = PublicationsData(args.data).load()
+    wanted: List[str] = list(bundles.values()) + [e.get("url_pdf", "") for e in (data.entries.values() if data else ())]
+    wanted = [u for u in dict.fromkeys(wanted) if u and not mirror.is_site_url(u)]
+
+    if args.dry_run:
+        todo = [u for u in wanted if mirror.local(u) is None and not mirror.rejected(u)]
+        for u in todo:
+            print(f"[DRY_RUN] would fetch {u}")
+        print(f"[DRY_RUN] {len(todo)} of {len(wanted)} PDFs not mirrored yet")
+        return
+
+    t0 = time.perf_counter()
+    local = mirror.mirror(wanted, args.jobs)
+    mirror.save()
+    s = mirror.stats
+    print(f"Mirrored {len(local)} of {len(wanted)} PDFs into {mirror.root} in {time.perf_counter() - t0:.1f}s: "
+          f"{s['downloaded']} downloaded, {s['resumed']} resumed, {s['already']} already there, "
+          f"{s['deduplicated']} duplicates of stored files, {s['not_pdf']} not PDFs, {s['too_large']} too large, {s['failed']} failed")
+    if args.no_rewrite:
+        return
+    n = rewrite_bundles(bundles, local)
+    if data is not None:
+        for e in list(data.entries.values()):
+            if e.get("url_pdf") in local:
+                data.put(dict(e, url_pdf_local=local[e["url_pdf"]]))
+        data.save()
+    print(f"Set url_pdf_local on {n} bundles{' and the data entries' if data is not None else ''}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,11 +2,24 @@
 # -*- coding: utf-8 -*-
 
 from __future__ import annotations
+import os
 import re
+import json
+import hashlib
 from pathlib import Path
 from typing import Optional, Tuple
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 import shutil
 
+import arxiv_index
+from front_matter import FrontMatter, write_atomic, yaml_get_field, yaml_set_field  # the last two re-exported for old callers
+
+try:
+    import fcntl
+except ImportError:  # not on Windows
+    fcntl = None
+
 ARXIV_PDF_RE = re.compile(r"https?://arxiv\.org/pdf/(\d{4}\.\d{4,5})(?:v\d+)?\.pdf", re.IGNORECASE)
 YEAR_SUFFIX_RE = re.compile(r".*-(\d{4})$")
 
@@ -38,150 +51,360 @@ def parse_arxiv_from_url(url: str) -> Optional[Tuple[str, str]]:
 def strip_bib_braces(s: str) -> str:
     return re.sub(r"[{}]", "", s)
 
-def yaml_set_field(lines: list[str], key: str, value: str) -> list[str]:
-    """
-    Replace a YAML front matter field like:
-      key: '...'
-    If not present, insert it before the closing '---' of front matter.
-    Assumes file starts with '---' front matter.
-    """
-    # We will keep your site's style: single quotes
-    new_line = f"{key}: '{value}'"
-
-    # Find front matter end
-    if not lines or lines[0].strip() != "---":
-        return lines  # not a standard front matter file
-
-    fm_end = None
-    for i in range(1, len(lines)):
-        if lines[i].strip() == "---":
-            fm_end = i
-            break
-    if fm_end is None:
-        return lines
-
-    # Replace if exists in front matter
-    pat = re.compile(rf"^{re.escape(key)}\s*:\s*.*$")
-    for i in range(1, fm_end):
-        if pat.match(lines[i].strip()):
-            lines[i] = new_line + "\n"
-            return lines
-
-    # Insert before fm_end
-    lines.insert(fm_end, new_line + "\n")
-    return lines
-
-def yaml_get_field(lines: list[str], key: str) -> Optional[str]:
+# ---------- Transforms ----------
+# Every rule is a function over a parsed FrontMatter, registered in pipeline order.
+# All enabled rules run on the same parse in one read-transform-write pass per bundle,
+# so a new rule costs no extra I/O. Bump a rule's version when its output changes:
+# the manifest then redoes every bundle.
+
+class Transform:
+    def __init__(self, name: str, fn, version: int, default: bool, doc: str):
+        self.name = name
+        self.fn = fn
+        self.version = version
+        self.default = default
+        self.doc = doc
+
+TRANSFORMS: dict[str, Transform] = {}
+
+def transform(name: str, version: int = 1, default: bool = True):
+    """Register fn(fm) as pipeline rule `name`; default=False rules run only when asked for."""
+    def register(fn):
+        doc = (fn.__doc__ or "").strip().splitlines()[0] if fn.__doc__ else ""
+        TRANSFORMS[name] = Transform(name, fn, version, default, doc)
+        return fn
+    return register
+
+ARXIV_ANY_RE = re.compile(r"https?://(?:www\.|export\.)?arxiv\.org/(?:abs|pdf)/(\d{4}\.\d{4,5})(?:v\d+)?(?:\.pdf)?/?$", re.IGNORECASE)
+DOI_URL_RE = re.compile(r"https?://(?:dx\.)?doi\.org/(10\..+)$", re.IGNORECASE)
+VENUE_ACRONYM_RE = re.compile(r"\{([A-Za-z0-9\-]+)\}\s*(\d{4})")  # as in extract.venue_with_year
+
+@transform("canonical_pdf_url", default=False)
+def canonical_pdf_url(fm: FrontMatter):
+    """arXiv abs/pdf links -> https://arxiv.org/pdf/<id>.pdf, dx.doi.org/http DOIs -> https://doi.org/<doi>."""
+    url = (fm.get("url_pdf") or "").strip()
+    m = ARXIV_ANY_RE.match(url)
+    if m:
+        canonical = f"https://arxiv.org/pdf/{m.group(1)}.pdf"
+    else:
+        m = DOI_URL_RE.match(url)
+        canonical = f"https://doi.org/{m.group(1)}" if m else url
+    if canonical != url:
+        fm.set("url_pdf", canonical)
+
+@transform("strip_title_braces")
+def strip_title_braces_in_frontmatter(fm: FrontMatter):
     """
-    Read a simple YAML scalar from front matter: key: "..." or key: '...'
+    Remove {} in title field if present (DBLP keeps {LLM}-style capitalization braces).
     """
-    if not lines or lines[0].strip() != "---":
-        return None
-    fm_end = None
-    for i in range(1, len(lines)):
-        if lines[i].strip() == "---":
-            fm_end = i
-            break
-    if fm_end is None:
-        return None
-
-    pat = re.compile(rf"^{re.escape(key)}\s*:\s*(.*)\s*$")
-    for i in range(1, fm_end):
-        m = pat.match(lines[i].rstrip("\n"))
-        if m:
-            raw = m.group(1).strip()
-            # strip surrounding quotes if present
-            if (raw.startswith('"') and raw.endswith('"')) or (raw.startswith("'") and raw.endswith("'")):
-                raw = raw[1:-1]
-            return raw.strip()
-    return None
-
-def strip_title_braces_in_frontmatter(lines: list[str]) -> list[str]:
-    """
-    Optional: remove {} in title field if present.
-    """
-    title = yaml_get_field(lines, "title")
+    title = fm.get("title")
     if title is None:
-        return lines
+        return
     cleaned = strip_bib_braces(title)
     if cleaned != title:
-        lines = yaml_set_field(lines, "title", cleaned)
-    return lines
+        fm.set("title", cleaned)
 
-def process_index_md(path: Path) -> bool:
+@transform("arxiv_publication_date")
+def arxiv_publication_date(fm: FrontMatter):
+    """arXiv PDF links: publication -> arXiv:<id>, date/publishDate -> the id's yyyy-mm."""
+    arxiv = parse_arxiv_from_url(fm.get("url_pdf") or "")
+    if arxiv:
+        arxiv_id, iso_date = arxiv
+        # rewrite publication + dates
+        fm.set("publication", f"arXiv:{arxiv_id}")
+        fm.set("date", iso_date)
+        fm.set("publishDate", iso_date)
+
+@transform("normalize_venue", default=False)
+def normalize_venue(fm: FrontMatter):
+    """Venue the way extract.py writes it: "{ACL} 2025" -> ACL25, braces dropped, spaces collapsed."""
+    venue = fm.get("publication")
+    if not venue or "'" in venue:  # set() writes single-quoted values without escaping
+        return
+    m = VENUE_ACRONYM_RE.search(venue)
+    cleaned = f"{m.group(1)}{m.group(2)[-2:]}" if m else " ".join(strip_bib_braces(venue).split())
+    if cleaned != venue:
+        fm.set("publication", cleaned)
+
+@transform("arxiv_metadata", default=False)
+def arxiv_metadata(fm: FrontMatter):
+    """arXiv PDF links: exact v1 date and journal-ref venue from the offline index at $ARXIV_INDEX."""
+    idx = arxiv_index.open_default()
+    arxiv = parse_arxiv_from_url(fm.get("url_pdf") or "")
+    meta = idx.get(arxiv[0]) if idx is not None and arxiv else None
+    if not meta:
+        return
+    if meta.get("date"):
+        fm.set("date", f"{meta['date']}T00:00:00Z")
+        fm.set("publishDate", f"{meta['date']}T00:00:00Z")
+    if meta.get("journal_ref") and "'" not in meta["journal_ref"]:  # set() does not escape quotes
+        fm.set("publication", meta["journal_ref"])
+
+DEFAULT_RULES = tuple(name for name, t in TRANSFORMS.items() if t.default)
+
+def resolve_rules(spec: str) -> tuple[str, ...]:
+    """--rules value -> rule names in pipeline order. "default", "all", or a comma list (may include "default")."""
+    wanted: set[str] = set()
+    for name in (n.strip() for n in spec.split(",") if n.strip()):
+        if name == "all":
+            wanted.update(TRANSFORMS)
+        elif name == "default":
+            wanted.update(DEFAULT_RULES)
+        elif name in TRANSFORMS:
+            wanted.add(name)
+        else:
+            raise ValueError(f"unknown rule {name!r}; known: {', '.join(TRANSFORMS)}")
+    return tuple(name for name in TRANSFORMS if name in wanted)
+
+def rules_signature(rules: tuple[str, ...]) -> str:
+    return ",".join(f"{name}@{TRANSFORMS[name].version}" for name in rules)
+
+def clean_front_matter(fm: FrontMatter, rules: tuple[str, ...] = DEFAULT_RULES) -> bool:
     """
-    Returns True if file modified.
+    Run the pipeline on a parsed index.md. Returns True if anything changed.
     """
-    text = path.read_text(encoding="utf-8", errors="ignore").splitlines(keepends=True)
-    original = text[:]
-
     # (2) if no url_pdf, ignore it
-    url_pdf = yaml_get_field(text, "url_pdf")
-    if not url_pdf:
+    if not fm.get("url_pdf"):
         return False
+    for name in rules:
+        TRANSFORMS[name].fn(fm)
+    return fm.changed
 
-    # Optional: clean braces in title
-    text = strip_title_braces_in_frontmatter(text)
-
-    arxiv = parse_arxiv_from_url(url_pdf)
-    if arxiv:
-        arxiv_id, iso_date = arxiv
-        # rewrite publication + dates
-        text = yaml_set_field(text, "publication", f"arXiv:{arxiv_id}")
-        text = yaml_set_field(text, "date", iso_date)
-        text = yaml_set_field(text, "publishDate", iso_date)
-
-    if text != original:
-        path.write_text("".join(text), encoding="utf-8")
+def process_index_md(path: Path, rules: tuple[str, ...] = DEFAULT_RULES) -> bool:
+    """
+    Clean index.md in place. Returns True if file modified.
+    """
+    fm = FrontMatter.read(path)
+    if clean_front_matter(fm, rules):
+        write_atomic(path, fm.text(), path)
         return True
     return False
 
-def main():
-    import argparse
-    ap = argparse.ArgumentParser()
-    ap.add_argument("--root", required=True, help="Path to publication folders root (e.g., pub/ or content/publication/)")
-    ap.add_argument("--min_year", type=int, default=2023, help="Keep/process only folders with -YEAR >= min_year (default: 2022 means after 2021)")
-    ap.add_argument("--out", required=True, help="Output directory for cleaned publication folders")
-
-    args = ap.parse_args()
-
-    root = Path(args.root)
-    out_root = Path(args.out)
-    out_root.mkdir(parents=True, exist_ok=True)
-    if not root.exists():
-        raise SystemExit(f"Root not found: {root}")
+FICLONE = 0x40049409  # linux/fs.h: share the source's extents (btrfs, xfs, ...)
+_UNSUPPORTED: set[str] = set()  # link methods that already failed in this process
+LINK_METHODS = {"auto": ("reflink", "hardlink", "copy"), "hardlink": ("hardlink", "copy"), "copy": ("copy",)}
 
-    modified = 0
-    scanned = 0
+def _remove(path: Path):
+    try:
+        path.unlink()
+    except FileNotFoundError:
+        pass
 
-    for d in sorted(root.iterdir()):
-        if not d.is_dir():
+def place_unmodified(src: Path, dst: Path, data: bytes, link: str) -> str:
+    """
+    Make dst a copy of src (whose bytes are `data`) without writing the bytes again where
+    the filesystem allows: reflink, else hardlink, else a plain copy. Returns the method used.
+    """
+    tmp = dst.with_name(dst.name + ".tmp")
+    for method in LINK_METHODS[link]:
+        if method in _UNSUPPORTED:
             continue
+        if method == "hardlink" and dst.exists() and os.path.samefile(src, dst):
+            return method  # already linked by an earlier run
+        _remove(tmp)
+        try:
+            if method == "reflink":
+                if fcntl is None:
+                    raise OSError("no fcntl")
+                with open(src, "rb") as sf, open(tmp, "wb") as df:
+                    fcntl.ioctl(df.fileno(), FICLONE, sf.fileno())
+                shutil.copystat(src, tmp)
+            elif method == "hardlink":
+                os.link(src, tmp)
+            else:
+                tmp.write_bytes(data)
+                shutil.copystat(src, tmp)
+        except OSError:
+            _remove(tmp)
+            if method == "copy":
+                raise
+            _UNSUPPORTED.add(method)
+            continue
+        os.replace(tmp, dst)
+        return method
+    raise OSError(f"could not place {dst}")
 
-        year = extract_year_from_folder(d.name)
-        if year is None or year < args.min_year:
-            continue  # (1) only after 2022
+def _stat_key(path: Path) -> list[int]:
+    st = os.stat(path)
+    return [st.st_size, st.st_mtime_ns]
 
-        src_index = d / "index.md"
-        if not src_index.exists():
-            continue
+def process_folder(out_root: Optional[Path], link: str, rules: tuple[str, ...], src_dir: str,
+                   prev: Optional[dict] = None) -> Optional[dict]:
+    """
+    Clean <src_dir>/index.md into <out_root>/<name>/index.md, or in place when out_root
+    is None. The source is read once and the destination written at most once; when
+    the source bytes still hash to prev["sha1"] and the output is intact, nothing is
+    written. Returns None when the folder has no index.md, else its manifest entry.
+    """
+    src_index = Path(src_dir) / "index.md"
+    if not src_index.exists():
+        return None
+    dst_index = src_index if out_root is None else out_root / src_index.parent.name / "index.md"
 
+    data = src_index.read_bytes()
+    digest = hashlib.sha1(data).hexdigest()
+    if prev and prev["sha1"] == digest and dst_index.exists() and (
+            out_root is None or _stat_key(dst_index) == prev["dst"]):
+        # touched, not changed (checkout, copy): just refresh the stats
+        return dict(prev, src=_stat_key(src_index), dst=_stat_key(dst_index), modified=False)
+
+    if out_root is not None:
         # create output folder
-        dst_dir = out_root / d.name
-        dst_dir.mkdir(parents=True, exist_ok=True)
+        dst_index.parent.mkdir(parents=True, exist_ok=True)
+
+    # decoded the way read_text() does it: universal newlines
+    text = data.decode("utf-8", errors="ignore").replace("\r\n", "\n").replace("\r", "\n")
+    fm = FrontMatter(text.splitlines(keepends=True))
+    modified = clean_front_matter(fm, rules)
+    if modified:
+        out_text = fm.text()
+        write_atomic(dst_index, out_text, src_index)
+        if out_root is None:
+            digest = hashlib.sha1(out_text.encode("utf-8")).hexdigest()
+    elif out_root is not None:
+        place_unmodified(src_index, dst_index, data, link)
+    return {"src": _stat_key(src_index), "sha1": digest, "dst": _stat_key(dst_index), "modified": modified}
+
+def list_folders(root: Path, min_year: int) -> list[str]:
+    """Publication folders with -YEAR >= min_year, from one scandir, in name order."""
+    with os.scandir(root) as it:
+        folders = [(d.name, d.path) for d in it if d.is_dir()]
+    out = []
+    for name, path in sorted(folders):
+        year = extract_year_from_folder(name)
+        if year is None or year < min_year:
+            continue  # (1) only after 2022
+        out.append(path)
+    return out
+
+# ---------- Manifest ----------
+# Bump when the pipeline around the rules changes output; rules carry their own versions.
+RULES_VERSION = 1
+MANIFEST_NAME = ".post_google_scholar.json"
+MANIFEST_FORMAT = 1
+
+def rules_header(rules: tuple[str, ...]) -> str:
+    header = f"{RULES_VERSION}:{rules_signature(rules)}"
+    if "arxiv_metadata" in rules:
+        # its output depends on the index too: a rebuilt or different index redoes every bundle
+        header += f":arxiv_index={arxiv_index.identity()}"
+    return header
+
+def load_manifest(path: Path, root: Path, in_place: bool, rules: tuple[str, ...]) -> dict[str, dict]:
+    """Per-folder entries of the last run, or {} if there is none or it was made differently."""
+    try:
+        saved = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    header = {"format": MANIFEST_FORMAT, "rules": rules_header(rules), "root": str(root.resolve()), "in_place": in_place}
+    if any(saved.get(k) != v for k, v in header.items()):
+        return {}
+    return saved.get("bundles", {})
+
+def save_manifest(path: Path, root: Path, in_place: bool, rules: tuple[str, ...], entries: dict[str, dict]):
+    data = {"format": MANIFEST_FORMAT, "rules": rules_header(rules), "root": str(root.resolve()),
+            "in_place": in_place, "bundles": entries}
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(data, sort_keys=True), encoding="utf-8")
+    os.replace(tmp, path)
+
+def prune_output(out_root: Path, name: str):
+    """Remove the output of a source folder that is gone."""
+    dst_dir = out_root / name
+    try:
+        (dst_dir / "index.md").unlink()
+        dst_dir.rmdir()  # only if nothing else lives there
+    except OSError:
+        pass
 
-        dst_index = dst_dir / "index.md"
+def main():
+    import argparse
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--root", help="Path to publication folders root (e.g., pub/ or content/publication/)")
+    ap.add_argument("--min_year", type=int, default=2023, help="Keep/process only folders with -YEAR >= min_year (default: 2022 means after 2021)")
+    ap.add_argument("--out", help="Output directory for cleaned publication folders")
+    ap.add_argument("--in-place", action="store_true", help="Clean the index.md files under --root instead (atomic rename, no --out)")
+    ap.add_argument("--link", choices=tuple(LINK_METHODS), default="auto",
+                    help="How unmodified files reach --out: auto = reflink, else hardlink, else copy. "
+                         "Hardlinked outputs share the source's inode, so an in-place edit of the source shows in both")
+    ap.add_argument("--rules", default="default",
+                    help="Transforms to run, in pipeline order: 'default', 'all' or a comma list (may include 'default')")
+    ap.add_argument("--list-rules", action="store_true", help="List the registered transforms and exit")
+    ap.add_argument("--full", action="store_true", help=f"Ignore the {MANIFEST_NAME} manifest and redo every folder")
+    ap.add_argument("--jobs", type=int, default=1, help="Folders processed in parallel (0 = one per CPU; default 1)")
+    ap.add_argument("--pool", choices=("process", "thread"), default="process",
+                    help="Worker type for --jobs > 1: processes also parallelize parsing, threads only the I/O")
 
-        # copy index.md
-        shutil.copy2(src_index, dst_index)
+    args = ap.parse_args()
 
-        # process copied file
-        if process_index_md(dst_index):
-            modified += 1
+    if args.list_rules:
+        for t in TRANSFORMS.values():
+            print(f"{t.name:<24} v{t.version} {'default' if t.default else 'opt-in ':<8} {t.doc}")
+        return
+    if not args.root:
+        ap.error("--root is required")
+    try:
+        rules = resolve_rules(args.rules)
+    except ValueError as e:
+        ap.error(str(e))
+    if args.in_place == bool(args.out):
+        ap.error("give exactly one of --out and --in-place")
 
-        scanned += 1
+    root = Path(args.root)
+    out_root = None if args.in_place else Path(args.out)
+    if out_root is not None:
+        out_root.mkdir(parents=True, exist_ok=True)
+    if not root.exists():
+        raise SystemExit(f"Root not found: {root}")
 
-    print(f"Scanned {scanned} index.md files (year >= {args.min_year}); modified {modified}.")
+    manifest_path = (out_root or root) / MANIFEST_NAME
+    entries = {} if args.full else load_manifest(manifest_path, root, args.in_place, rules)
+
+    # unchanged since the last run (same size + mtime on both sides): not even opened
+    folders: list[str] = []
+    prevs: list[Optional[dict]] = []
+    kept: dict[str, dict] = {}
+    for path in list_folders(root, args.min_year):
+        name = os.path.basename(path)
+        prev = entries.get(name)
+        if prev:
+            dst_index = Path(path if out_root is None else out_root / name) / "index.md"
+            try:
+                if _stat_key(Path(path) / "index.md") == prev["src"] and _stat_key(dst_index) == prev["dst"]:
+                    kept[name] = prev
+                    continue
+            except OSError:
+                pass
+        folders.append(path)
+        prevs.append(prev)
+
+    work = partial(process_folder, out_root, args.link, rules)
+    jobs = args.jobs or os.cpu_count() or 1
+    if jobs <= 1 or len(folders) < 2:
+        results = [work(f, p) for f, p in zip(folders, prevs)]
+    else:
+        Pool = ProcessPoolExecutor if args.pool == "process" else ThreadPoolExecutor
+        with Pool(max_workers=jobs) as pool:
+            # map() yields in submission order, so the summary does not depend on scheduling
+            results = list(pool.map(work, folders, prevs, chunksize=max(1, len(folders) // (jobs * 8))))
+
+    new_entries = dict(kept)
+    new_entries.update((os.path.basename(f), res) for f, res in zip(folders, results) if res is not None)
+    pruned = 0
+    for name in sorted(set(entries) - set(new_entries)):
+        if (root / name / "index.md").exists():
+            new_entries[name] = entries[name]  # filtered out by --min_year, not deleted
+        else:
+            if out_root is not None:
+                prune_output(out_root, name)
+            pruned += 1
+    save_manifest(manifest_path, root, args.in_place, rules, new_entries)
+
+    scanned = sum(1 for res in results if res is not None) + len(kept)
+    modified = sum(1 for res in results if res and res["modified"])
+
+    print(f"Scanned {scanned} index.md files (year >= {args.min_year}); modified {modified}; "
+          f"{len(kept)} unchanged since the last run skipped; {pruned} outputs of deleted sources pruned.")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Publications as one Hugo data file instead of one page bundle per paper.
+
+layouts/section/publication.html renders the list from site.Data.publications when it
+exists: papers pre-grouped by year (newest first) and pre-sorted by date, so Hugo
+builds one page instead of hundreds. Only papers that need a page of their own keep a
+bundle in content/publication: a body, extra front matter (url_code, featured, ...) or
+other files next to index.md. The data entry of such a paper has "page": true and
+the list links to it: the entry's slug is the bundle's directory name, and the layout
+resolves it with GetPage and links the page's own .RelPermalink, so a slug:/url: in
+the front matter or a permalinks rule for the section is honoured.
+
+Layout, like data/past_speakers.yaml:
+  data/publications.json        [{"year": 2025, "items": [entry, ...]}, ...]
+  data/publications/            one <year>.json per year, {"year": 2025, "items": [...]}
+                                (when the path does not end in .json)
+  entry: slug, title, authors, date, publication, url_pdf, page, and any url_* links
+                                (url_pdf_local: the copy scripts/pdf_mirror.py keeps)
+
+Writers:
+  - scholar_IPs.py with PUB_OUTPUT=data (PUB_DATA picks the file),
+  - extract.py and merge_sources.py with --data data/publications.json.
+Each paper keeps one slug; the same DOI / arXiv id / title key matching as
+bundle_index.py finds it whichever importer wrote it first.
+
+Convert an existing bundle tree (and, with --prune, drop the bundles that no longer
+need a page):
+
+  python scripts/publications_data.py content/publication --out data/publications.json
+  python scripts/publications_data.py content/publication --out data/publications --prune
+"""
+
+from __future__ import annotations
+import os
+import json
+import pathlib
+import argparse
+from typing import Dict, List, Optional
+
+from bundle_index import bundle_keys
+from front_matter import FrontMatter
+
+PUB_DATA = pathlib.Path(os.environ.get("PUB_DATA", "data/publications.json"))
+
+# front matter the importers write; anything else means someone edited the page
+IMPORTER_KEYS = {"title", "authors", "date", "publishDate", "draft", "publication", "url_pdf", "url_pdf_local", "image"}
+_KEY_KINDS = ("doi", "arxiv", "title")
+
+
+def pub_entry(slug: str, title: str, authors: List[str], date_iso: str, publication: str,
+              url_pdf: str, page: bool = False, **links: str) -> Dict:
+    entry = {"slug": slug, "title": title, "authors": list(authors), "date": date_iso,
+             "publication": publication or "", "url_pdf": url_pdf or "", "page": page}
+    entry.update({k: v for k, v in links.items() if v})
+    return entry
+
+
+def _unquote(raw: str) -> str:
+    if len(raw) >= 2 and raw[0] == raw[-1] == "'":
+        return raw[1:-1].replace("''", "'")
+    if len(raw) >= 2 and raw[0] == raw[-1] == '"':
+        return raw[1:-1].replace('\\"', '"').replace("\\\\", "\\")
+    return raw
+
+
+def needs_page(bundle: pathlib.Path) -> bool:
+    """True when a bundle holds more than an importer would write, so it must stay a page."""
+    index_md = bundle / "index.md"
+    if not index_md.exists():
+        return False
+    with os.scandir(bundle) as it:
+        if any(d.name != "index.md" for d in it):
+            return True
+    fm = FrontMatter.read(index_md)
+    if fm.body().strip():
+        return True
+    return any(k not in IMPORTER_KEYS for k in fm.keys())
+
+
+def bundle_links(fm: FrontMatter) -> Dict[str, str]:
+    """url_code, url_dataset, ... of a bundle (url_pdf is a field of its own)."""
+    return {k: _unquote(fm.raw(k) or "") for k in fm.keys() if k.startswith("url_") and k != "url_pdf"}
+
+
+def importer_entry(bundle: pathlib.Path, title: str, authors: List[str], date_iso: str,
+                   publication: str, url_pdf: str, url_pdf_local: str = "") -> Dict:
+    """An importer's entry for a paper; keeps the links of its page bundle if it has one."""
+    if needs_page(bundle):
+        links = bundle_links(FrontMatter.read(bundle / "index.md"))
+        links["url_pdf_local"] = url_pdf_local or links.get("url_pdf_local", "")
+        return pub_entry(bundle.name, title, authors, date_iso, publication, url_pdf, True, **links)
+    return pub_entry(bundle.name, title, authors, date_iso, publication, url_pdf, url_pdf_local=url_pdf_local)
+
+
+def entry_from_bundle(bundle: pathlib.Path) -> Optional[Dict]:
+    fm = FrontMatter.read(bundle / "index.md")
+    title = _unquote(fm.raw("title") or "")
+    if not title:
+        return None
+    return pub_entry(bundle.name, title, [_unquote(a) for a in fm.raw_items("authors")],
+                     _unquote(fm.raw("date") or ""), _unquote(fm.raw("publication") or ""),
+                     _unquote(fm.raw("url_pdf") or ""), needs_page(bundle), **bundle_links(fm))
+
+
+class PublicationsData:
+    """
+    The data file as a slug -> entry store, with the lookups of BundleIndex, so writers
+    can place() a paper, put() its entry and save() once at the end.
+    """
+
+    def __init__(self, path: pathlib.Path = PUB_DATA):
+        self.path = pathlib.Path(path)
+        self.per_year = self.path.suffix != ".json"
+        self.entries: Dict[str, Dict] = {}
+        self._loaded: Dict[str, Dict] = {}
+        self._by: Dict[str, Dict[str, str]] = {k: {} for k in _KEY_KINDS}
+        self._keys: Dict[str, Dict[str, str]] = {}
+        self._moved: Dict[str, str] = {}  # slug put() -> slug it replaced
+
+    # ---------- load / save ----------
+
+    def load(self) -> "PublicationsData":
+        groups: List[Dict] = []
+        try:
+            if self.per_year:
+                for p in sorted(self.path.glob("*.json")):
+                    groups.append(json.loads(p.read_text(encoding="utf-8")))
+            elif self.path.exists():
+                groups = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            print(f"  warn: could not read {self.path} ({e}); starting empty")
+            groups = []
+        self.entries = {}
+        self._moved = {}
+        for g in groups:
+            for item in g.get("items", []):
+                self.entries[item["slug"]] = item
+        self._loaded = dict(self.entries)
+        self._rebuild_maps()
+        return self
+
+    def groups(self) -> List[Dict]:
+        """[{year, items}], newest year first, items newest first (then by title)."""
+        by_year: Dict[int, List[Dict]] = {}
+        for e in self.entries.values():
+            year = int(e["date"][:4]) if e.get("date", "")[:4].isdigit() else 0
+            by_year.setdefault(year, []).append(e)
+        return [{"year": y, "items": sorted(items, key=lambda e: (e.get("date", ""), e["title"]), reverse=True)}
+                for y, items in sorted(by_year.items(), reverse=True)]
+
+    def save(self) -> int:
+        """Write the data file(s); files whose content is unchanged are left alone. Returns files written."""
+        files: Dict[pathlib.Path, str] = {}
+        if self.per_year:
+            for g in self.groups():
+                files[self.path / f"{g['year']}.json"] = json.dumps(g, ensure_ascii=False, indent=1) + "\n"
+        else:
+            files[self.path] = json.dumps(self.groups(), ensure_ascii=False, indent=1) + "\n"
+        written = 0
+        for path, text in files.items():
+            try:
+                if path.read_text(encoding="utf-8") == text:
+                    continue
+            except OSError:
+                pass
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(path.name + ".tmp")
+            tmp.write_text(text, encoding="utf-8")
+            os.replace(tmp, path)
+            written += 1
+        if self.per_year:
+            for stale in set(self.path.glob("*.json")) - set(files):
+                stale.unlink()
+                written += 1
+        return written
+
+    def files(self) -> List[pathlib.Path]:
+        """The data file(s) as they are on disk."""
+        if self.per_year:
+            return sorted(self.path.glob("*.json"))
+        return [self.path] if self.path.exists() else []
+
+    # ---------- lookups ----------
+
+    def _rebuild_maps(self):
+        self._by = {k: {} for k in _KEY_KINDS}
+        self._keys = {}
+        for slug in sorted(self.entries):
+            self._post(slug)
+
+    def _post(self, slug: str):
+        e = self.entries[slug]
+        keys = self._keys[slug] = bundle_keys(e["title"], e.get("url_pdf", ""), e.get("publication", ""), e.get("doi", ""))
+        for kind in _KEY_KINDS:
+            if keys[kind]:
+                self._by[kind].setdefault(keys[kind], slug)
+
+    def find(self, title: str = "", url_pdf: str = "", publication: str = "", doi: str = "") -> Optional[str]:
+        keys = bundle_keys(title, url_pdf, publication, doi)
+        for kind in _KEY_KINDS:
+            slug = keys[kind] and self._by[kind].get(keys[kind])
+            if slug:
+                return slug
+        return None
+
+    def place(self, default_slug: str, **keys: str) -> str:
+        """Slug this paper already has in the data, else default_slug."""
+        return self.find(**keys) or default_slug
+
+    def put(self, entry: Dict):
+        """Add or replace the entry of entry["slug"]; an entry of the same paper under another
+        slug (it has since got a page bundle of its own) is dropped."""
+        slug = entry["slug"]
+        keys = bundle_keys(entry["title"], entry.get("url_pdf", ""), entry.get("publication", ""), entry.get("doi", ""))
+        other = self.find(entry["title"], entry.get("url_pdf", ""), entry.get("publication", ""), entry.get("doi", ""))
+        if other is not None and other != slug:
+            self._moved[slug] = other
+            del self.entries[other]
+        old = self._keys.get(slug)
+        self.entries[slug] = entry
+        if other not in (None, slug) or (old is not None and old != keys):
+            self._rebuild_maps()  # drop the stale keys
+        else:
+            self._post(slug)
+
+    def restore(self, slug: str):
+        """Undo this run's put() of slug: back to the loaded entry, or gone if it was new."""
+        if slug in self._loaded:
+            self.entries[slug] = self._loaded[slug]
+        else:
+            self.entries.pop(slug, None)
+        other = self._moved.pop(slug, None)
+        if other in self._loaded:
+            self.entries[other] = self._loaded[other]
+        self._rebuild_maps()
+
+
+def prunable(bundles: List[pathlib.Path], data: PublicationsData) -> List[pathlib.Path]:
+    """The bundles whose paper is in data under the bundle's own name, without a page:
+    deleting one of those loses nothing the list does not show."""
+    return [b for b in bundles if b.name in data.entries and not data.entries[b.name]["page"]]
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("root", type=pathlib.Path, help="content/publication directory")
+    ap.add_argument("--out", type=pathlib.Path, default=PUB_DATA, help="data/publications.json, or a directory for one file per year")
+    ap.add_argument("--prune", action="store_true", help="Delete the bundles that do not need a page of their own")
+    ap.add_argument("--dry-run", action="store_true")
+    args = ap.parse_args()
+
+    data = PublicationsData(args.out).load()  # entries of bundles pruned earlier stay
+    plain: List[pathlib.Path] = []
+    with os.scandir(args.root) as it:
+        bundles = sorted(pathlib.Path(d.path) for d in it if d.is_dir() and os.path.exists(os.path.join(d.path, "index.md")))
+    for bundle in bundles:
+        entry = entry_from_bundle(bundle)
+        if entry is None:
+            continue
+        data.put(entry)
+        if not entry["page"]:
+            plain.append(bundle)
+    n_pages = sum(1 for e in data.entries.values() if e["page"])
+    if args.dry_run:
+        print(f"[DRY_RUN] {len(data.entries)} papers -> {args.out}; {n_pages} keep a page, {len(plain)} would not need one")
+        if args.prune:
+            doomed = prunable(plain, data)
+            for bundle in doomed:
+                print(f"[DRY_RUN] Would prune {bundle}")
+            print(f"[DRY_RUN] Would prune {len(doomed)} bundles, keep {len(plain) - len(doomed)} without an entry of their own")
+        return
+    written = data.save()
+    print(f"{len(data.entries)} papers in {len(data.groups())} years -> {args.out} ({written} files written); "
+          f"{n_pages} keep a page")
+    if args.prune:
+        # only what the saved file really holds: re-read it rather than trust memory. A bundle
+        # whose paper went in under another slug (a duplicate of a paper with a page) stays.
+        doomed = prunable(plain, PublicationsData(args.out).load())
+        for bundle in doomed:
+            (bundle / "index.md").unlink()
+            bundle.rmdir()
+        section = args.root / "_index.md"
+        if doomed and not section.exists():
+            # with no page left in it, Hugo would drop the section and its list page
+            section.write_text("---\ntitle: Publications\n---\n", encoding="utf-8")
+        print(f"Pruned {len(doomed)} bundles that only held importer front matter"
+              + (f"; kept {len(plain) - len(doomed)} without an entry of their own" if len(doomed) < len(plain) else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -14,12 +14,26 @@ import sys
 import json
 import time
 import pathlib
+import argparse
+import hashlib
+import signal
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from contextlib import contextmanager
+from collections import defaultdict
 from urllib.parse import urlparse, parse_qs
-from datetime import datetime
-from typing import Iterable, List, Dict, Any, Optional, Tuple
-from slugify import slugify
+from datetime import datetime, timezone
+from typing import Callable, Iterable, List, Dict, Any, Optional, Tuple
 import random
 from scholarly import scholarly, ProxyGenerator
+import scholar_cassette  # record/replay via SCHOLAR_CASSETTE (scripts/scholar_cassette.py)
+from textnorm import sanitize_text, normalize_authors, scholar_slug, title_key as normalize_title_key
+from bundle_index import BundleIndex, arxiv_id_of
+from file_lock import file_lock
+import arxiv_index
+import pdf_mirror
+import publications_data
+from publications_data import PublicationsData
 # from scholarly._proxy_generator import MaxTriesExceededException  # optional
 
 # ----------------- CONFIG -----------------
@@ -30,6 +44,17 @@ SLEEP_BETWEEN_AUTHORS = float(os.environ.get("SLEEP_BETWEEN_AUTHORS", "5.0"))  #
 
 CACHE_DIR = pathlib.Path(os.environ.get("CACHE_DIR", "/home/huajzhang/pub_cache"))
 CACHE_DIR.mkdir(parents=True, exist_ok=True)
+BUNDLES = BundleIndex(OUT_DIR)  # what OUT_DIR already holds (scripts/bundle_index.py); refreshed in run()
+# "bundles": one page bundle per paper in OUT_DIR; "data": papers go to the PUB_DATA data file
+# and existing bundles are left alone (scripts/publications_data.py); loaded in run()
+PUB_OUTPUT = os.environ.get("PUB_OUTPUT", "bundles")
+PUBDATA = PublicationsData(publications_data.PUB_DATA) if PUB_OUTPUT == "data" else None
+
+# Adaptive pacing of Scholar requests (see RateController)
+SCHOLAR_MIN_DELAY = float(os.environ.get("SCHOLAR_MIN_DELAY", "1.0"))    # seconds between requests, best case
+SCHOLAR_MAX_DELAY = float(os.environ.get("SCHOLAR_MAX_DELAY", "60.0"))   # ceiling after repeated blocks
+SCHOLAR_BREAKER_TRIPS = int(os.environ.get("SCHOLAR_BREAKER_TRIPS", "4"))  # consecutive blocks before giving up
+SCHOLAR_COOLDOWN = float(os.environ.get("SCHOLAR_COOLDOWN", "1800"))     # seconds to stay off Scholar once tripped
 
 # ------------------------------------------
 
@@ -42,12 +67,98 @@ _HTTP_HEADERS = {
 }
 
 
-import unicodedata, html
+_PDF_OK = {}       # url -> bool
+_PDF_CHECKED = {}  # url -> epoch seconds of the check behind _PDF_OK[url]
+PDF_CACHE_DAYS = float(os.environ.get("PDF_CACHE_DAYS", "30"))  # re-verify remembered PDF links after this long
 
-_TAG_RE = re.compile(r"<[^>]+>")
 
+# ---------- Run metrics (per-stage timing, counters, HTTP latency) ----------
 
-_PDF_OK = {}  # url -> bool
+METRICS_OUT = os.environ.get("METRICS_OUT", "")  # default: CACHE_DIR/run_metrics.json
+
+# upper bounds (seconds) of the per-host latency histogram buckets; the last bucket is open
+_LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class RunMetrics:
+    """
+    Accumulates what a run spent its time on, dumped as one JSON report at the end:
+      stages   - wall time and call count per named stage (stages may nest, times are inclusive)
+      counters - fills, retries, blocks, cache hits/misses, PDF verdicts, ...
+      http     - per-host latency histogram of every request we time ourselves
+      sleep_s  - total time spent in deliberate sleeps (rate pacing, between authors)
+    """
+
+    def __init__(self):
+        self.started = time.time()
+        self.stage_s: Dict[str, float] = defaultdict(float)
+        self.stage_n: Dict[str, int] = defaultdict(int)
+        self.counters: Dict[str, int] = defaultdict(int)
+        self.http: Dict[str, Dict[str, Any]] = {}
+        self.sleep_s = 0.0
+
+    def reset(self):
+        """Start a new report (each refresh of --daemon gets its own)."""
+        self.__init__()
+
+    @contextmanager
+    def stage(self, name: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stage_s[name] += time.perf_counter() - t0
+            self.stage_n[name] += 1
+
+    def count(self, name: str, n: int = 1):
+        self.counters[name] += n
+
+    def sleep(self, seconds: float):
+        """time.sleep() that is accounted for in the report."""
+        if seconds <= 0:
+            return
+        self.sleep_s += seconds
+        time.sleep(seconds)
+
+    def observe_http(self, host: str, seconds: float):
+        h = self.http.setdefault(host, {"n": 0, "total_s": 0.0, "max_s": 0.0,
+                                        "buckets": [0] * (len(_LATENCY_BUCKETS) + 1)})
+        h["n"] += 1
+        h["total_s"] += seconds
+        h["max_s"] = max(h["max_s"], seconds)
+        i = 0
+        while i < len(_LATENCY_BUCKETS) and seconds > _LATENCY_BUCKETS[i]:
+            i += 1
+        h["buckets"][i] += 1
+
+    @contextmanager
+    def timed_request(self, url: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe_http(urlparse(url).netloc.lower() or url, time.perf_counter() - t0)
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "started": datetime.fromtimestamp(self.started, tz=timezone.utc).isoformat().replace("+00:00", "Z"),
+            "wall_s": round(time.time() - self.started, 3),
+            "sleep_s": round(self.sleep_s, 3),
+            "stages": {k: {"s": round(v, 3), "n": self.stage_n[k]} for k, v in sorted(self.stage_s.items())},
+            "counters": dict(sorted(self.counters.items())),
+            "http": {
+                host: dict(h, total_s=round(h["total_s"], 3), max_s=round(h["max_s"], 3),
+                           bucket_le=[*_LATENCY_BUCKETS, "inf"])
+                for host, h in sorted(self.http.items())
+            },
+        }
+
+    def write(self, path: pathlib.Path):
+        path.write_text(json.dumps(self.report(), indent=2), encoding="utf-8")
+        print(f"Metrics report: {path}")
+
+
+METRICS = RunMetrics()
 
 _BIBTEX_MONTH_MAP = {
     "jan": 1, "january": 1,
@@ -65,13 +176,69 @@ _BIBTEX_MONTH_MAP = {
 }
 
 def serves_pdf_cached(url: str) -> bool:
+    mirror = pdf_mirror.open_default()
+    if mirror is not None and mirror.local(url):
+        METRICS.count("pdf_mirror_hits")  # verified when it was mirrored; a stat instead of a HEAD
+        return True
     if url in _PDF_OK:
+        METRICS.count("pdf_cache_hits")
         return _PDF_OK[url]
-    ok = serves_pdf(url)
+    METRICS.count("pdf_cache_misses")
+    with METRICS.stage("pdf_check"):
+        ok = serves_pdf(url)
+    METRICS.count("pdf_verified" if ok else "pdf_rejected")
     _PDF_OK[url] = ok
+    _PDF_CHECKED[url] = time.time()
     return ok
 
 
+def pdf_cache_path() -> pathlib.Path:
+    return CACHE_DIR / "pdf_ok.json"
+
+
+def load_pdf_cache():
+    """Seed _PDF_OK with verdicts from earlier runs that are younger than PDF_CACHE_DAYS."""
+    path = pdf_cache_path()
+    if not path.exists():
+        return
+    try:
+        with file_lock(path, shared=True):
+            saved = json.loads(path.read_text(encoding="utf-8"))
+    except Exception:
+        return
+    cutoff = time.time() - PDF_CACHE_DAYS * 86400
+    for url, (ok, checked_at) in saved.items():
+        if checked_at >= cutoff and url not in _PDF_OK:
+            _PDF_OK[url] = bool(ok)
+            _PDF_CHECKED[url] = checked_at
+
+
+def expire_pdf_cache():
+    """Forget verdicts older than PDF_CACHE_DAYS; a long-running process re-checks them."""
+    cutoff = time.time() - PDF_CACHE_DAYS * 86400
+    for url in [u for u, ts in _PDF_CHECKED.items() if ts < cutoff]:
+        del _PDF_CHECKED[url]
+        _PDF_OK.pop(url, None)
+
+
+def save_pdf_cache():
+    """Merge this run's checks into pdf_ok.json (shards may share the file)."""
+    if DRY_RUN or not _PDF_CHECKED:
+        return
+    path = pdf_cache_path()
+    cutoff = time.time() - PDF_CACHE_DAYS * 86400
+    with file_lock(path):
+        try:
+            saved = json.loads(path.read_text(encoding="utf-8"))
+        except Exception:
+            saved = {}
+        saved.update({url: [_PDF_OK[url], ts] for url, ts in _PDF_CHECKED.items()})
+        saved = {url: v for url, v in saved.items() if v[1] >= cutoff}
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(saved, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, path)
+
+
 def month_from_arxiv_bib(bib: dict) -> int | None:
     """
     Extract month from modern arXiv IDs like arXiv:2212.10509 -> month=12.
@@ -94,17 +261,28 @@ def month_from_arxiv_bib(bib: dict) -> int | None:
 def cache_path_for_author(scholar_id: str) -> pathlib.Path:
     return CACHE_DIR / f"scholar_{scholar_id}.jsonl"
 
-def load_author_cache(scholar_id: str) -> tuple[list["PubRecord"], set[str]]:
+_PARSED_CACHES: Dict[pathlib.Path, tuple] = {}  # path -> ((size, mtime_ns), records, title_keys)
+
+
+def read_cache_file(path: pathlib.Path) -> tuple[list["PubRecord"], set[str]]:
     """
-    Return (records, title_keys).
+    Return (records, title_keys). Parsed files are kept while their size and mtime stay
+    the same, so a long-running process (--daemon) only re-parses what was appended to.
     """
-    path = cache_path_for_author(scholar_id)
     recs: list[PubRecord] = []
     keys: set[str] = set()
-    if not path.exists():
+    try:
+        st = path.stat()
+    except OSError:
         return recs, keys
-
-    for line in path.read_text(encoding="utf-8").splitlines():
+    memo = _PARSED_CACHES.get(path)
+    if memo is not None and memo[0] == (st.st_size, st.st_mtime_ns):
+        METRICS.count("author_cache_memo_hits")
+        return list(memo[1]), set(memo[2])
+
+    with file_lock(path, shared=True):
+        text = path.read_text(encoding="utf-8")
+    for line in text.splitlines():
         line = line.strip()
         if not line:
             continue
@@ -128,8 +306,12 @@ def load_author_cache(scholar_id: str) -> tuple[list["PubRecord"], set[str]]:
         except Exception:
             # Ignore malformed line; JSONL allows partial corruption without losing whole file
             continue
+    _PARSED_CACHES[path] = ((st.st_size, st.st_mtime_ns), list(recs), set(keys))
     return recs, keys
 
+def load_author_cache(scholar_id: str) -> tuple[list["PubRecord"], set[str]]:
+    return read_cache_file(cache_path_for_author(scholar_id))
+
 def append_author_cache(scholar_id: str, rec: "PubRecord"):
     path = cache_path_for_author(scholar_id)
     obj = {
@@ -143,9 +325,102 @@ def append_author_cache(scholar_id: str, rec: "PubRecord"):
         # keep bib optional; can help later debugging/dedup
         "bib": rec.bib,
     }
-    with path.open("a", encoding="utf-8") as f:
+    with file_lock(path), path.open("a", encoding="utf-8") as f:
         f.write(json.dumps(obj, ensure_ascii=False) + "\n")
 
+# ---------- Run journal (crash-safe resume) ----------
+
+JOURNAL_FRESH_HOURS = float(os.environ.get("JOURNAL_FRESH_HOURS", "20"))  # skip authors finished this recently
+
+
+def journal_pub_key(p: Dict[str, Any]) -> str:
+    return p.get("author_pub_id") or stub_title_key(p)
+
+
+class RunJournal:
+    """
+    Append-only JSONL log of per-author progress, replayed on start-up:
+      {"sid": ..., "event": "listed", "t": ..., "pending": [stub, ...]}   listing fetched
+      {"sid": ..., "event": "pub_done", "pub": key}                     one stub processed
+      {"sid": ..., "event": "done", "t": ...}                           author finished
+    Every event is flushed and fsync'ed, so a crash loses at most the pub in flight.
+    """
+
+    def __init__(self, path: pathlib.Path):
+        self.path = path
+        self.authors: Dict[str, Dict[str, Any]] = {}
+
+    def _apply(self, ev: Dict[str, Any]):
+        st = self.authors.setdefault(ev["sid"], {})
+        kind = ev["event"]
+        if kind == "state":
+            st.clear()
+            st.update({k: v for k, v in ev.items() if k not in ("sid", "event")})
+        elif kind == "listed":
+            st.update(status="listed", listed_at=ev["t"], fp=ev.get("fp"),
+                      pending={journal_pub_key(p): p for p in ev["pending"]})
+        elif kind == "pub_done":
+            st.get("pending", {}).pop(ev["pub"], None)
+        elif kind == "done":
+            st.update(status="done", done_at=ev["t"], pending={})
+
+    def _append(self, ev: Dict[str, Any]):
+        self._apply(ev)
+        with file_lock(self.path), self.path.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(ev, ensure_ascii=False, default=str) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def load(self):
+        """Replay the log, then rewrite it as one compact state line per author."""
+        if not self.path.exists():
+            return
+        with file_lock(self.path):
+            for line in self.path.read_text(encoding="utf-8").splitlines():
+                try:
+                    self._apply(json.loads(line))
+                except Exception:
+                    # torn last line after a crash; everything before it still counts
+                    continue
+            tmp = self.path.with_suffix(".tmp")
+            with tmp.open("w", encoding="utf-8") as f:
+                for sid, st in self.authors.items():
+                    f.write(json.dumps({"sid": sid, "event": "state", **st}, ensure_ascii=False, default=str) + "\n")
+            os.replace(tmp, self.path)
+
+    def _fresh(self, ts: Optional[float]) -> bool:
+        return bool(ts) and time.time() - ts < JOURNAL_FRESH_HOURS * 3600
+
+    def last_refreshed(self, sid: str) -> float:
+        """Epoch of the author's last completed refresh; 0 if it never finished."""
+        return float(self.authors.get(sid, {}).get("done_at") or 0.0)
+
+    def is_done_fresh(self, sid: str) -> bool:
+        st = self.authors.get(sid, {})
+        return st.get("status") == "done" and self._fresh(st.get("done_at"))
+
+    def pending(self, sid: str) -> Optional[List[Dict[str, Any]]]:
+        """Stubs left over from an interrupted listing, or None if the author must be re-listed."""
+        st = self.authors.get(sid, {})
+        if st.get("status") != "listed" or not self._fresh(st.get("listed_at")):
+            return None
+        return list(st["pending"].values())
+
+    def listed(self, sid: str, pubs: List[Dict[str, Any]], fp: Optional[Dict[str, Any]] = None):
+        self._append({"sid": sid, "event": "listed", "t": time.time(), "pending": pubs, "fp": fp})
+
+    def listing_fingerprint(self, sid: str) -> Optional[Dict[str, Any]]:
+        return self.authors.get(sid, {}).get("fp")
+
+    def pub_done(self, sid: str, p: Dict[str, Any]):
+        self._append({"sid": sid, "event": "pub_done", "pub": journal_pub_key(p)})
+
+    def author_done(self, sid: str):
+        self._append({"sid": sid, "event": "done", "t": time.time()})
+
+
+JOURNAL = RunJournal(CACHE_DIR / "run_journal.jsonl")
+
 def parse_bibtex_month(bibtex: str) -> int | None:
     if not bibtex:
         return None
@@ -160,12 +435,14 @@ def parse_bibtex_month(bibtex: str) -> int | None:
 
 
 def resolve_pub_date_ymd(*, year: int, pub_obj, bib: dict) -> tuple[int, int, int]:
-    # 1) BibTeX month
+    # 1) BibTeX month (a Scholar request like any other: paced by RATE, may trip the breaker)
     try:
-        bibtex = scholarly.bibtex(pub_obj)
+        bibtex = scholar_call(scholarly.bibtex, pub_obj, max_tries=2)
         mm = parse_bibtex_month(bibtex)
         if mm:
             return (year, mm, 1)
+    except StopFetching:
+        raise
     except Exception:
         pass
 
@@ -180,38 +457,142 @@ def resolve_pub_date_ymd(*, year: int, pub_obj, bib: dict) -> tuple[int, int, in
 def ymd_to_hugo_iso(y: int, m: int, d: int) -> str:
     return f"{y:04d}-{m:02d}-{d:02d}T00:00:00Z"
 
-def fill_with_backoff(obj, *, max_tries=6, base=2.0, jitter=0.5):
+# ---------- Adaptive rate control + circuit breaker ----------
+
+# scholarly surfaces blocks as MaxTriesExceededException / "Cannot Fetch" errors;
+# proxies and requests surface them as 429s or CAPTCHA pages.
+_BLOCK_RE = re.compile(
+    r"(captcha|\b429\b|too many requests|unusual traffic|maxtriesexceeded|cannot fetch)", re.I
+)
+
+
+class StopFetching(RuntimeError):
+    """No more Scholar requests this run; write what is cached and finish."""
+
+
+class CircuitOpen(StopFetching):
+    """Scholar blocked us SCHOLAR_BREAKER_TRIPS times in a row; stop fetching for this run."""
+
+
+class BudgetExhausted(StopFetching):
+    """The --max-runtime deadline (minus the write margin) has been reached."""
+
+
+# time.monotonic() after which no new Scholar request is started; set by main()
+FETCH_DEADLINE: Optional[float] = None
+
+
+def is_block_signal(e: BaseException) -> bool:
+    return bool(_BLOCK_RE.search(f"{type(e).__name__} {e}"))
+
+
+class RateController:
     """
-    Exponential backoff for scholarly.fill().
-    Keeps behavior polite: fewer retries, longer waits, random jitter.
+    One pacing state shared by every Scholar request in the run (AIMD):
+      - success: delay shrinks by a fixed step (additive increase of request rate)
+      - block:   delay doubles (multiplicative decrease of request rate)
+      - `trip_after` consecutive blocks open the circuit for `cooldown` seconds.
+    The state is saved under CACHE_DIR so the next cron run starts where this one left off.
     """
+
+    def __init__(self, min_delay: float, max_delay: float, trip_after: int, cooldown: float,
+                 step: float = 0.5, factor: float = 2.0, jitter: float = 0.3):
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.trip_after = trip_after
+        self.cooldown = cooldown
+        self.step = step
+        self.factor = factor
+        self.jitter = jitter
+        self.delay = min_delay
+        self.consecutive_blocks = 0
+        self.open_until = 0.0
+        self._last = 0.0
+
+    @property
+    def is_open(self) -> bool:
+        return time.time() < self.open_until
+
+    def wait(self):
+        """Sleep just long enough to keep `delay` (plus jitter) between requests."""
+        if self.is_open:
+            raise CircuitOpen(f"circuit open until {datetime.fromtimestamp(self.open_until):%H:%M:%S}")
+        target = self._last + self.delay * (1.0 + random.random() * self.jitter)
+        METRICS.sleep(target - time.monotonic())
+        self._last = time.monotonic()
+
+    def on_success(self):
+        self.consecutive_blocks = 0
+        self.delay = max(self.min_delay, self.delay - self.step)
+
+    def on_failure(self, e: BaseException) -> bool:
+        """Record a failed request. Returns True if it looked like a block."""
+        if not is_block_signal(e):
+            return False
+        self.consecutive_blocks += 1
+        self.delay = min(self.max_delay, max(self.min_delay, self.delay) * self.factor)
+        if self.consecutive_blocks >= self.trip_after:
+            self.open_until = time.time() + self.cooldown
+        return True
+
+    def state_path(self) -> pathlib.Path:
+        return CACHE_DIR / "rate_state.json"
+
+    def load(self):
+        path = self.state_path()
+        if not path.exists():
+            return
+        try:
+            obj = json.loads(path.read_text(encoding="utf-8"))
+            self.delay = min(self.max_delay, max(self.min_delay, float(obj.get("delay", self.delay))))
+            self.open_until = float(obj.get("open_until", 0.0))
+        except Exception:
+            pass
+
+    def save(self):
+        obj = {"delay": self.delay, "open_until": self.open_until}
+        if not DRY_RUN:
+            self.state_path().write_text(json.dumps(obj), encoding="utf-8")
+
+
+RATE = RateController(SCHOLAR_MIN_DELAY, SCHOLAR_MAX_DELAY, SCHOLAR_BREAKER_TRIPS, SCHOLAR_COOLDOWN)
+
+
+def scholar_call(fn, *args, max_tries=6, **kwargs):
+    """
+    Run one scholarly request under RATE. Blocks back off the shared delay and may
+    trip the breaker (raises CircuitOpen); other errors are retried at the current pace.
+    """
+    last_exc: Optional[BaseException] = None
     for t in range(max_tries):
+        if FETCH_DEADLINE is not None and time.monotonic() + RATE.delay >= FETCH_DEADLINE:
+            raise BudgetExhausted("wall-clock budget used up")
+        RATE.wait()
+        METRICS.count(f"scholar_{fn.__name__}")
         try:
-            return scholarly.fill(obj)
+            with METRICS.stage(f"scholar_{fn.__name__}"), METRICS.timed_request("https://scholar.google.com"):
+                result = fn(*args, **kwargs)
         except Exception as e:
-            
-            sleep_s = base * (1.5 ** t) + random.random() * jitter
-            print(f"  warn: fill failed ({type(e).__name__}): {e} | sleeping {sleep_s:.1f}s")
-            time.sleep(sleep_s)
-    raise RuntimeError("fill_with_backoff: exceeded retries")
+            last_exc = e
+            blocked = RATE.on_failure(e)
+            METRICS.count("scholar_retries")
+            if blocked:
+                METRICS.count("scholar_blocks")
+            kind = "blocked" if blocked else "failed"
+            print(f"  warn: {fn.__name__} {kind} ({type(e).__name__}): {e} | next delay {RATE.delay:.1f}s")
+            if RATE.is_open:
+                raise CircuitOpen(f"{RATE.consecutive_blocks} consecutive blocks from Scholar") from e
+            continue
+        RATE.on_success()
+        return result
+    raise RuntimeError(f"{fn.__name__}: exceeded retries") from last_exc
 
-def sanitize_text(s: str) -> str:
-    if not s:
-        return s
-    # 1) Remove any HTML tags Scholar might leak
-    s = _TAG_RE.sub("", s)
-    # 2) Unescape HTML entities (&amp; → &)
-    s = html.unescape(s)
-    # 3) Normalize Unicode: fold math/compat chars to plain ASCII letters
-    s = unicodedata.normalize("NFKC", s)
-    # 4) Drop zero-width & odd control chars
-    s = s.replace("\u200b", "").replace("\ufeff", "").replace("\u200c", "").replace("\u200d", "")
-    # 5) Optional: strip residual combining marks that sometimes encircle/overlay letters
-    s = "".join(ch for ch in s if unicodedata.category(ch) != "Mn")
-    # 6) Collapse whitespace
-    s = re.sub(r"\s+", " ", s).strip()
-    return s
 
+def fill_with_backoff(obj, *, max_tries=6, **fill_kwargs):
+    """
+    scholarly.fill() paced by the shared RateController instead of per-call sleeps.
+    """
+    return scholar_call(scholarly.fill, obj, max_tries=max_tries, **fill_kwargs)
 
 def is_likely_pdf_url(url: str) -> bool:
     if not url:
@@ -264,16 +645,24 @@ def rewrite_to_direct_pdf(url: str) -> str:
 
 def serves_pdf(url: str) -> bool:
     try:
-        r = requests.head(url, allow_redirects=True, timeout=_HTTP_TIMEOUT, headers=_HTTP_HEADERS)
+        with METRICS.timed_request(url):
+            r = requests.head(url, allow_redirects=True, timeout=_HTTP_TIMEOUT, headers=_HTTP_HEADERS)
         ctype = r.headers.get("Content-Type", "").lower()
         if "application/pdf" in ctype:
             return True
+    except requests.Timeout:
+        METRICS.count("http_timeouts")
     except Exception:
         pass
     try:
-        r = requests.get(url, stream=True, allow_redirects=True, timeout=_HTTP_TIMEOUT, headers=_HTTP_HEADERS)
+        with METRICS.timed_request(url):
+            r = requests.get(url, stream=True, allow_redirects=True, timeout=_HTTP_TIMEOUT, headers=_HTTP_HEADERS)
+        r.close()
         ctype = r.headers.get("Content-Type", "").lower()
         return "application/pdf" in ctype
+    except requests.Timeout:
+        METRICS.count("http_timeouts")
+        return False
     except Exception:
         return False
 
@@ -304,7 +693,7 @@ def extract_scholar_id(s: str) -> str:
     except Exception:
         return ""
 
-def read_inputs() -> List[str]:
+def read_inputs(args: List[str]) -> List[str]:
     ids = []
     env_urls = os.environ.get("SCHOLAR_URLS", "")
     if env_urls:
@@ -313,8 +702,8 @@ def read_inputs() -> List[str]:
             if sid:
                 ids.append(sid)
 
-    if len(sys.argv) >= 2:
-        arg = sys.argv[1]
+    if args:
+        arg = args[0]
         p = pathlib.Path(arg)
         if p.exists() and p.is_file():
             for line in p.read_text().splitlines():
@@ -322,7 +711,7 @@ def read_inputs() -> List[str]:
                 if sid:
                     ids.append(sid)
         else:
-            for a in sys.argv[1:]:
+            for a in args:
                 sid = extract_scholar_id(a)
                 if sid:
                     ids.append(sid)
@@ -336,12 +725,6 @@ def read_inputs() -> List[str]:
             seen.add(sid)
     return out
 
-def normalize_authors(bib_authors: str) -> List[str]:
-    if not bib_authors:
-        return []
-    parts = [p.strip() for p in re.split(r"\s+and\s+", bib_authors)]
-    return [re.sub(r"\s*\.\s*", ". ", p).strip() for p in parts if p]
-
 def year_to_iso(year: int) -> str:
     return f"{int(year):04d}-01-01T00:00:00Z"
 
@@ -371,6 +754,7 @@ def pick_pdf_url(pub: Dict[str, Any]) -> str:
             return u
     for u in uniq:
         if is_likely_pdf_url(u):
+            METRICS.count("pdf_heuristic")
             return u
     return ""
 
@@ -447,15 +831,6 @@ def infer_publication_string(bib: Dict[str, Any], pub: Dict[str, Any], pdf_url:
 
 
 
-def normalize_title_key(title: str) -> str:
-    """
-    Lowercase, remove non-alnum, compress spaces — good for equality/substring tests.
-    """
-    t = title.lower()
-    t = re.sub(r"[^a-z0-9\s]", " ", t)
-    t = re.sub(r"\s+", " ", t).strip()
-    return t
-
 def titles_overlap(a: str, b: str) -> bool:
     """
     Consider as same if equal or one is a substring of the other after normalization.
@@ -531,10 +906,24 @@ class PubRecord:
 #         print(f"Wrote {dst}")
 
 
-def write_bundle(title: str, authors: List[str], y: int, m: int, d: int, pdf_url: str, publication: str):
-    """Write Hugo bundle; now date supports month (fallback Jan)."""
-    date_iso = ymd_to_hugo_iso(y, m, d)
+def bundle_dir(title: str, y: int, pdf_url: str = "", publication: str = "") -> pathlib.Path:
+    """The paper's existing folder in OUT_DIR if any (by DOI, arXiv id or title), else its slug."""
+    d = BUNDLES.place(OUT_DIR / scholar_slug(f"{title[:80]}-{y}"),
+                      title=title, url_pdf=pdf_url, publication=publication)
+    if PUBDATA is not None and not d.exists():
+        d = OUT_DIR / PUBDATA.place(d.name, title=title, url_pdf=pdf_url, publication=publication)
+    return d
+
 
+def mirrored_pdf(pdf_url: str) -> Optional[str]:
+    """Site URL of the copy scripts/pdf_mirror.py holds of pdf_url, or None."""
+    mirror = pdf_mirror.open_default()
+    return mirror.local(pdf_url) if mirror is not None and pdf_url else None
+
+
+def render_bundle(title: str, authors: List[str], date_iso: str, publication: str, pdf_url: str,
+                  local: Optional[str] = None) -> str:
+    """index.md of a publication bundle; merge_sources.py writes the same text."""
     fm = []
     fm.append("---")
     fm.append('title: "{}"'.format(title.replace('"', '\\"')))
@@ -546,26 +935,198 @@ def write_bundle(title: str, authors: List[str], y: int, m: int, d: int, pdf_url
     fm.append("draft: false")
     fm.append('publication: "{}"'.format(publication.replace('"', '\\"') if publication else ""))
     fm.append(f'url_pdf: "{pdf_url}"' if pdf_url else 'url_pdf: ""')
+    if local:
+        fm.append(f'url_pdf_local: "{local}"')
     fm.append("image:")
     fm.append("  preview_only: true")
     fm.append("---\n")
+    return "\n".join(fm)
+
+
+def write_bundle(title: str, authors: List[str], y: int, m: int, d: int, pdf_url: str, publication: str) -> pathlib.Path:
+    """Write Hugo bundle; now date supports month (fallback Jan). Returns the index.md path."""
+    date_iso = ymd_to_hugo_iso(y, m, d)
+    dst_dir = bundle_dir(title, y, pdf_url, publication)
+    local = mirrored_pdf(pdf_url)
 
-    slug = slugify(f"{title[:80]}-{y}")
-    dst_dir = OUT_DIR / slug
-    dst_dir.mkdir(parents=True, exist_ok=True)
     dst = dst_dir / "index.md"
-    content = "\n".join(fm)
+    if PUBDATA is not None:
+        # data mode: the entry goes to PUB_DATA; a bundle that exists is a page someone kept
+        PUBDATA.put(publications_data.importer_entry(dst_dir, title, authors, date_iso, publication, pdf_url,
+                                                     url_pdf_local=local or ""))
+        METRICS.count("data_entries_written")
+        return dst
+    dst_dir.mkdir(parents=True, exist_ok=True)
+    content = render_bundle(title, authors, date_iso, publication, pdf_url, local)
 
     if DRY_RUN:
         print(f"[DRY_RUN] Would write {dst}:\n{content}")
     else:
         dst.write_text(content, encoding="utf-8")
+        BUNDLES.record(dst_dir)
         print(f"Wrote {dst}")
+    METRICS.count("bundles_written")
+    return dst
+
+
+# ---------- Profile fingerprint (conditional refresh) ----------
+
+FINGERPRINT_TTL_DAYS = float(os.environ.get("FINGERPRINT_TTL_DAYS", "7"))  # force a full walk this often
+FINGERPRINT_HEAD = int(os.environ.get("FINGERPRINT_HEAD", "100"))         # stubs in the probe (one Scholar page)
+
+
+def fingerprint_path_for_author(scholar_id: str) -> pathlib.Path:
+    return CACHE_DIR / f"scholar_{scholar_id}.fingerprint.json"
+
+
+def load_fingerprint(scholar_id: str) -> Optional[Dict[str, Any]]:
+    path = fingerprint_path_for_author(scholar_id)
+    if not path.exists():
+        return None
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except Exception:
+        return None
+
+
+def save_fingerprint(scholar_id: str, fp: Dict[str, Any]):
+    path = fingerprint_path_for_author(scholar_id)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(fp, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def author_fingerprint(author: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Cheap summary of a profile from the date-sorted probe page:
+    listed pub count (capped at FINGERPRINT_HEAD), newest pub year/title, citedby total.
+    """
+    listing = author.get("publications", []) or []
+    newest = (listing[0].get("bib", {}) or {}) if listing else {}
+    year = newest.get("pub_year")
+    return {
+        "n_pubs": len(listing),
+        "newest_year": int(year) if str(year or "").isdigit() else None,
+        "newest_title": sanitize_text((newest.get("title") or "").strip()),
+        "citedby": author.get("citedby"),
+        "checked_at": time.time(),
+    }
+
+
+_FP_FIELDS = ("n_pubs", "newest_year", "newest_title", "citedby")
+
+
+def fingerprint_unchanged(new: Dict[str, Any], old: Optional[Dict[str, Any]]) -> bool:
+    return bool(old) and all(new.get(k) == old.get(k) for k in _FP_FIELDS)
+
+
+def new_listing_head(listing: List[Dict[str, Any]], old: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+    """
+    Stubs above the previously newest pub in a date-sorted listing, or None if that pub
+    is not on the probe page any more (too many new pubs, or it was edited/removed).
+    """
+    old_key = normalize_title_key(old.get("newest_title") or "")
+    if not old_key:
+        return None
+    for i, p in enumerate(listing):
+        if stub_title_key(p) == old_key:
+            return listing[:i]
+    return None
+
+
+# ---------- Offline arXiv metadata (ARXIV_INDEX, see arxiv_index.py) ----------
+
+def enrich_from_arxiv(rec: PubRecord) -> PubRecord:
+    """
+    Fill what Scholar leaves out of arXiv-hosted records from the local arXiv index:
+    the full author list, the v1 day and month (same year only, YEAR_FROM filtering is
+    by Scholar's year) and the journal-ref venue when Scholar only says arXiv.
+    """
+    idx = arxiv_index.open_default()
+    if idx is None:
+        return rec
+    bib = rec.bib or {}
+    aid = arxiv_id_of(rec.pdf_url, bib.get("journal", ""), bib.get("eprint", ""), bib.get("url", ""))
+    meta = idx.get(aid) if aid else None
+    if not meta:
+        METRICS.count("arxiv_index_misses")
+        return rec
+    METRICS.count("arxiv_index_hits")
+    authors = meta.get("authors") or []
+    if len(authors) > len(rec.authors):
+        rec.authors = authors
+    date = meta.get("date", "")
+    if date[:4] == f"{rec.year:04d}":
+        rec.month, rec.day = int(date[5:7]), int(date[8:10])
+    if meta.get("journal_ref") and rec.publication in ("", "arXiv"):
+        rec.publication = meta["journal_ref"]
+    return rec
+
+
+def collect_pub(scholar_id: str, p: Dict[str, Any], cur_year: int) -> Optional[PubRecord]:
+    """
+    Fill one publication stub and turn it into a PubRecord, or None if it is filtered out.
+    Raises StopFetching so the caller can stop without marking the stub as done.
+    """
+    try:
+        # p = scholarly.fill(p)
+        p = fill_with_backoff(p)
+    except StopFetching:
+        raise
+    except Exception as e:
+        print(f"  warn: failed to fill a pub for {scholar_id}: {e}")
+        return None
+
+    bib = dict(p.get("bib", {}) or {})
+    bib.pop("abstract", None)
+
+    raw_title = (bib.get("title") or "").strip()
+    title = sanitize_text(raw_title)
+    if not title:
+        return None
+
+    # year
+    yr = None
+    for k in ("pub_year", "year"):
+        v = bib.get(k)
+        if v:
+            try:
+                yr = int(v)
+                break
+            except:
+                pass
+    if not yr or yr < YEAR_FROM or yr > cur_year:
+        return None
+
+    y, m, d = resolve_pub_date_ymd(year=yr, pub_obj=p, bib=bib)
+
+    authors = normalize_authors(bib.get("author"))
+    pdf_url = pick_pdf_url(p)
+
+    publication = infer_publication_string(bib, p, pdf_url)  # pass pdf_url here
+    if pdf_url:
+        print(f"  ✔ PDF: {pdf_url}")
+    else:
+        print(f"  ✖ No PDF for: {title}")
+
+    return enrich_from_arxiv(PubRecord(
+        title=title, authors=authors,
+        year=yr, month=m, day=d,
+        pdf_url=pdf_url, publication=publication, bib=bib
+    ))
+
+
+def stub_title_key(p: Dict[str, Any]) -> str:
+    bib0 = p.get("bib", {}) or {}
+    title0 = sanitize_text((bib0.get("title") or "").strip())
+    return normalize_title_key(title0) if title0 else ""
 
 
 def import_author_by_id_collect(scholar_id: str, seen_titles: set) -> List[PubRecord]:
     """
     Fetch publications for a single author and return PubRecord list (no writing here).
+    Progress goes to JOURNAL, so a crashed or blocked run resumes from the pending stubs
+    instead of re-fetching the author listing.
     """
     out: List[PubRecord] = []
     cached_recs, cached_keys = load_author_cache(scholar_id)
@@ -573,164 +1134,751 @@ def import_author_by_id_collect(scholar_id: str, seen_titles: set) -> List[PubRe
         print(f"Loaded {len(cached_recs)} cached pubs for {scholar_id}")
         out.extend(cached_recs)
 
-    print(f"Fetching author: {scholar_id}")
-    author = scholarly.search_author_id(scholar_id)
-    if not author:
-        print(f"  warn: no author found for {scholar_id} (invalid ID or blocked)")
-        return out
-    author = fill_with_backoff(author)
-    # author = scholarly.fill(author, sections=["basics", "publications"])
-    pubs = author.get("publications", []) or []
+    pubs = JOURNAL.pending(scholar_id)
+    if pubs is not None:
+        print(f"Resuming author: {scholar_id} ({len(pubs)} pubs pending)")
+    else:
+        print(f"Fetching author: {scholar_id}")
+        author = scholar_call(scholarly.search_author_id, scholar_id)
+        if not author:
+            print(f"  warn: no author found for {scholar_id} (invalid ID or blocked)")
+            return out
+        unfilled = dict(author, filled=list(author.get("filled", [])))
+        # probe: basics + first page of the date-sorted listing, a single request
+        author = fill_with_backoff(author, sections=["basics", "publications"], sortby="year",
+                                   publication_limit=FINGERPRINT_HEAD)
+        listing = author.get("publications", []) or []
+        fp = author_fingerprint(author)
+        old_fp = load_fingerprint(scholar_id)
+        full_walk_at = (old_fp or {}).get("full_walk_at", 0.0)
+        full_due = time.time() - full_walk_at > FINGERPRINT_TTL_DAYS * 86400
+
+        head = None
+        if old_fp and not full_due:
+            if fingerprint_unchanged(fp, old_fp):
+                METRICS.count("fingerprint_unchanged")
+                print(f"  profile unchanged since {datetime.fromtimestamp(old_fp['checked_at']):%Y-%m-%d}; skipping walk")
+                save_fingerprint(scholar_id, dict(fp, full_walk_at=full_walk_at))
+                JOURNAL.author_done(scholar_id)
+                return out
+            head = new_listing_head(listing, old_fp)
+        if head is not None:
+            print(f"  profile changed; walking {len(head)} new pubs at the head of the listing")
+            listing = head
+            fp["full_walk_at"] = full_walk_at
+        else:
+            if len(listing) >= FINGERPRINT_HEAD:
+                author = fill_with_backoff(unfilled, sections=["basics", "publications"], sortby="year")
+                listing = author.get("publications", []) or []
+            fp["full_walk_at"] = time.time()
+        # already-cached stubs never need network, so they are not journaled as pending
+        pubs = [p for p in listing if stub_title_key(p) not in cached_keys]
+        JOURNAL.listed(scholar_id, pubs, fp=fp)
     cur_year = datetime.utcnow().year
 
     for p in pubs:
-        bib0 = p.get("bib", {}) or {}
-        raw_title0 = (bib0.get("title") or "").strip()
-        title0 = sanitize_text(raw_title0)
-        if title0:
-            key0 = normalize_title_key(title0)
-            if key0 in cached_keys:
-                # already cached, skip all network
-                continue
-
-        try:
-            # p = scholarly.fill(p)
-            p = fill_with_backoff(p)
-            time.sleep(0.8 + random.random() * 0.6)  # small per-publication jitter
-        except Exception as e:
-            print(f"  warn: failed to fill a pub for {scholar_id}: {e}")
-            continue
-
-        bib = p.get("bib", {}) or {}
-
-        bib = dict(p.get("bib", {}) or {})
-        bib.pop("abstract", None)
+        key0 = stub_title_key(p)
+        if key0 and key0 in cached_keys:
+            METRICS.count("pub_cache_hits")
+        else:
+            METRICS.count("pub_cache_misses")
+            rec = collect_pub(scholar_id, p, cur_year)
+            if rec is not None:
+                out.append(rec)
+                # persist immediately so we can resume if blocked mid-run
+                append_author_cache(scholar_id, rec)
+                cached_keys.add(normalize_title_key(rec.title))
+        JOURNAL.pub_done(scholar_id, p)
+
+    # only a finished walk may vouch for the profile; a crash mid-walk re-probes next time
+    fp = JOURNAL.listing_fingerprint(scholar_id)
+    if fp:
+        save_fingerprint(scholar_id, fp)
+    JOURNAL.author_done(scholar_id)
+    return out
 
+# ---------- Incremental merge ----------
 
-        raw_title = (bib.get("title") or "").strip()
-        title = sanitize_text(raw_title)
-        # title = (bib.get("title") or "").strip()
-        if not title:
-            continue
+def record_json(r: PubRecord) -> str:
+    return json.dumps([r.title, r.authors, r.year, r.month, r.day, r.pdf_url, r.publication, r.bib],
+                      sort_keys=True, ensure_ascii=False, default=str)
 
-        # dedupe exact-normalized titles across all PIs (legacy guard)
-        norm_title = re.sub(r"\s+", " ", title.lower())
-        # (keep collecting; cross-author merge will handle overlaps later)
-        # year
-        yr = None
-        for k in ("pub_year", "year"):
-            v = bib.get(k)
-            if v:
-                try:
-                    yr = int(v)
-                    break
-                except:
-                    pass
-        if not yr or yr < YEAR_FROM or yr > cur_year:
-            continue
 
-        # y, m, d = resolve_pub_date_ymd(year=yr, pub_obj=p)
-        y, m, d = resolve_pub_date_ymd(year=yr, pub_obj=p, bib=bib)
+MergeRank = Tuple[int, int, int, str]
 
-        authors = normalize_authors(bib.get("author"))
-        pdf_url = pick_pdf_url(p)
 
-        publication = infer_publication_string(bib, p, pdf_url)  # pass pdf_url here
-        if pdf_url:
-            print(f"  ✔ PDF: {pdf_url}")
-        else:
-            print(f"  ✖ No PDF for: {title}")
+def merge_rank(rec: PubRecord) -> MergeRank:
+    return rec.richness(), len(rec.title), rec.year, record_json(rec)
 
-        # publication = infer_publication_string(bib, p)  # NEW
 
+def supersedes(new: MergeRank, old: MergeRank) -> bool:
+    """
+    Richer entry wins; if richness ties, the one with longer title, then newer year.
+    The record itself breaks any remaining tie, so the winner of a group of duplicates
+    does not depend on which author's copy arrived first (authors finish in schedule
+    order, and BundleStream writes as they do).
+    """
+    return new > old
 
-        rec = PubRecord(
-            title=title, authors=authors,
-            year=yr, month=m, day=d,
-            pdf_url=pdf_url, publication=publication, bib=bib
-        )
-        out.append(rec)
 
-        # persist immediately so we can resume if blocked mid-run
-        append_author_cache(scholar_id, rec)
-        cached_keys.add(normalize_title_key(rec.title))
+class TitleIndex:
+    """
+    Finds the first indexed title that titles_overlap() a new one, without comparing
+    against every title seen so far.
+
+    If key Q is a substring of key K, every interior token of Q (all but the first and
+    the last, which may be cut mid-word) is a whole token of K. So Q is only compared
+    with titles containing Q's rarest interior token, plus titles whose own posted
+    interior token occurs in Q (the K-in-Q direction). Keys with fewer than three tokens
+    have no interior token and are compared with everything.
+    """
 
+    def __init__(self):
+        self.keys: List[str] = []
+        self._by_token: Dict[str, List[int]] = defaultdict(list)     # token -> slots containing it
+        self._by_interior: Dict[str, List[int]] = defaultdict(list)  # one interior token per slot
+        self._short: List[int] = []
+
+    def _post(self, i: int, key: str):
+        toks = key.split()
+        for t in set(toks):
+            self._by_token[t].append(i)
+        if len(toks) < 3:
+            self._short.append(i)
+        else:
+            self._by_interior[max(toks[1:-1], key=len)].append(i)
+
+    def add(self, key: str) -> int:
+        self.keys.append(key)
+        self._post(len(self.keys) - 1, key)
+        return len(self.keys) - 1
+
+    def replace(self, i: int, key: str):
+        # postings of the old key stay behind; they only cost an extra comparison
+        self.keys[i] = key
+        self._post(i, key)
+
+    def find(self, key: str) -> Optional[int]:
+        toks = key.split()
+        if len(toks) < 3:
+            cands = range(len(self.keys))
+        else:
+            inner = min(toks[1:-1], key=lambda t: len(self._by_token.get(t, ())))
+            found = set(self._by_token.get(inner, ()))
+            for t in set(toks):
+                found.update(self._by_interior.get(t, ()))
+            found.update(self._short)
+            cands = sorted(found)
+        for i in cands:
+            k = self.keys[i]
+            if key == k or key in k or k in key:
+                return i
+        return None
 
-    return out
 
 def merge_pub_lists(records: List[PubRecord]) -> List[PubRecord]:
     """
     Merge near-duplicate titles: keep the one with more information.
     """
     kept: List[PubRecord] = []
+    index = TitleIndex()
     for rec in records:
-        matched_idx: Optional[int] = None
-        for i, old in enumerate(kept):
-            if titles_overlap(rec.title, old.title):
-                matched_idx = i
-                break
-        if matched_idx is None:
+        key = normalize_title_key(rec.title)
+        i = index.find(key)
+        if i is None:
+            index.add(key)
             kept.append(rec)
-        else:
-            old = kept[matched_idx]
-            # Decide which one to keep
-            if rec.richness() > old.richness():
-                kept[matched_idx] = rec
-            else:
-                # If richness ties, keep the one with longer title or (as tiebreaker) newer year
-                if rec.richness() == old.richness():
-                    if len(rec.title) > len(old.title) or rec.year > old.year:
-                        kept[matched_idx] = rec
-                    # else keep old
-                # else keep old
-            # Optionally, we could union author lists; you asked to keep names as-is,
-            # but richer entry likely already has the full list.
+        elif supersedes(merge_rank(rec), merge_rank(kept[i])):
+            index.replace(i, key)
+            kept[i] = rec
     return kept
 
-def main():
-    setup_scholar()
-    ids = read_inputs()
+
+_UNCHANGED = object()
+
+
+class BundleStream:
+    """
+    Online merge_pub_lists() that writes as it goes: feed it one author's records at a
+    time and the winning bundles are written straight away. A richer duplicate arriving
+    with a later author rewrites that bundle, moving it if the slug changes (the old
+    index.md is restored to what it was before this run, or removed if this run created
+    it). Only title keys, ranks and paths are kept, not the records.
+    """
+
+    def __init__(self):
+        self.index = TitleIndex()
+        self.records_in = 0
+        self._rank: List[MergeRank] = []
+        self._path: List[Optional[pathlib.Path]] = []
+        self._owner: Dict[pathlib.Path, int] = {}   # index.md -> slot that wrote it last
+        self._prior: Dict[pathlib.Path, Any] = {}   # index.md -> text before this run (None: absent)
+
+    def add(self, records: List[PubRecord]):
+        winners: Dict[int, PubRecord] = {}
+        with METRICS.stage("merge"):
+            for rec in records:
+                key = normalize_title_key(rec.title)
+                rank = merge_rank(rec)
+                i = self.index.find(key)
+                if i is None:
+                    i = self.index.add(key)
+                    self._rank.append(rank)
+                    self._path.append(None)
+                elif supersedes(rank, self._rank[i]):
+                    self.index.replace(i, key)
+                    self._rank[i] = rank
+                else:
+                    continue
+                winners[i] = rec
+        self.records_in += len(records)
+        METRICS.count("records_merged_in", len(records))
+        with METRICS.stage("write"):
+            for i, rec in winners.items():
+                self._emit(i, rec)
+
+    @property
+    def written(self) -> List[pathlib.Path]:
+        """Bundles this stream wrote and still owns."""
+        return list(self._owner)
+
+    def _emit(self, i: int, rec: PubRecord):
+        old = self._path[i]
+        dst = bundle_dir(rec.title, rec.year, rec.pdf_url, rec.publication) / "index.md"
+        if old is not None:
+            METRICS.count("bundles_rewritten")
+            if old != dst:
+                self._retract(old, i)
+        first = not DRY_RUN and dst not in self._prior
+        before = dst.read_text(encoding="utf-8") if first and dst.exists() else None
+        write_bundle(
+            title=rec.title,
+            authors=rec.authors,
+            y=rec.year,
+            m=rec.month,
+            d=rec.day,
+            pdf_url=rec.pdf_url,
+            publication=rec.publication
+        )
+        if first:
+            same = before is not None and before == dst.read_text(encoding="utf-8")
+            self._prior[dst] = _UNCHANGED if same else before
+        self._path[i] = dst
+        self._owner[dst] = i
+
+    def _retract(self, path: pathlib.Path, i: int):
+        if self._owner.get(path) != i:
+            return  # another title has written this slug since
+        del self._owner[path]
+        METRICS.count("bundles_retracted")
+        if PUBDATA is not None:
+            PUBDATA.restore(path.parent.name)
+            return
+        if DRY_RUN:
+            print(f"[DRY_RUN] Would retract {path}")
+            return
+        prior = self._prior.get(path, _UNCHANGED)
+        if prior is None:
+            path.unlink(missing_ok=True)
+            try:
+                path.parent.rmdir()
+            except OSError:
+                pass  # bundle dir holds other files
+            BUNDLES.forget(path.parent)
+            print(f"Retracted {path}")
+        elif prior is not _UNCHANGED:
+            path.write_text(prior, encoding="utf-8")
+            BUNDLES.record(path.parent)
+            print(f"Restored {path}")
+
+# ---------- Stage cache (skip merge + write when nothing changed) ----------
+
+def records_digest(records: List[PubRecord]) -> str:
+    h = hashlib.sha1()
+    for r in records:
+        h.update(record_json(r).encode("utf-8"))
+        h.update(b"\n")
+    return h.hexdigest()
+
+
+def code_digest() -> str:
+    """Merging/rendering code: a change to it must invalidate the stage cache."""
+    h = hashlib.sha1()
+    for mod in (sys.modules[__name__], sys.modules["textnorm"], publications_data):
+        h.update(pathlib.Path(mod.__file__).read_bytes())
+    return h.hexdigest()
+
+
+class StageCache:
+    """
+    Digests of each stage's output, from the last run that wrote bundles:
+      authors  author id -> digest of its records
+      merged   digest of the code, OUT_DIR and all author digests (= the merged set)
+      bundles  index.md path -> [size, mtime_ns] for every bundle written
+    Records go in author by author. While every author matches the last run, nothing is
+    merged and only a way to reload the records is kept; the first difference starts a
+    BundleStream, replaying the authors held so far. If the end is reached without a
+    difference and the bundles are untouched on disk, merge and write are skipped.
+    The schedule reorders authors every run, so the merged set is keyed by id, not order;
+    that is sound because supersedes() picks the same winner in any arrival order.
+    A DRY_RUN reads the digests but never touches them.
+    """
+
+    def __init__(self, path: pathlib.Path):
+        self.path = path
+        self.stream: Optional[BundleStream] = None
+        self.authors: Dict[str, str] = {}
+        self._held: List[Callable[[], List[PubRecord]]] = []
+        try:
+            self.prev = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self.prev = {}
+
+    def add(self, sid: str, records: List[PubRecord], reload: Optional[Callable[[], List[PubRecord]]] = None):
+        with METRICS.stage("stage_digest"):
+            digest = self.authors[sid] = records_digest(records)
+        if self.stream is None:
+            if self.prev.get("authors", {}).get(sid) == digest:
+                METRICS.count("stage_authors_unchanged")
+                self._held.append(reload or (lambda: records))
+                return
+            self._start(f"{sid} changed")
+        self.stream.add(records)
+
+    def _start(self, why: str):
+        print(f"Stage cache: {why}; merging and writing bundles")
+        if not DRY_RUN:
+            self.path.unlink(missing_ok=True)  # a run that dies mid-write must not look complete
+        self.stream = BundleStream()
+        for load in self._held:
+            self.stream.add(load())
+        self._held = []
+
+    def _bundles_intact(self) -> bool:
+        for path, (size, mtime_ns) in self.prev.get("bundles", {}).items():
+            try:
+                st = os.stat(path)
+            except OSError:
+                return False
+            if st.st_size != size or st.st_mtime_ns != mtime_ns:
+                return False
+        return True
+
+    def finish(self) -> Optional[BundleStream]:
+        """Run merge + write unless they can be skipped; None when skipped."""
+        h = hashlib.sha1(f"{code_digest()}\n{OUT_DIR.resolve()}\n{PUB_OUTPUT}:{publications_data.PUB_DATA}\n".encode("utf-8"))
+        h.update(json.dumps(self.authors, sort_keys=True).encode("utf-8"))
+        merged = h.hexdigest()
+        if self.stream is None:
+            if merged == self.prev.get("merged") and self._bundles_intact():
+                METRICS.count("stage_merge_skipped")
+                print(f"Stage cache: {len(self.authors)} authors unchanged, bundles intact; skipping merge and write")
+                return None
+            self._start("author set, code or bundles changed")
+        if DRY_RUN:
+            return self.stream
+        written = self.stream.written
+        if PUBDATA is not None:
+            PUBDATA.save()
+            written = [p for p in written if p.exists()] + PUBDATA.files()
+        bundles = {}
+        for path in written:
+            st = os.stat(path)
+            bundles[str(path)] = [st.st_size, st.st_mtime_ns]
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"authors": self.authors, "merged": merged, "bundles": bundles}), encoding="utf-8")
+        os.replace(tmp, self.path)
+        return self.stream
+
+
+def schedule_authors(ids: List[str]) -> List[str]:
+    """
+    Most stale first: authors that never finished, then oldest last refresh.
+    A run that is cut short therefore always spends its time on whoever waited longest,
+    so every author is refreshed within ~len(ids) / authors-per-run runs.
+    """
+    return sorted(ids, key=JOURNAL.last_refreshed)  # stable: ties keep list order
+
+
+# ---------- Sharding across runner machines ----------
+
+def shard_of(scholar_id: str, n_shards: int) -> int:
+    """Stable across machines and Python runs (unlike hash())."""
+    return int(hashlib.sha1(scholar_id.encode("utf-8")).hexdigest(), 16) % n_shards
+
+
+def parse_shard(spec: str) -> Tuple[int, int]:
+    try:
+        i, n = (int(x) for x in spec.split("/", 1))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected i/N, got {spec!r}")
+    if n < 1 or not 0 <= i < n:
+        raise argparse.ArgumentTypeError(f"shard index must satisfy 0 <= i < N, got {spec!r}")
+    return i, n
+
+
+def shard_cache_dir(i: int, n: int) -> pathlib.Path:
+    return CACHE_DIR / f"shard-{i}-of-{n}"
+
+
+def use_cache_dir(path: pathlib.Path):
+    """Point every cache file (author JSONL, fingerprints, journal, rate state) at `path`."""
+    global CACHE_DIR
+    CACHE_DIR = path
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    JOURNAL.path = CACHE_DIR / "run_journal.jsonl"
+
+
+def collect_cached_records(dirs: List[pathlib.Path], ids: List[str]) -> List[Tuple[str, List[PubRecord]]]:
+    """
+    Gather scholar_<id>.jsonl from every shard cache dir, as (id, records) pairs; roster
+    order first, then the rest by id, so the merge is deterministic however the roster
+    was sharded.
+    """
+    by_sid: Dict[str, List[PubRecord]] = {}
+    for d in dirs:
+        for path in sorted(d.glob("scholar_*.jsonl")):
+            sid = path.name[len("scholar_"):-len(".jsonl")]
+            by_sid.setdefault(sid, []).extend(read_cache_file(path)[0])
+    order = [sid for sid in ids if sid in by_sid] + sorted(set(by_sid) - set(ids))
+    return [(sid, by_sid[sid]) for sid in order]
+
+
+def report_merge(stream: Optional[BundleStream]):
+    if stream is not None:
+        print(f"Merged {stream.records_in} pubs into {len(stream.index.keys)} bundles")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    ap = argparse.ArgumentParser(description="Import Google Scholar publications as Hugo bundles.")
+    ap.add_argument("inputs", nargs="*", help="Scholar IDs/URLs, or a file with one per line")
+    ap.add_argument("--max-runtime", type=float, default=float(os.environ.get("MAX_RUNTIME", "0")),
+                    help="Wall-clock budget in seconds (0 = unlimited); fetching stops early enough to write")
+    ap.add_argument("--shard", type=parse_shard, default=None, metavar="i/N",
+                    help="Fetch only authors with sha1(id) %% N == i into CACHE_DIR/shard-i-of-N; no bundles are written")
+    ap.add_argument("--fetch-only", action="store_true",
+                    help="Fill CACHE_DIR but write no bundles; scripts/merge_sources.py merges and writes")
+    ap.add_argument("--merge", nargs="*", type=pathlib.Path, default=None, metavar="CACHE_DIR",
+                    help="Skip fetching; merge the given shard caches (default: CACHE_DIR and its shard-* dirs) and write bundles")
+    ap.add_argument("--metrics-out", type=pathlib.Path, default=METRICS_OUT or None,
+                    help="Where to write the JSON metrics report (default: CACHE_DIR/run_metrics.json)")
+    ap.add_argument("--daemon", action="store_true",
+                    help="Stay running: refresh every --interval seconds and on POST /refresh (see DaemonHandler)")
+    ap.add_argument("--interval", type=float, default=DAEMON_INTERVAL, help="Seconds between scheduled refreshes with --daemon")
+    ap.add_argument("--listen", default=DAEMON_LISTEN, metavar="HOST:PORT",
+                    help="Trigger/status endpoint with --daemon ('' = none)")
+    ap.add_argument("--profile", type=pathlib.Path, default=None, metavar="PSTATS",
+                    help="Run under cProfile and dump stats here (inspect with python -m pstats)")
+    return ap.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    profiler = None
+    if args.profile:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        run(args)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(str(args.profile))
+            print(f"cProfile stats: {args.profile}")
+        METRICS.write(args.metrics_out or CACHE_DIR / "run_metrics.json")
+
+
+def run(args: argparse.Namespace):
+    if args.merge is not None:
+        dirs = args.merge or [CACHE_DIR, *sorted(CACHE_DIR.glob("shard-*-of-*"))]
+        OUT_DIR.mkdir(parents=True, exist_ok=True)
+        BUNDLES.refresh()
+        if PUBDATA is not None:
+            PUBDATA.load()
+        per_author = collect_cached_records(dirs, read_inputs(args.inputs))
+        print(f"Merging {sum(len(r) for _, r in per_author)} cached pubs from {len(dirs)} cache dirs")
+        stages = StageCache(CACHE_DIR / "stage_digests.json")
+        for sid, recs in per_author:
+            stages.add(sid, recs)
+        report_merge(stages.finish())
+        if not DRY_RUN:
+            BUNDLES.save()
+        return
+
+    ids = start_fetching(args)
+    if args.daemon:
+        serve(args)
+        return
+    if refresh_authors(ids, args):
+        sys.exit(2)
+
+
+def roster(args: argparse.Namespace) -> List[str]:
+    """The authors to refresh: inputs / SCHOLAR_URLS, narrowed to this shard with --shard."""
+    ids = read_inputs(args.inputs)
+    if args.shard:
+        i, n = args.shard
+        ids = [sid for sid in ids if shard_of(sid, n) == i]
+    return ids
+
+
+def start_fetching(args: argparse.Namespace) -> List[str]:
+    """One-time set-up before fetching: proxies, cache dir, and the state earlier runs left."""
+    with METRICS.stage("proxy_setup"):
+        setup_scholar()
+    ids = roster(args)
     if not ids:
         print("No Scholar IDs/URLs provided.\n"
               "Set SCHOLAR_URLS env, pass a file path, or pass IDs/URLs as args.")
         print("Example:\n  SCHOLAR_URLS='https://scholar.google.com/citations?user=X3JCGVIAAAAJ' python scripts/import_scholar_multi.py")
         sys.exit(1)
 
+    if args.shard:
+        i, n = args.shard
+        use_cache_dir(shard_cache_dir(i, n))
+        print(f"Shard {i}/{n}: {len(ids)} authors -> {CACHE_DIR}")
+
     OUT_DIR.mkdir(parents=True, exist_ok=True)
+    BUNDLES.refresh()
+    if PUBDATA is not None:
+        PUBDATA.load()
+
+    RATE.load()
+    JOURNAL.load()
+    load_pdf_cache()
+    return ids
+
+
+def refresh_authors(ids: List[str], args: argparse.Namespace, only: Optional[set] = None) -> bool:
+    """
+    Refresh the authors in ids, merge and write. With `only`, just those authors are
+    fetched (even if refreshed recently); everyone else comes from the cache.
+    Returns True when the circuit breaker is open.
+    """
+    global FETCH_DEADLINE
+    FETCH_DEADLINE = None
+    if args.max_runtime > 0:
+        # leave room to merge + write before the cron slot ends
+        write_margin = min(60.0, 0.1 * args.max_runtime)
+        FETCH_DEADLINE = time.monotonic() + args.max_runtime - write_margin
+
+    if RATE.is_open:
+        print(f"Circuit open until {datetime.fromtimestamp(RATE.open_until)}; using cached pubs only.")
+
+    # Bundles are merged and written as each author completes, so a run cut short
+    # still publishes everyone it got to; the stage cache holds that off while every
+    # author so far matches the last run
+    fetch_only = bool(args.shard) or args.fetch_only
+    stages = None if fetch_only else StageCache(CACHE_DIR / "stage_digests.json")
+
+    def feed(sid: str, recs: Optional[List[PubRecord]] = None):
+        if stages is not None:
+            # what an author's collect returns is exactly its cache file, so reload from there
+            reload = lambda: load_author_cache(sid)[0]
+            stages.add(sid, recs if recs is not None else reload(), reload)
 
-    # Collect all records first (no writing)
-    all_records: List[PubRecord] = []
     seen_titles = set()  # kept for your legacy flow; not strictly necessary now
-    for sid in ids:
+    tripped = RATE.is_open
+    stopped = tripped
+    for sid in schedule_authors(ids):
+        recs: Optional[List[PubRecord]] = None
+        if stopped or (only is not None and sid not in only):
+            # breaker open or out of time: no network, but keep what earlier runs already cached
+            feed(sid)
+            continue
+        if only is None and JOURNAL.is_done_fresh(sid):
+            print(f"Skipping {sid}: refreshed within the last {JOURNAL_FRESH_HOURS:g}h")
+            feed(sid)
+            continue
         try:
-            recs = import_author_by_id_collect(sid, seen_titles)
-            all_records.extend(recs)
+            with METRICS.stage("author"):
+                recs = import_author_by_id_collect(sid, seen_titles)
+            METRICS.count("authors_refreshed")
+        except CircuitOpen as e:
+            print(f"Circuit breaker tripped on {sid}: {e}. Keeping what we have and exiting.")
+            tripped = stopped = True
+        except BudgetExhausted:
+            print(f"Runtime budget reached during {sid}; remaining authors wait for the next run.")
+            stopped = True
         except Exception as e:
             print(f"Error with {sid}: {e}")
-        time.sleep(SLEEP_BETWEEN_AUTHORS)
-
-    # Merge duplicates / substrings by information richness  ### NEW
-    merged = merge_pub_lists(all_records)
-
-    # # Finally, write bundles
-    # for rec in merged:
-    #     write_bundle(
-    #         title=rec.title,
-    #         authors=rec.authors,
-    #         year=rec.year,
-    #         pdf_url=rec.pdf_url,
-    #         publication=rec.publication
-    #     )
-    for rec in merged:
-        write_bundle(
-            title=rec.title,
-            authors=rec.authors,
-            y=rec.year,
-            m=rec.month,
-            d=rec.day,
-            pdf_url=rec.pdf_url,
-            publication=rec.publication
-        )
+        feed(sid, recs)
+        pause = SLEEP_BETWEEN_AUTHORS
+        if FETCH_DEADLINE is not None:
+            pause = min(pause, FETCH_DEADLINE - time.monotonic())
+        if not stopped and pause > 0:
+            METRICS.sleep(pause)
+    RATE.save()
+    save_pdf_cache()
+
+    if args.shard:
+        # the merge step (--merge) combines every shard's cache and writes once
+        print(f"Shard {args.shard[0]}/{args.shard[1]} fetched; run with --merge to write bundles.")
+    elif fetch_only:
+        print(f"Fetched into {CACHE_DIR}; run scripts/merge_sources.py to write bundles.")
+    else:
+        report_merge(stages.finish())
+        if not DRY_RUN:
+            BUNDLES.save()
+    return tripped
+
+# ---------- Daemon mode (--daemon) ----------
+
+DAEMON_INTERVAL = float(os.environ.get("DAEMON_INTERVAL", "86400"))  # seconds between scheduled refreshes
+DAEMON_LISTEN = os.environ.get("DAEMON_LISTEN", "127.0.0.1:8765")   # trigger/status endpoint; "" = none
+
+
+class DaemonControl:
+    """
+    What the refresh loop and the HTTP endpoint share: queued triggers and status.
+    A trigger names one author, or "" for everyone.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.pending: set = set()
+        self.stopping = False
+        self.status: Dict[str, Any] = {"state": "starting", "refreshes": 0, "last_started": None,
+                                       "last_finished": None, "next_scheduled": None, "last_counters": {}}
+
+    def trigger(self, sid: str = ""):
+        with self.lock:
+            self.pending.add(sid)
+        self.wake.set()
+
+    def take(self) -> set:
+        with self.lock:
+            pending, self.pending = self.pending, set()
+            self.wake.clear()
+        return pending
+
+    def stop(self):
+        self.stopping = True
+        self.wake.set()
+
+    def update(self, **kw):
+        with self.lock:
+            self.status.update(kw)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self.lock:
+            return dict(self.status, queued=sorted(s or "all" for s in self.pending))
+
+
+class DaemonHandler(BaseHTTPRequestHandler):
+    """
+    GET  /status                  what the daemon is doing, and the last refresh's counters
+    POST /refresh                 refresh every author now
+    POST /refresh?author=<id>     refresh one author now (others come from the cache)
+    """
+    control: DaemonControl
+    args: argparse.Namespace
+
+    def log_message(self, fmt, *a):
+        pass
+
+    def _reply(self, code: int, obj: Dict[str, Any]):
+        body = json.dumps(obj, default=str).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if urlparse(self.path).path == "/status":
+            self._reply(200, self.control.snapshot())
+        else:
+            self._reply(404, {"error": "not found"})
+
+    def do_POST(self):
+        u = urlparse(self.path)
+        if u.path != "/refresh":
+            self._reply(404, {"error": "not found"})
+            return
+        sid = extract_scholar_id(parse_qs(u.query).get("author", [""])[0])
+        if sid and sid not in roster(self.args):
+            self._reply(404, {"error": f"{sid} is not on the roster"})
+            return
+        self.control.trigger(sid)
+        self._reply(202, {"queued": sid or "all"})
+
+
+def daemon_refresh(args: argparse.Namespace, only: Optional[set]) -> bool:
+    """One refresh on warm state: proxies, parsed caches, bundle index and PDF verdicts stay loaded."""
+    METRICS.reset()
+    ids = roster(args)  # the roster file / SCHOLAR_URLS may have changed since the last one
+    BUNDLES.refresh()   # re-reads only bundles edited since
+    if PUBDATA is not None:
+        PUBDATA.load()
+    pdf_mirror.reset_default()
+    expire_pdf_cache()
+    try:
+        with METRICS.stage("refresh"):
+            return refresh_authors(ids, args, only)
+    finally:
+        METRICS.write(args.metrics_out or CACHE_DIR / "run_metrics.json")
+
+
+def serve(args: argparse.Namespace, control: Optional[DaemonControl] = None):
+    """
+    Refresh every --interval seconds and whenever triggered, until SIGTERM/SIGINT or
+    control.stop() (the refresh in progress is finished first). Replaces the cron entry
+    for run.sh.
+    """
+    control = control or DaemonControl()
+    server = None
+    if args.listen:
+        host, _, port = args.listen.rpartition(":")
+        handler = type("Handler", (DaemonHandler,), {"control": control, "args": args})
+        server = ThreadingHTTPServer((host or "127.0.0.1", int(port)), handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://{host or '127.0.0.1'}:{server.server_address[1]}/"
+        control.update(listen=url)  # the real port when --listen asked for port 0
+        print(f"Daemon: status and triggers on {url}")
+    signal.signal(signal.SIGTERM, lambda *_: control.stop())
+
+    next_at = time.time()  # refresh once on start-up
+    try:
+        while not control.stopping:
+            control.update(state="idle", next_scheduled=datetime.fromtimestamp(next_at).isoformat())
+            control.wake.wait(max(0.0, next_at - time.time()))
+            if control.stopping:
+                break
+            pending = control.take()
+            scheduled = time.time() >= next_at
+            if not pending and not scheduled:
+                continue
+            if "" in pending:
+                only = set(roster(args))  # an explicit "everyone" ignores JOURNAL_FRESH_HOURS
+            elif scheduled:
+                only = None
+                for sid in pending:
+                    control.trigger(sid)  # after the scheduled refresh
+            else:
+                only = pending
+            what = "scheduled" if only is None else f"{len(only)} author(s) on demand"
+            print(f"Daemon: refresh ({what}) at {datetime.now().isoformat(timespec='seconds')}")
+            control.update(state="refreshing", last_started=datetime.now().isoformat())
+            try:
+                daemon_refresh(args, only)
+            except Exception as e:
+                print(f"Daemon: refresh failed: {e!r}; next one as scheduled")
+            if only is None or "" in pending:
+                next_at = time.time() + args.interval
+            control.update(refreshes=control.status["refreshes"] + 1, last_finished=datetime.now().isoformat(),
+                           last_counters=dict(METRICS.counters))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if server is not None:
+            server.shutdown()
+        print("Daemon: stopped")
+
 
 if __name__ == "__main__":
+    scholar_cassette.install_from_env(sys.modules[__name__])
     main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Record/replay of Scholar + PDF-check traffic for the Scholar importers.
+
+  SCHOLAR_CASSETTE=runs/nightly.jsonl SCHOLAR_CASSETTE_MODE=record python scripts/scholar_IPs.py
+  SCHOLAR_CASSETTE=runs/nightly.jsonl SCHOLAR_CASSETTE_MODE=replay python scripts/scholar_IPs.py
+
+Record mode passes every scholarly.search_author_id / fill / bibtex call and every
+serves_pdf check through to the network and appends the response (or the error it
+raised) to a JSONL cassette. Replay mode serves those responses back in the order they
+were recorded, without touching the network, so a whole run can be repeated offline.
+
+SCHOLAR_CASSETTE_LATENCY scales the recorded latency during replay
+(0 = instant, the default; 1 = as recorded). Set SCHOLAR_MIN_DELAY=0 as well when
+timing replays, otherwise the importer's own pacing dominates.
+"""
+
+from __future__ import annotations
+import os
+import json
+import time
+import pathlib
+import functools
+from collections import defaultdict, deque
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+SCHOLARLY_CALLS = ("search_author_id", "fill", "bibtex")
+
+
+class CassetteMiss(LookupError):
+    """Replay asked for a call that was never recorded."""
+
+
+class ReplayedError(Exception):
+    """An exception recorded in the cassette, raised again on replay."""
+
+
+def call_key(name: str, args: tuple, kwargs: dict) -> str:
+    """Stable identity of a call: what was asked for, not the Python objects involved."""
+    if name == "serves_pdf":
+        return args[0]
+    if name == "search_author_id":
+        return args[0]
+    obj = args[0] if args else {}
+    if obj.get("container_type") == "Author":
+        ident = f"author:{obj.get('scholar_id', '')}"
+    else:
+        ident = obj.get("author_pub_id") or "title:" + ((obj.get("bib") or {}).get("title") or "")
+    return ident + json.dumps(kwargs, sort_keys=True, default=str) if kwargs else ident
+
+
+class Cassette:
+    def __init__(self, path: pathlib.Path, mode: str, latency_scale: float = 0.0):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"cassette mode must be 'record' or 'replay', got {mode!r}")
+        self.path = path
+        self.mode = mode
+        self.latency_scale = latency_scale
+        self.hits = 0
+        self.misses = 0
+        self._tapes: Dict[Tuple[str, str], Deque[dict]] = defaultdict(deque)
+        self._last: Dict[Tuple[str, str], dict] = {}
+        if mode == "replay":
+            self._load()
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+
+    def _load(self):
+        if not self.path.exists():
+            raise FileNotFoundError(f"cassette not found: {self.path}")
+        for line in self.path.read_text(encoding="utf-8").splitlines():
+            try:
+                ev = json.loads(line)
+            except ValueError:
+                continue
+            self._tapes[(ev["call"], ev["key"])].append(ev)
+
+    def _append(self, ev: dict):
+        with self.path.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(ev, ensure_ascii=False, default=str) + "\n")
+
+    def _record(self, name: str, fn: Callable, args: tuple, kwargs: dict):
+        ev = {"call": name, "key": call_key(name, args, kwargs)}
+        t0 = time.perf_counter()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            ev.update(elapsed=time.perf_counter() - t0, error=f"{type(e).__name__}: {e}")
+            self._append(ev)
+            raise
+        ev.update(elapsed=time.perf_counter() - t0, result=result)
+        self._append(ev)
+        return result
+
+    def _replay(self, name: str, args: tuple, kwargs: dict):
+        k = (name, call_key(name, args, kwargs))
+        tape = self._tapes.get(k)
+        if tape:
+            ev = self._last[k] = tape.popleft()
+        elif k in self._last:
+            ev = self._last[k]  # asked more often than recorded: repeat the last answer
+        else:
+            self.misses += 1
+            raise CassetteMiss(f"no recorded {name} for {k[1]!r}")
+        self.hits += 1
+        if self.latency_scale > 0:
+            time.sleep(ev.get("elapsed", 0.0) * self.latency_scale)
+        if "error" in ev:
+            raise ReplayedError(ev["error"])
+        return ev.get("result")
+
+    def wrap(self, name: str, fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if self.mode == "record":
+                return self._record(name, fn, args, kwargs)
+            return self._replay(name, args, kwargs)
+        return wrapper
+
+
+class _ScholarlyProxy:
+    """Stands in for the `scholarly` singleton; unrecorded attributes pass through."""
+
+    def __init__(self, real: Any, cassette: Cassette):
+        self._real = real
+        for name in SCHOLARLY_CALLS:
+            setattr(self, name, cassette.wrap(name, getattr(real, name)))
+
+    def __getattr__(self, name: str):
+        return getattr(self._real, name)
+
+
+def install(module: Any, cassette: Cassette):
+    """
+    Patch an importer module in place: its `scholarly` global, `serves_pdf`, and (on
+    replay) `setup_scholar`, so no proxy discovery hits the network.
+    """
+    module.scholarly = _ScholarlyProxy(module.scholarly, cassette)
+    if hasattr(module, "serves_pdf"):
+        serves_pdf = cassette.wrap("serves_pdf", module.serves_pdf)
+        if cassette.mode == "replay":
+            real_replay = serves_pdf
+
+            def serves_pdf(url: str) -> bool:
+                try:
+                    return real_replay(url)
+                except CassetteMiss:
+                    return False
+        module.serves_pdf = serves_pdf
+    if cassette.mode == "replay" and hasattr(module, "setup_scholar"):
+        module.setup_scholar = lambda: print("Replay mode: proxy setup skipped.")
+    print(f"Cassette {cassette.mode}: {cassette.path}")
+
+
+def install_from_env(module: Any) -> Optional[Cassette]:
+    path = os.environ.get("SCHOLAR_CASSETTE", "")
+    if not path:
+        return None
+    cassette = Cassette(
+        pathlib.Path(path),
+        os.environ.get("SCHOLAR_CASSETTE_MODE", "replay"),
+        float(os.environ.get("SCHOLAR_CASSETTE_LATENCY", "0")),
+    )
+    install(module, cassette)
+    return cassette
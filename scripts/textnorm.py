@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Title / author / slug normalization shared by the importers (extract.py, scholar_IPs.py,
+import_scholar_multi.py).
+
+Every function returns exactly what the per-script version it replaced returned; the
+old implementations are kept in scripts/bench/bench_textnorm.py, which checks that and
+times both. The speed comes from:
+  - str.translate tables instead of chains of re.sub / per-character loops,
+  - fast paths for plain-ASCII input (most DBLP and Scholar titles),
+  - lru_cache on each normalizer: the same title is keyed, compared and slugged many
+    times per run (dedup stages, titles_overlap, fingerprints, cache lookups).
+"""
+
+from __future__ import annotations
+import re
+import html
+import unicodedata
+from functools import lru_cache
+from typing import List, Tuple
+
+MEMO_SIZE = 1 << 16  # per function; a full roster has a few thousand distinct titles
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_AUTHOR_SPLIT_RE = re.compile(r"\s+and\s+")
+_INITIAL_RE = re.compile(r"\s*\.\s*")
+
+_ALNUM = "abcdefghijklmnopqrstuvwxyz0123456789"
+
+
+class _Table(dict):
+    """
+    Translate table for the whole code space, filled in lazily: codepoints not set up
+    front are resolved by `_resolve` on first sight and cached.
+    """
+
+    def __init__(self, resolve, **fixed):
+        super().__init__({ord(k): v for k, v in fixed.items()})
+        self._resolve = resolve
+
+    def __missing__(self, cp: int):
+        v = self[cp] = self._resolve(cp)
+        return v
+
+
+def _keep_alnum(cp: int):
+    return cp if chr(cp) in _ALNUM else " "
+
+
+def _drop_marks(cp: int):
+    return None if unicodedata.category(chr(cp)) == "Mn" else cp
+
+
+# [^a-z0-9] -> separator (the caller splits on whitespace afterwards)
+_KEY_TABLE = _Table(_keep_alnum)
+# same, but braces vanish first: "{BERT}ology" -> "bertology", not "bert ology"
+_BRACELESS_TABLE = _Table(_keep_alnum, **{"{": None, "}": None})
+# extract.py slugs additionally spell out "&"
+_SLUG_TABLE = _Table(_keep_alnum, **{"{": None, "}": None, "&": "and"})
+# zero-width characters and combining marks (category Mn) are dropped
+_DROP_TABLE = _Table(_drop_marks, **{"\u200b": None, "\ufeff": None, "\u200c": None, "\u200d": None})
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def sanitize_text(s: str) -> str:
+    """
+    Clean a Scholar title/venue: strip HTML tags and entities, fold compatibility
+    characters (NFKC), drop zero-width chars and combining marks, collapse whitespace.
+    """
+    if not s:
+        return s
+    if s.isascii() and "<" not in s and "&" not in s:
+        # NFKC, zero-width and Mn removal are all no-ops on such strings
+        return " ".join(s.split())
+    s = html.unescape(_TAG_RE.sub("", s))
+    s = unicodedata.normalize("NFKC", s).translate(_DROP_TABLE)
+    return " ".join(s.split())
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def title_key(title: str) -> str:
+    """
+    Lowercase, remove non-alnum, compress spaces — good for equality/substring tests.
+    """
+    return " ".join(title.lower().translate(_KEY_TABLE).split())
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def norm_title(t: str) -> str:
+    """Like title_key, but BibTeX braces are removed rather than treated as separators."""
+    return " ".join(t.lower().translate(_BRACELESS_TABLE).split())
+
+
+def title_first_n_words(title: str, n: int = 4) -> str:
+    return " ".join(norm_title(title).split()[:n])
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def _slug_stem(title: str, max_len: int) -> str:
+    s = "-".join(title.lower().translate(_SLUG_TABLE).split())
+    if len(s) > max_len:
+        out = []
+        total = 0
+        for p in s.split("-"):
+            add = len(p) + (1 if out else 0)
+            if total + add > max_len:
+                break
+            out.append(p)
+            total += add
+        s = "-".join(out) if out else s[:max_len].rstrip("-")
+    return s
+
+
+def slugify(title: str, year: str, max_len: int = 80) -> str:
+    """extract.py bundle slug: "<title words joined by ->-<year>", cut at a word boundary."""
+    return f"{_slug_stem(title, max_len)}-{year}"
+
+
+_python_slugify = None
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def scholar_slug(text: str) -> str:
+    """python-slugify, as the Scholar importers call it (imported on first use)."""
+    global _python_slugify
+    if _python_slugify is None:
+        from slugify import slugify as _python_slugify
+    return _python_slugify(text)
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def _author_tuple(bib_authors: str) -> Tuple[str, ...]:
+    parts = [p.strip() for p in _AUTHOR_SPLIT_RE.split(bib_authors)]
+    return tuple(_INITIAL_RE.sub(". ", p).strip() for p in parts if p)
+
+
+def normalize_authors(bib_authors: str) -> List[str]:
+    """
+    Convert 'A. Author and B. Author' -> ['A. Author', 'B. Author']
+    """
+    if not bib_authors:
+        return []
+    return list(_author_tuple(bib_authors))
@@ -0,0 +1,110 @@
+import os
+import sys
+import tempfile
+import importlib
+from pathlib import Path
+
+import pytest
+
+SCRIPTS = Path(__file__).resolve().parents[1] / "scripts"
+sys.path.insert(0, str(SCRIPTS))
+# modules that import scholar_IPs at collection time must not create the real cache dir
+_SCRATCH = tempfile.mkdtemp(prefix="sbu-nlp-tests-")
+os.environ["CACHE_DIR"] = os.path.join(_SCRATCH, "cache")
+os.environ["OUT_DIR"] = os.path.join(_SCRATCH, "out")
+
+
+@pytest.fixture
+def load_scholar(tmp_path, monkeypatch):
+    """
+    Import scholar_IPs fresh (its config and state are read at import) against
+    tmp_path/<name>/cache and tmp_path/<name>/out.
+    """
+    def load(name: str = "run", **env):
+        monkeypatch.setenv("CACHE_DIR", str(tmp_path / name / "cache"))
+        monkeypatch.setenv("OUT_DIR", str(tmp_path / name / "out"))
+        monkeypatch.setenv("SCHOLAR_MIN_DELAY", "0")
+        monkeypatch.setenv("SLEEP_BETWEEN_AUTHORS", "0")
+        monkeypatch.setenv("DRY_RUN", "0")
+        monkeypatch.delenv("SCHOLAR_URLS", raising=False)
+        for k, v in env.items():
+            monkeypatch.setenv(k, v)
+        sys.modules.pop("scholar_IPs", None)
+        return importlib.import_module("scholar_IPs")
+
+    yield load
+    sys.modules.pop("scholar_IPs", None)
+
+
+@pytest.fixture
+def scholar(load_scholar):
+    return load_scholar()
+
+
+class Crash(BaseException):
+    """Stands in for the process dying mid-run: nothing in scholar_IPs catches it."""
+
+
+class FakeScholarly:
+    """
+    Offline stand-in for the scholarly singleton. profiles maps an author id to its pub
+    titles, newest first (all from 2024); a title on two profiles is one paper.
+    calls records (kind, what) in order. on_fill(title) runs before each pub fill and
+    may raise, e.g. Crash.
+    """
+
+    def __init__(self, profiles, on_fill=None):
+        self.profiles = profiles
+        self.on_fill = on_fill
+        self.calls = []
+
+    def stub(self, sid, title):
+        return {"container_type": "Publication", "author_pub_id": f"{sid}:{title}", "filled": False,
+                "bib": {"title": title, "pub_year": "2024"}}
+
+    def search_author_id(self, sid):
+        self.calls.append(("search", sid))
+        return {"container_type": "Author", "scholar_id": sid, "filled": []}
+
+    def fill(self, obj, sections=None, sortby="citedby", publication_limit=0):
+        obj = dict(obj)
+        if obj["container_type"] == "Author":
+            sid = obj["scholar_id"]
+            self.calls.append(("list", sid))
+            titles = self.profiles[sid][:publication_limit or None]
+            obj.update(publications=[self.stub(sid, t) for t in titles], citedby=len(self.profiles[sid]),
+                       name=sid, filled=list(sections or []))
+            return obj
+        title = obj["bib"]["title"]
+        self.calls.append(("fill", title))
+        if self.on_fill:
+            self.on_fill(title)
+        obj.update(bib=dict(obj["bib"], author="Ada Lovelace and Alan Turing", venue="ACL"), filled=True)
+        return obj
+
+    def bibtex(self, obj):
+        self.calls.append(("bibtex", obj["bib"]["title"]))
+        return "@inproceedings{x,\n title={%s},\n month=mar\n}" % obj["bib"]["title"]
+
+    def filled(self):
+        return [what for kind, what in self.calls if kind == "fill"]
+
+    def count(self, kind):
+        return sum(1 for k, _ in self.calls if k == kind)
+
+
+@pytest.fixture
+def fake_scholar(load_scholar):
+    """load_scholar() with `fake` (a FakeScholarly) in place of scholarly and no proxy set-up."""
+    def load(fake, name: str = "run", **env):
+        S = load_scholar(name, **env)
+        S.scholarly = fake
+        S.setup_scholar = lambda: None
+        return S
+
+    return load
+
+
+def bundles_of(out_dir: Path):
+    """index.md text by bundle folder name."""
+    return {p.parent.name: p.read_text(encoding="utf-8") for p in sorted(out_dir.glob("*/index.md"))}
@@ -0,0 +1,46 @@
+import json
+
+import pytest
+
+import arxiv_index
+
+
+def snapshot_line(aid, title, created="Mon, 2 Apr 2007 19:18:42 GMT"):
+    return json.dumps({"id": aid, "title": title, "authors": "A. Author and B. Author",
+                       "versions": [{"version": "v1", "created": created}]}) + "\n"
+
+
+@pytest.mark.parametrize("raw, want", [
+    ("arXiv:2306.01234v2", "2306.01234"),
+    ("2306.0123", "2306.0123"),
+    ("hep-th/9901001v3", "hep-th/9901001"),
+    ("HEP-TH/9901001", "hep-th/9901001"),
+    ("arxiv: math.AG/0309136", "math.ag/0309136"),
+    ("not an id", ""),
+])
+def test_normalize_id(raw, want):
+    assert arxiv_index.normalize_id(raw) == want
+
+
+def test_build_and_get_round_trip(tmp_path):
+    snap = tmp_path / "snapshot.json"
+    snap.write_text(
+        snapshot_line("hep-th/9901001", "Old style")
+        + snapshot_line("2306.01234", "First spelling")
+        + "{truncated\n"
+        + snapshot_line("2306.01234", "Second spelling", "Tue, 6 Jun 2023 10:00:00 GMT")
+        + snapshot_line("1501.00001", "Five digit era"),
+        encoding="utf-8")
+    out = tmp_path / "arxiv.idx"
+
+    assert arxiv_index.build_index(arxiv_index.iter_snapshot(snap), out) == 3
+    with arxiv_index.ArxivIndex(out) as idx:
+        assert len(idx) == 3
+        rec = idx.get("arXiv:2306.01234v3")
+        assert rec["title"] == "Second spelling" and rec["date"] == "2023-06-06"  # later duplicate wins
+        assert idx.get("HEP-TH/9901001v2")["title"] == "Old style"
+        assert idx.get("hep-th/9901001")["authors"] == ["A. Author", "B. Author"]
+        assert idx.get("1501.00001")["date"] == "2007-04-02"
+        assert "Hep-Th/9901001" in idx
+        assert idx.get("2306.99999") is None and idx.get("hep-th/9901002") is None
+        assert idx.get("garbage") is None
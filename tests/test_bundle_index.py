@@ -0,0 +1,68 @@
+from bundle_index import BundleIndex
+
+from conftest import FakeScholarly
+
+
+def bundle(root, name, title, url_pdf="", publication="", doi=""):
+    (root / name).mkdir(parents=True)
+    extra = f"doi: '{doi}'\n" if doi else ""
+    (root / name / "index.md").write_text(
+        f"---\ntitle: '{title}'\npublication: '{publication}'\nurl_pdf: '{url_pdf}'\n{extra}---\n", encoding="utf-8")
+    return root / name
+
+
+def test_place_matches_by_doi_then_arxiv_then_title(tmp_path):
+    root = tmp_path / "publication"
+    by_doi = bundle(root, "by-doi", "Neural Parsing Revisited", doi="10.18653/v1/2024.acl-long.1")
+    by_arxiv = bundle(root, "by-arxiv", "Sparse Attention", url_pdf="https://arxiv.org/pdf/2403.01234v2")
+    by_title = bundle(root, "by-title", "Streaming Merge of Records")
+    idx = BundleIndex(root, tmp_path / "idx.json").refresh()
+    fresh = root / "fresh-slug"
+
+    # a different slug, and title case / punctuation, do not matter
+    assert idx.place(fresh, title="streaming merge of records!") == by_title
+    assert idx.place(fresh, title="Sparse Attention: Extended", url_pdf="https://arxiv.org/abs/2403.01234") == by_arxiv
+    assert idx.place(fresh, title="Something Else", publication="arXiv:2403.01234") == by_arxiv
+    assert idx.place(fresh, title="Other", url_pdf="https://doi.org/10.18653/V1/2024.acl-long.1.pdf") == by_doi
+    # the DOI wins over a colliding title, the arXiv id over a colliding title
+    assert idx.place(fresh, title="Streaming Merge of Records", doi="10.18653/v1/2024.acl-long.1") == by_doi
+    assert idx.place(fresh, title="Streaming Merge of Records", url_pdf="https://arxiv.org/pdf/2403.01234") == by_arxiv
+    assert idx.place(fresh, title="Unrelated Paper", url_pdf="https://arxiv.org/pdf/2501.00001") == fresh
+
+
+def test_title_collision_keeps_the_first_folder_by_name(tmp_path):
+    root = tmp_path / "publication"
+    bundle(root, "b-copy", "Streaming Merge of Records")
+    bundle(root, "a-original", "Streaming Merge of Records")
+    idx = BundleIndex(root, tmp_path / "idx.json").refresh()
+    assert idx.find(title="Streaming Merge of Records") == root / "a-original"
+
+
+def test_refresh_sees_folders_added_and_removed_on_disk(tmp_path):
+    root = tmp_path / "publication"
+    bundle(root, "kept", "A Paper That Stays")
+    gone = bundle(root, "gone", "A Paper That Goes")
+    idx = BundleIndex(root, tmp_path / "idx.json").refresh()
+    idx.save()
+
+    (gone / "index.md").unlink()
+    gone.rmdir()
+    bundle(root, "added", "A Paper That Arrives", url_pdf="https://arxiv.org/pdf/2403.05555")
+    idx = BundleIndex(root, tmp_path / "idx.json").refresh()  # from the saved index
+    assert sorted(idx.entries) == ["added", "kept"]
+    assert idx.find(title="A Paper That Goes") is None
+    assert idx.find(url_pdf="https://arxiv.org/abs/2403.05555") == root / "added"
+
+    # an edited bundle is re-read: its old title no longer finds it
+    (root / "kept" / "index.md").write_text("---\ntitle: 'A Renamed Paper'\n---\n", encoding="utf-8")
+    idx = BundleIndex(root, tmp_path / "idx.json").refresh()
+    assert idx.find(title="A Paper That Stays") is None
+    assert idx.find(title="A Renamed Paper") == root / "kept"
+
+
+def test_dry_run_writes_neither_bundles_nor_the_index(fake_scholar):
+    S = fake_scholar(FakeScholarly({"adaLovelace01": ["Paper by Ada on Parsing"]}), DRY_RUN="1")
+    existing = bundle(S.OUT_DIR, "existing", "A Paper Already There")  # makes the refreshed index dirty
+    S.main(["adaLovelace01"])
+    assert [p.parent for p in S.OUT_DIR.glob("*/index.md")] == [existing]
+    assert not S.BUNDLES.path.exists()
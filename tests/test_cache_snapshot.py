@@ -0,0 +1,52 @@
+import io
+import subprocess
+import sys
+import tarfile
+
+import pytest
+
+import cache_snapshot
+
+
+def make_cache(path):
+    path.mkdir()
+    (path / "scholar_abc.jsonl").write_text('{"title": "A paper"}\n', encoding="utf-8")
+    (path / "pdf_ok.json").write_text("{}", encoding="utf-8")
+    return path
+
+
+def test_round_trip(tmp_path):
+    snap = tmp_path / "snap.tar.gz"
+    cache_snapshot.export_snapshot(make_cache(tmp_path / "cache"), snap)
+    restored, kept = cache_snapshot.import_snapshot(snap, tmp_path / "fresh")
+    assert restored == ["pdf_ok.json", "scholar_abc.jsonl"] and kept == []
+    assert (tmp_path / "fresh" / "scholar_abc.jsonl").read_text(encoding="utf-8") == '{"title": "A paper"}\n'
+
+
+def test_truncated_snapshot(tmp_path):
+    snap = tmp_path / "snap.tar.gz"
+    cache_snapshot.export_snapshot(make_cache(tmp_path / "cache"), snap)
+    data = snap.read_bytes()
+    snap.write_bytes(data[:len(data) // 2])
+    with pytest.raises(cache_snapshot.SnapshotError):
+        cache_snapshot.import_snapshot(snap, tmp_path / "fresh")
+    assert not (tmp_path / "fresh").exists()
+
+
+def test_corrupt_manifest(tmp_path):
+    snap = tmp_path / "snap.tar.gz"
+    with tarfile.open(snap, "w:gz") as tar:
+        body = b'{"format": 1, "files": {'  # cut off mid-object
+        info = tarfile.TarInfo(cache_snapshot.MANIFEST)
+        info.size = len(body)
+        tar.addfile(info, io.BytesIO(body))
+    with pytest.raises(cache_snapshot.SnapshotError, match="MANIFEST"):
+        cache_snapshot.read_snapshot(snap)
+
+
+def test_import_does_not_pull_in_scholar_IPs():
+    # CI restores the cache before installing scholarly, so this import has to stay light
+    code = "import sys, cache_snapshot; print(sorted({'scholar_IPs', 'scholarly'} & set(sys.modules)))"
+    out = subprocess.run([sys.executable, "-c", code], cwd=cache_snapshot.__file__.rpartition("/")[0],
+                         capture_output=True, text=True, check=True).stdout
+    assert out.strip() == "[]"
@@ -0,0 +1,77 @@
+import json
+import time
+import signal
+import threading
+import urllib.error
+import urllib.request
+
+from conftest import FakeScholarly
+
+ADA, ALAN = "adaLovelace01", "alanTuring002"
+
+
+def request(url, method="GET"):
+    req = urllib.request.Request(url, method=method, data=b"" if method == "POST" else None)
+    try:
+        with urllib.request.urlopen(req, timeout=5) as r:
+            return r.status, json.loads(r.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def test_status_and_triggers(fake_scholar, monkeypatch):
+    fake = FakeScholarly({ADA: ["Paper by Ada on Parsing"], ALAN: ["Paper by Alan on Parsing"]})
+    S = fake_scholar(fake)
+    args = S.parse_args([ADA, ALAN, "--daemon", "--listen", "127.0.0.1:0", "--interval", "3600"])
+    S.start_fetching(args)
+    control = S.DaemonControl()
+
+    first_started, release = threading.Event(), threading.Event()
+    runs = []
+    real_refresh = S.daemon_refresh
+
+    def refresh(args, only):
+        runs.append(only)
+        if len(runs) == 1:
+            first_started.set()
+            release.wait(10)  # hold the start-up refresh while the test sends triggers
+        return real_refresh(args, only)
+
+    monkeypatch.setattr(S, "daemon_refresh", refresh)
+    seen = {}
+
+    def drive():
+        try:
+            assert first_started.wait(10)
+            base = control.snapshot()["listen"]
+            seen["status"] = request(base + "status")
+            seen["first"] = request(base + f"refresh?author={ADA}", "POST")
+            seen["again"] = request(base + f"refresh?author={ADA}", "POST")
+            seen["unknown"] = request(base + "refresh?author=notOnRoster99", "POST")
+            seen["queued"] = request(base + "status")[1]["queued"]
+            release.set()
+            deadline = time.time() + 10
+            while control.snapshot()["refreshes"] < 2 and time.time() < deadline:
+                time.sleep(0.01)
+            seen["after"] = request(base + "status")[1]
+        finally:
+            release.set()
+            control.stop()
+
+    driver = threading.Thread(target=drive)
+    driver.start()
+    old_handler = signal.getsignal(signal.SIGTERM)
+    try:
+        S.serve(args, control)
+    finally:
+        signal.signal(signal.SIGTERM, old_handler)
+    driver.join()
+
+    code, status = seen["status"]
+    assert code == 200 and status["state"] == "refreshing" and status["refreshes"] == 0
+    assert seen["first"] == (202, {"queued": ADA}) and seen["again"] == (202, {"queued": ADA})
+    assert seen["unknown"][0] == 404
+    assert seen["queued"] == [ADA]       # two triggers for one author queue one refresh
+    assert runs == [None, {ADA}]         # start-up refresh, then ADA alone, once
+    assert [sid for kind, sid in fake.calls if kind == "search"] == [ADA, ALAN, ADA]
+    assert seen["after"]["refreshes"] == 2 and seen["after"]["queued"] == []
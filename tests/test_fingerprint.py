@@ -0,0 +1,56 @@
+from conftest import FakeScholarly
+
+SID = "adaLovelace01"
+TITLES = [f"Paper Number {k} on Parsing" for k in range(5)]
+ENV = {"FINGERPRINT_HEAD": "2", "JOURNAL_FRESH_HOURS": "0"}  # a probe page of 2; never skip as fresh
+
+
+def first_run(fake_scholar):
+    fake = FakeScholarly({SID: TITLES})
+    S = fake_scholar(fake, **ENV)
+    S.main([SID])
+    assert fake.count("list") == 2  # probe, then the full listing
+    assert fake.filled() == TITLES
+    return S.load_fingerprint(SID)
+
+
+def test_unchanged_fingerprint_skips_the_walk(fake_scholar):
+    fp = first_run(fake_scholar)
+    fake = FakeScholarly({SID: TITLES})
+    S = fake_scholar(fake, **ENV)
+    S.main([SID])
+    assert fake.count("list") == 1 and fake.filled() == []
+    assert S.METRICS.counters["fingerprint_unchanged"] == 1
+    assert S.load_fingerprint(SID)["full_walk_at"] == fp["full_walk_at"]
+
+
+def test_expired_fingerprint_forces_a_full_walk(fake_scholar):
+    fp = first_run(fake_scholar)
+    fake = FakeScholarly({SID: TITLES})
+    S = fake_scholar(fake, FINGERPRINT_TTL_DAYS="0", **ENV)
+    S.main([SID])
+    assert fake.count("list") == 2
+    assert fake.filled() == []  # every pub is still cached
+    assert "fingerprint_unchanged" not in S.METRICS.counters
+    assert S.load_fingerprint(SID)["full_walk_at"] > fp["full_walk_at"]
+
+
+def test_grown_listing_walks_only_the_new_head(fake_scholar):
+    first_run(fake_scholar)
+    fake = FakeScholarly({SID: ["A Brand New Paper on Parsing"] + TITLES})
+    S = fake_scholar(fake, **ENV)
+    S.main([SID])
+    assert fake.count("list") == 1  # the probe page was enough
+    assert fake.filled() == ["A Brand New Paper on Parsing"]
+    assert S.load_fingerprint(SID)["newest_title"] == "A Brand New Paper on Parsing"
+    assert len(list(S.OUT_DIR.glob("*/index.md"))) == 6
+
+
+def test_more_new_pubs_than_the_probe_page_walks_everything(fake_scholar):
+    first_run(fake_scholar)
+    new = [f"Newer Paper {k} on Parsing" for k in range(3)]
+    fake = FakeScholarly({SID: new + TITLES})
+    S = fake_scholar(fake, **ENV)
+    S.main([SID])
+    assert fake.count("list") == 2
+    assert fake.filled() == new
@@ -0,0 +1,74 @@
+from front_matter import FrontMatter, write_atomic, yaml_get_field, yaml_set_field
+
+TEXT = ('---\r\n'
+        'title:   "Some {LLM} Paper"  \r\n'
+        '# a comment: with a colon\n'
+        'authors:\n'
+        '  - "Ada Lovelace"\n'
+        'image:\n'
+        '  caption: \'nested\'\n'
+        '  preview_only: true\n'
+        'url_pdf: https://arxiv.org/pdf/2306.01234.pdf\n'
+        "date: '2023-01-01T00:00:00Z'\n"
+        '---\n'
+        'Body text.\n'
+        '---\n'
+        'date: not front matter\n')
+
+
+def lines():
+    return TEXT.splitlines(keepends=True)
+
+
+def test_untouched_document_round_trips_byte_for_byte():
+    fm = FrontMatter(lines())
+    assert fm.text() == TEXT
+    fm.set("title", "Some {LLM} Paper")  # the same value, but not in the site's quoting: a real change
+    assert fm.changed
+    fm = FrontMatter(lines())
+    fm.set("date", "2023-01-01T00:00:00Z")  # the line already reads exactly this
+    assert not fm.changed and fm.text() == TEXT
+    assert FrontMatter(["no front matter\n"]).text() == "no front matter\n"
+
+
+def test_set_keeps_every_other_line():
+    fm = FrontMatter(lines())
+    fm.set("url_pdf", "https://arxiv.org/pdf/2306.01234v2.pdf")
+    fm.set("doi", "10.1/x")
+    out = fm.text().splitlines(keepends=True)
+    want = lines()
+    want[8] = "url_pdf: 'https://arxiv.org/pdf/2306.01234v2.pdf'\n"
+    want.insert(10, "doi: '10.1/x'\n")  # new keys go before the closing '---'
+    assert out == want
+    assert fm.body() == "Body text.\n---\ndate: not front matter\n"
+
+
+def test_get_reads_top_level_keys_set_matches_any_indent():
+    fm = FrontMatter(lines())
+    assert fm.get("title") == "Some {LLM} Paper"
+    assert fm.get("caption") is None          # nested under image:
+    assert fm.get("date") == "2023-01-01T00:00:00Z"  # not the 'date:' after the closing '---'
+    assert fm.get("# a comment") is None
+    assert fm.keys() == ["title", "authors", "image", "url_pdf", "date"]
+    assert fm.raw_items("authors") == ['"Ada Lovelace"']
+    fm.set("caption", "replaced")  # like the old yaml_set_field: the first line with the key, any indent
+    assert fm.get("caption") == "replaced"
+    assert "  caption: 'nested'\n" not in fm.text()
+
+
+def test_single_field_helpers_agree_with_front_matter():
+    for key in ("title", "caption", "date", "url_pdf", "missing"):
+        assert yaml_get_field(lines(), key) == FrontMatter(lines()).get(key)
+        fm = FrontMatter(lines())
+        fm.set(key, "v")
+        assert yaml_set_field(lines(), key, "v") == fm.lines()
+
+
+def test_write_atomic_replaces_a_hardlink_instead_of_writing_through(tmp_path):
+    src = tmp_path / "src.md"
+    src.write_text(TEXT, encoding="utf-8")
+    dst = tmp_path / "dst.md"
+    dst.hardlink_to(src)
+    write_atomic(dst, "new\n", src)
+    assert src.read_bytes() == TEXT.encode("utf-8")
+    assert dst.read_text(encoding="utf-8") == "new\n"
@@ -0,0 +1,51 @@
+import sys
+
+import pytest
+
+Image = pytest.importorskip("PIL.Image")
+
+import image_derivatives
+
+
+def picture(path, size, color):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    Image.new("RGB", size, color).save(path)
+
+
+def run(monkeypatch, capsys, site):
+    monkeypatch.setattr(sys, "argv", ["image_derivatives.py", "--content", str(site / "content"),
+                                      "--static", str(site / "static"), "--data", str(site / "data.json"), "--jobs", "1"])
+    image_derivatives.main()
+    return capsys.readouterr().out
+
+
+def outputs(site):
+    return {p.relative_to(site).as_posix(): p.stat().st_mtime_ns for p in (site / "static").rglob("*.*")}
+
+
+def test_sha1_cache_hits_and_misses(tmp_path, monkeypatch, capsys):
+    site = tmp_path
+    picture(site / "content/authors/ada/avatar.jpg", (400, 300), "red")
+    picture(site / "content/event/talk/featured.png", (1000, 500), "blue")
+    picture(site / "content/post/news/featured.jpg", (2000, 1000), "green")  # no layout here reads it
+
+    assert "generated 2, 0 unchanged" in run(monkeypatch, capsys, site)
+    first = outputs(site)
+    assert sorted(first) == ["static/derived/authors/ada/avatar-270x270.jpg", "static/derived/authors/ada/avatar-270x270.webp",
+                             "static/derived/event/talk/featured-720x.png", "static/derived/event/talk/featured-720x.webp"]
+    with Image.open(site / "static/derived/event/talk/featured-720x.png") as im:
+        assert im.size == (720, 360)
+
+    # hit: same bytes, outputs there -> nothing is re-encoded
+    assert "generated 0, 2 unchanged" in run(monkeypatch, capsys, site)
+    assert outputs(site) == first
+
+    # miss: new content under the same name, and a deleted output
+    picture(site / "content/authors/ada/avatar.jpg", (400, 300), "yellow")
+    (site / "static/derived/event/talk/featured-720x.webp").unlink()
+    assert "generated 2, 0 unchanged" in run(monkeypatch, capsys, site)
+
+    # a deleted source takes its outputs with it
+    (site / "content/event/talk/featured.png").unlink()
+    assert "outputs of 1 deleted sources removed" in run(monkeypatch, capsys, site)
+    assert sorted(outputs(site)) == ["static/derived/authors/ada/avatar-270x270.jpg", "static/derived/authors/ada/avatar-270x270.webp"]
@@ -0,0 +1,49 @@
+import random
+
+
+def author_records(S):
+    """Three authors whose lists share papers, with copies that tie on richness, title length and year."""
+    def rec(title, pdf="", venue="", month=1, authors=("Ada Lovelace",)):
+        return S.PubRecord(title=title, authors=list(authors), year=2024, month=month, day=1,
+                           pdf_url=pdf, publication=venue, bib={"title": title, "author": " and ".join(authors)})
+
+    return {
+        "a": [rec("Streaming Merge of Scholar Records", venue="ACL", month=3),
+              rec("Sparse Attention for Long Documents", pdf="https://x.org/a.pdf"),
+              rec("Only Author A Wrote This One")],
+        "b": [rec("Streaming Merge of Scholar Records", venue="EMNLP", month=5),  # ties with a's copy
+              rec("Sparse Attention for Long Documents: Extended", venue="TACL"),  # richer, overlapping title
+              rec("Only Author B Wrote This One", authors=("Alan Turing",))],
+        "c": [rec("Streaming Merge of Scholar Records", venue="ACL", month=3, authors=("Grace Hopper",)),
+              rec("Sparse Attention for Long Documents", pdf="https://y.org/a.pdf")],
+    }
+
+
+def bundles_of(S):
+    return {p.relative_to(S.OUT_DIR).as_posix(): p.read_text(encoding="utf-8")
+            for p in sorted(S.OUT_DIR.glob("*/index.md"))}
+
+
+def test_stream_result_does_not_depend_on_completion_order(load_scholar):
+    results = []
+    orders = [["a", "b", "c"], ["c", "b", "a"], ["b", "a", "c"]]
+    orders += [random.Random(seed).sample(["a", "b", "c"], 3) for seed in range(5)]
+    for n, order in enumerate(orders):
+        S = load_scholar(f"run{n}")
+        S.OUT_DIR.mkdir(parents=True)
+        per_author = author_records(S)
+        stream = S.BundleStream()
+        for sid in order:
+            stream.add(per_author[sid])
+        results.append(bundles_of(S))
+        assert len(results[-1]) == 4
+    assert all(r == results[0] for r in results[1:])
+
+
+def test_merge_pub_lists_winner_does_not_depend_on_order(scholar):
+    per_author = author_records(scholar)
+    flat = [r for recs in per_author.values() for r in recs]
+    want = sorted(scholar.record_json(r) for r in scholar.merge_pub_lists(flat))
+    for seed in range(10):
+        shuffled = random.Random(seed).sample(flat, len(flat))
+        assert sorted(scholar.record_json(r) for r in scholar.merge_pub_lists(shuffled)) == want
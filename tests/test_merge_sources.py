@@ -0,0 +1,51 @@
+import sys
+import hashlib
+import importlib
+
+import pdf_mirror
+
+PDF = "https://arxiv.org/pdf/2403.01234v2"
+
+
+def load_merge(load_scholar, records):
+    """merge_sources against a fresh scholar_IPs whose cache holds one author's records."""
+    S = load_scholar()
+    for rec in records(S):
+        S.append_author_cache("ada", rec)
+    sys.modules.pop("merge_sources", None)
+    return S, importlib.import_module("merge_sources")
+
+
+def records(S):
+    return [S.PubRecord("Sparse Attention for Long Documents", ["Ada Lovelace"], 2024, 3, 1, PDF, "arXiv preprint", {}),
+            S.PubRecord("Streaming Merge of Records", ["Ada Lovelace"], 2024, 5, 1, "", "ACL", {})]
+
+
+def run(M, monkeypatch, out):
+    monkeypatch.setattr(sys, "argv", ["merge_sources.py", "--out", str(out), "--min_year", "2020"])
+    M.main()
+
+
+def test_rerun_leaves_unchanged_bundles_alone(load_scholar, tmp_path, monkeypatch):
+    S, M = load_merge(load_scholar, records)
+    body = b"%PDF-1.5\nmirrored\n%%EOF\n"
+    m = pdf_mirror.PdfMirror(tmp_path / "pdf", "/pdf/")
+    sha = hashlib.sha256(body).hexdigest()
+    m.blob_path(sha).parent.mkdir(parents=True)
+    m.blob_path(sha).write_bytes(body)
+    m.urls[PDF] = {"sha256": sha, "size": len(body), "fetched": 0}
+    monkeypatch.setitem(pdf_mirror._OPENED, str(pdf_mirror.PDF_MIRROR_DIR), m)
+
+    out = tmp_path / "publication"
+    run(M, monkeypatch, out)
+    index = sorted(out.glob("*/index.md"))
+    assert len(index) == 2
+    sparse = next(p for p in index if p.parent.name.startswith("sparse"))
+    # the same text scholar_IPs.write_bundle writes, mirror path included
+    assert sparse.read_text(encoding="utf-8") == S.render_bundle(
+        "Sparse Attention for Long Documents", ["Ada Lovelace"], "2024-03-01T00:00:00Z", "arXiv preprint",
+        PDF, m.site_url(sha))
+    before = {p: p.stat().st_mtime_ns for p in index}
+
+    run(M, monkeypatch, out)
+    assert {p: p.stat().st_mtime_ns for p in sorted(out.glob("*/index.md"))} == before
@@ -0,0 +1,103 @@
+import hashlib
+
+import pdf_mirror
+from bundle_index import BundleIndex
+
+ARXIV_PDF = "https://arxiv.org/pdf/2403.01234v2"
+BODY = b"%PDF-1.5\nmirrored\n%%EOF\n"
+
+
+def mirror_with_copy(root):
+    """A mirror holding ARXIV_PDF, as if a run had downloaded it."""
+    m = pdf_mirror.PdfMirror(root, "/pdf/")
+    sha = hashlib.sha256(BODY).hexdigest()
+    m.blob_path(sha).parent.mkdir(parents=True)
+    m.blob_path(sha).write_bytes(BODY)
+    m.urls[ARXIV_PDF] = {"sha256": sha, "size": len(BODY), "fetched": 0}
+    return m
+
+
+def test_rewritten_bundle_keeps_its_bundle_index_keys(tmp_path):
+    root = tmp_path / "publication"
+    (root / "sparse-attention-2024").mkdir(parents=True)
+    index_md = root / "sparse-attention-2024" / "index.md"
+    index_md.write_text(f"---\ntitle: 'Sparse Attention'\nurl_pdf: '{ARXIV_PDF}'\n---\n", encoding="utf-8")
+    before = BundleIndex(root, tmp_path / "before.json").refresh()
+
+    m = mirror_with_copy(tmp_path / "pdf")
+    local = m.mirror([ARXIV_PDF], jobs=1)
+    assert pdf_mirror.rewrite_bundles(pdf_mirror.bundle_pdf_urls(root), local) == 1
+
+    after = BundleIndex(root, tmp_path / "after.json").refresh()
+    name = "sparse-attention-2024"
+    assert after.entries[name]["arxiv"] == before.entries[name]["arxiv"] == "2403.01234"
+    assert after.find(title="Another Title", url_pdf="https://arxiv.org/abs/2403.01234") == root / name
+    text = index_md.read_text(encoding="utf-8")
+    assert f"url_pdf: '{ARXIV_PDF}'" in text
+    assert f"url_pdf_local: '{local[ARXIV_PDF]}'" in text
+
+
+def test_write_bundle_adds_the_mirror_path(load_scholar, tmp_path, monkeypatch):
+    S = load_scholar()
+    monkeypatch.setitem(pdf_mirror._OPENED, str(pdf_mirror.PDF_MIRROR_DIR), mirror_with_copy(tmp_path / "pdf"))
+    dst = S.write_bundle("Sparse Attention", ["Ada Lovelace"], 2024, 3, 1, ARXIV_PDF, "arXiv preprint")
+    text = dst.read_text(encoding="utf-8")
+    assert f'url_pdf: "{ARXIV_PDF}"' in text
+    assert 'url_pdf_local: "/pdf/' in text
+    assert S.BUNDLES.find(url_pdf=ARXIV_PDF) == dst.parent
+
+
+def test_second_rewrite_leaves_bundles_untouched(tmp_path):
+    root = tmp_path / "publication"
+    (root / "sparse-attention-2024").mkdir(parents=True)
+    index_md = root / "sparse-attention-2024" / "index.md"
+    index_md.write_text(f"---\ntitle: 'Sparse Attention'\nurl_pdf: '{ARXIV_PDF}'\n---\n", encoding="utf-8")
+    local = mirror_with_copy(tmp_path / "pdf").mirror([ARXIV_PDF], jobs=1)
+    assert pdf_mirror.rewrite_bundles(pdf_mirror.bundle_pdf_urls(root), local) == 1
+    mtime = index_md.stat().st_mtime_ns
+    assert pdf_mirror.rewrite_bundles(pdf_mirror.bundle_pdf_urls(root), local) == 0
+    assert index_md.stat().st_mtime_ns == mtime
+
+
+class Response:
+    def __init__(self, status, headers=None, body=b""):
+        self.status_code = status
+        self.headers = headers or {}
+        self.body = body
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def iter_content(self, n):
+        yield from (self.body[i:i + n] for i in range(0, len(self.body), n))
+
+
+class Session:
+    def __init__(self, response):
+        self.response = response
+        self.calls = 0
+
+    def get(self, url, **kwargs):
+        self.calls += 1
+        return self.response
+
+
+def test_too_large_pdf_is_recorded_and_not_fetched_again(tmp_path, monkeypatch):
+    monkeypatch.setattr(pdf_mirror, "PDF_MIRROR_MAX_MB", 0.001)
+    m = pdf_mirror.PdfMirror(tmp_path / "pdf", "/pdf/")
+    session = Session(Response(200, {"Content-Length": "5000", "ETag": '"v1"'}, b"%PDF-" + b"x" * 4995))
+    rec = m.fetch(session, ARXIV_PDF)
+    assert rec["size"] == 5000 and rec["validator"] == '"v1"' and m.stats["too_large"] == 1
+    m.urls[ARXIV_PDF] = rec
+    assert m.rejected(ARXIV_PDF)
+    assert m.mirror([ARXIV_PDF]) == {}  # not asked for again
+    assert session.calls == 1
+
+
+def test_unexpected_range_reply_without_partial(tmp_path):
+    m = pdf_mirror.PdfMirror(tmp_path / "pdf", "/pdf/")
+    assert m.fetch(Session(Response(416)), ARXIV_PDF) is None
+    assert m.stats["failed"] == 1
@@ -0,0 +1,173 @@
+import os
+import sys
+import hashlib
+import subprocess
+
+import arxiv_index
+from conftest import SCRIPTS
+
+BUNDLE = """---
+title: "Some Paper"
+authors:
+  - "Ada Lovelace"
+date: '2023-01-01T00:00:00Z'
+publishDate: '2023-01-01T00:00:00Z'
+publication: "arXiv"
+url_pdf: "https://arxiv.org/pdf/2306.01234.pdf"
+---
+"""
+
+
+def build(path, date):
+    arxiv_index.build_index([("2306.01234", {"title": "Some Paper", "date": date})], path)
+
+
+def run(root, index):
+    env = dict(os.environ, ARXIV_INDEX=str(index))
+    subprocess.run([sys.executable, str(SCRIPTS / "post_google_scholar.py"), "--root", str(root), "--in-place",
+                    "--min_year", "2000", "--rules", "default,arxiv_metadata"],
+                   env=env, check=True, capture_output=True)
+
+
+def test_rebuilt_arxiv_index_redoes_bundles(tmp_path):
+    root = tmp_path / "publication"
+    (root / "some-paper-2023").mkdir(parents=True)
+    index_md = root / "some-paper-2023" / "index.md"
+    index_md.write_text(BUNDLE, encoding="utf-8")
+    index = tmp_path / "arxiv.idx"
+
+    build(index, "2023-06-05")
+    run(root, index)
+    assert "date: '2023-06-05T00:00:00Z'" in index_md.read_text(encoding="utf-8")
+
+    build(index, "2023-06-09")  # same size, new metadata
+    st = index.stat()
+    os.utime(index, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))  # coarse-mtime filesystems
+    run(root, index)
+    assert "date: '2023-06-09T00:00:00Z'" in index_md.read_text(encoding="utf-8")
+
+
+def make_tree(root, n=12):
+    """n bundles; the even ones link an arXiv PDF, so the default rules rewrite them."""
+    for k in range(n):
+        d = root / f"paper-{k:02d}-2023"
+        d.mkdir(parents=True)
+        url = f"https://arxiv.org/pdf/2306.{k:05d}.pdf" if k % 2 == 0 else f"https://example.org/{k}.pdf"
+        (d / "index.md").write_text(BUNDLE.replace("https://arxiv.org/pdf/2306.01234.pdf", url), encoding="utf-8")
+    return root
+
+
+def clean(monkeypatch, capsys, *argv):
+    import post_google_scholar
+    monkeypatch.setattr(sys, "argv", ["post_google_scholar.py", "--min_year", "2000", *map(str, argv)])
+    post_google_scholar.main()
+    return capsys.readouterr().out
+
+
+def manifest(out):
+    import json
+    saved = json.loads((out / ".post_google_scholar.json").read_text(encoding="utf-8"))
+    return {name: (e["sha1"], e["modified"]) for name, e in saved["bundles"].items()}
+
+
+def test_jobs_results_line_up_with_their_folders(tmp_path, monkeypatch, capsys):
+    root = make_tree(tmp_path / "publication")
+    runs = {}
+    for name, argv in {"serial": ["--jobs", "1"],
+                       "process": ["--jobs", "4", "--pool", "process"],
+                       "thread": ["--jobs", "4", "--pool", "thread"]}.items():
+        out = tmp_path / name
+        summary = clean(monkeypatch, capsys, "--root", root, "--out", out, "--link", "copy", *argv)
+        runs[name] = (summary, manifest(out), {p.parent.name: p.read_text(encoding="utf-8") for p in out.glob("*/index.md")})
+    assert runs["process"] == runs["serial"] == runs["thread"]
+    summary, entries, texts = runs["serial"]
+    assert "modified 6;" in summary
+    for name, (sha1, modified) in entries.items():
+        assert sha1 == hashlib.sha1((root / name / "index.md").read_bytes()).hexdigest()
+        assert modified == (int(name[6:8]) % 2 == 0)
+        assert ("publication: 'arXiv:2306." in texts[name]) == modified
+
+
+def placed(root, out, name):
+    src, dst = root / name / "index.md", out / name / "index.md"
+    return os.path.samefile(src, dst), src.read_bytes() == dst.read_bytes()
+
+
+def test_link_modes_place_unmodified_outputs(tmp_path, monkeypatch, capsys):
+    root = make_tree(tmp_path / "publication", n=2)
+    clean(monkeypatch, capsys, "--root", root, "--out", tmp_path / "copy", "--link", "copy")
+    assert placed(root, tmp_path / "copy", "paper-01-2023") == (False, True)
+
+    clean(monkeypatch, capsys, "--root", root, "--out", tmp_path / "hardlink", "--link", "hardlink")
+    assert placed(root, tmp_path / "hardlink", "paper-01-2023") == (True, True)
+    # a rewritten output is its own file, never written through a link into the source
+    assert placed(root, tmp_path / "hardlink", "paper-00-2023") == (False, False)
+    assert "publication: \"arXiv\"" in (root / "paper-00-2023" / "index.md").read_text(encoding="utf-8")
+
+    clean(monkeypatch, capsys, "--root", root, "--out", tmp_path / "auto", "--link", "auto")
+    assert placed(root, tmp_path / "auto", "paper-01-2023")[1]  # a reflink where the filesystem has them, else a hardlink
+
+
+def test_place_unmodified_falls_back_to_copy(tmp_path):
+    import post_google_scholar
+    src = tmp_path / "src.md"
+    src.write_text(BUNDLE, encoding="utf-8")
+    dst = tmp_path / "dst.md"
+    assert post_google_scholar.place_unmodified(src, dst, src.read_bytes(), "copy") == "copy"
+    assert dst.read_bytes() == src.read_bytes() and not os.path.samefile(src, dst)
+    assert not (tmp_path / "dst.md.tmp").exists()
+    dst.unlink()
+    assert post_google_scholar.place_unmodified(src, dst, src.read_bytes(), "hardlink") == "hardlink"
+    assert post_google_scholar.place_unmodified(src, dst, src.read_bytes(), "hardlink") == "hardlink"  # already linked
+
+
+def test_in_place_rewrites_only_what_changes(tmp_path, monkeypatch, capsys):
+    root = make_tree(tmp_path / "publication", n=2)
+    untouched = root / "paper-01-2023" / "index.md"
+    before = untouched.stat().st_mtime_ns
+    clean(monkeypatch, capsys, "--root", root, "--in-place")
+    assert "publication: 'arXiv:2306.00000'" in (root / "paper-00-2023" / "index.md").read_text(encoding="utf-8")
+    assert untouched.stat().st_mtime_ns == before
+    assert (root / ".post_google_scholar.json").exists()
+    assert not list(root.glob("*/*.tmp"))
+
+
+def test_manifest_skips_unchanged_folders_and_prunes_deleted_ones(tmp_path, monkeypatch, capsys):
+    root = make_tree(tmp_path / "publication", n=4)
+    out = tmp_path / "out"
+    args = ("--root", root, "--out", out, "--link", "copy")
+    assert "modified 2; 0 unchanged" in clean(monkeypatch, capsys, *args)
+
+    summary = clean(monkeypatch, capsys, *args)
+    assert "Scanned 4 index.md files" in summary and "modified 0; 4 unchanged since the last run skipped" in summary
+
+    src = root / "paper-03-2023" / "index.md"
+    src.write_text(src.read_text(encoding="utf-8").replace("Some Paper", "Some {LLM} Paper"), encoding="utf-8")
+    (root / "paper-02-2023" / "index.md").unlink()
+    (root / "paper-02-2023").rmdir()
+    summary = clean(monkeypatch, capsys, *args)
+    assert "modified 1; 2 unchanged since the last run skipped; 1 outputs of deleted sources pruned" in summary
+    assert "title: 'Some LLM Paper'" in (out / "paper-03-2023" / "index.md").read_text(encoding="utf-8")
+    assert not (out / "paper-02-2023").exists()
+    assert "paper-02-2023" not in manifest(out)
+
+    # filtered out by --min_year is not deleted: its entry and output stay
+    assert "0 outputs of deleted sources pruned" in clean(monkeypatch, capsys, *args, "--min_year", "2024")
+    assert (out / "paper-00-2023" / "index.md").exists() and "paper-00-2023" in manifest(out)
+
+
+def test_changed_rules_redo_every_folder(tmp_path, monkeypatch, capsys):
+    import post_google_scholar
+    root = make_tree(tmp_path / "publication", n=4)
+    args = ("--root", root, "--out", tmp_path / "out", "--link", "copy")
+    clean(monkeypatch, capsys, *args)
+    assert "4 unchanged since the last run skipped" in clean(monkeypatch, capsys, *args)
+
+    # another rule set
+    assert "0 unchanged since the last run skipped" in clean(monkeypatch, capsys, *args, "--rules", "default,normalize_venue")
+    assert "4 unchanged since the last run skipped" in clean(monkeypatch, capsys, *args, "--rules", "default,normalize_venue")
+    # a rule whose output changed (its version was bumped)
+    monkeypatch.setattr(post_google_scholar.TRANSFORMS["strip_title_braces"], "version", 2)
+    assert "0 unchanged since the last run skipped" in clean(monkeypatch, capsys, *args, "--rules", "default,normalize_venue")
+    # --full ignores the manifest
+    assert "0 unchanged since the last run skipped" in clean(monkeypatch, capsys, *args, "--rules", "default,normalize_venue", "--full")
@@ -0,0 +1,52 @@
+import sys
+import json
+
+import publications_data
+
+
+def bundle(root, name, title, extra="", body=""):
+    d = root / name
+    d.mkdir(parents=True)
+    fm = f'---\ntitle: "{title}"\nauthors:\n  - "Ada Lovelace"\ndate: \'2024-03-01T00:00:00Z\'\n' \
+         f'publication: "ACL"\nurl_pdf: ""\n{extra}---\n{body}'
+    (d / "index.md").write_text(fm if title else fm.replace(f'title: "{title}"\n', ""), encoding="utf-8")
+    return d
+
+
+def site(tmp_path):
+    root = tmp_path / "publication"
+    bundle(root, "plain-paper-2024", "Plain Paper")
+    bundle(root, "paper-with-code-2024", "Paper With Code", extra="url_code: 'https://github.com/x/y'\n")
+    bundle(root, "untitled-2024", "")                        # no title: no data entry at all
+    bundle(root, "duplicate-copy-2024", "Paper With Code")   # same paper as the page above
+    return root
+
+
+def cli(monkeypatch, *argv):
+    monkeypatch.setattr(sys, "argv", ["publications_data.py", *map(str, argv)])
+    publications_data.main()
+
+
+def test_prune_keeps_pages_and_bundles_without_their_own_entry(tmp_path, monkeypatch):
+    root = site(tmp_path)
+    out = tmp_path / "publications.json"
+    cli(monkeypatch, root, "--out", out, "--prune")
+
+    left = sorted(p.name for p in root.iterdir() if p.is_dir())
+    assert left == ["duplicate-copy-2024", "paper-with-code-2024", "untitled-2024"]
+    slugs = {e["slug"]: e["page"] for g in json.loads(out.read_text(encoding="utf-8")) for e in g["items"]}
+    assert slugs == {"plain-paper-2024": False, "paper-with-code-2024": True}
+    assert (root / "_index.md").exists()
+
+    # a second run still has the pruned paper, from the data file
+    cli(monkeypatch, root, "--out", out, "--prune")
+    slugs = {e["slug"] for g in json.loads(out.read_text(encoding="utf-8")) for e in g["items"]}
+    assert "plain-paper-2024" in slugs
+
+
+def test_prune_dry_run_touches_nothing(tmp_path, monkeypatch, capsys):
+    root = site(tmp_path)
+    before = sorted(p.relative_to(tmp_path).as_posix() for p in tmp_path.rglob("*"))
+    cli(monkeypatch, root, "--out", tmp_path / "publications.json", "--prune", "--dry-run")
+    assert sorted(p.relative_to(tmp_path).as_posix() for p in tmp_path.rglob("*")) == before
+    assert f"Would prune {root / 'plain-paper-2024'}" in capsys.readouterr().out
@@ -0,0 +1,42 @@
+import pytest
+
+
+class BlockedScholarly:
+    """Every request comes back as the block scholarly raises when Scholar shows a CAPTCHA."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def bibtex(self, pub):
+        self.calls += 1
+        raise Exception("MaxTriesExceededException: Cannot Fetch from Google Scholar.")
+
+
+def test_blocked_bibtex_trips_breaker(scholar, monkeypatch):
+    fake = BlockedScholarly()
+    monkeypatch.setattr(scholar, "scholarly", fake)
+    monkeypatch.setattr(scholar, "RATE", scholar.RateController(0.0, 0.0, trip_after=3, cooldown=600))
+    pub = {"bib": {"title": "A paper"}}
+
+    with pytest.raises(scholar.CircuitOpen):
+        for _ in range(3):
+            scholar.resolve_pub_date_ymd(year=2024, pub_obj=pub, bib=pub["bib"])
+    assert scholar.RATE.is_open
+    assert fake.calls == 3
+
+    # once open, the breaker stops the next bibtex request before it is sent
+    with pytest.raises(scholar.CircuitOpen):
+        scholar.resolve_pub_date_ymd(year=2024, pub_obj=pub, bib=pub["bib"])
+    assert fake.calls == 3
+
+
+def test_failed_bibtex_falls_back_to_arxiv_month(scholar, monkeypatch):
+    class Broken:
+        def bibtex(self, pub):
+            raise ValueError("no bibtex link on this page")
+
+    monkeypatch.setattr(scholar, "scholarly", Broken())
+    monkeypatch.setattr(scholar, "RATE", scholar.RateController(0.0, 0.0, trip_after=3, cooldown=600))
+    bib = {"title": "A paper", "journal": "arXiv preprint arXiv:2403.01234"}
+    assert scholar.resolve_pub_date_ymd(year=2024, pub_obj={"bib": bib}, bib=bib) == (2024, 3, 1)
+    assert not scholar.RATE.is_open
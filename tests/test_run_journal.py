@@ -0,0 +1,46 @@
+import pytest
+
+from conftest import Crash, FakeScholarly
+
+SID = "adaLovelace01"
+TITLES = [f"Paper Number {k} on Parsing" for k in range(5)]
+
+
+def crash_on(title):
+    def on_fill(t):
+        if t == title:
+            raise Crash(t)
+    return on_fill
+
+
+def crashed_run(fake_scholar):
+    """A run that dies while filling the third pub of SID."""
+    fake = FakeScholarly({SID: TITLES}, on_fill=crash_on(TITLES[2]))
+    S = fake_scholar(fake)
+    with pytest.raises(Crash):
+        S.main([SID])
+    assert fake.filled() == TITLES[:3]
+    return S
+
+
+def test_crash_mid_author_resumes_only_pending_pubs(fake_scholar):
+    crashed_run(fake_scholar)
+
+    fake = FakeScholarly({SID: TITLES})
+    S = fake_scholar(fake)
+    S.main([SID])
+    assert fake.count("search") == fake.count("list") == 0  # resumed from the journal, not re-listed
+    assert fake.filled() == TITLES[2:]                       # the pub in flight and the ones after it
+    assert len(list(S.OUT_DIR.glob("*/index.md"))) == 5
+    assert S.JOURNAL.is_done_fresh(SID)
+
+
+def test_stale_journal_relists_but_keeps_the_cached_pubs(fake_scholar):
+    crashed_run(fake_scholar)
+
+    fake = FakeScholarly({SID: TITLES})
+    S = fake_scholar(fake, JOURNAL_FRESH_HOURS="0")
+    S.main([SID])
+    assert fake.count("search") == 1 and fake.count("list") == 1
+    assert fake.filled() == TITLES[2:]  # the two pubs cached before the crash are not filled again
+    assert len(list(S.OUT_DIR.glob("*/index.md"))) == 5
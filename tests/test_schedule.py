@@ -0,0 +1,44 @@
+import time
+
+from conftest import FakeScholarly
+
+ADA, ALAN = "adaLovelace01", "alanTuring002"
+TITLES = [f"Paper Number {k} on Parsing" for k in range(5)]
+
+
+def test_never_finished_authors_go_first_then_oldest(scholar):
+    J = scholar.JOURNAL
+    J.authors = {"recentlyDone": {"status": "done", "done_at": 200.0},
+                 "doneLongAgo": {"status": "done", "done_at": 100.0},
+                 "crashedMidWay": {"status": "listed", "listed_at": 300.0, "pending": {}}}
+    ids = ["recentlyDone", "doneLongAgo", "neverSeenYet", "crashedMidWay"]
+    assert scholar.schedule_authors(ids) == ["neverSeenYet", "crashedMidWay", "doneLongAgo", "recentlyDone"]
+
+
+def test_budget_stop_leaves_the_journal_resumable(fake_scholar):
+    holder = {}
+
+    def out_of_time(title):
+        if title == TITLES[1]:
+            holder["S"].FETCH_DEADLINE = time.monotonic() - 1  # the cron slot is over
+
+    fake = FakeScholarly({ADA: TITLES, ALAN: ["Something Else Entirely"]}, on_fill=out_of_time)
+    S = holder["S"] = fake_scholar(fake)
+    S.main([ADA, ALAN, "--max-runtime", "3600"])
+    assert fake.filled() == TITLES[:2]
+    assert ("search", ALAN) not in fake.calls                # the rest wait for the next run
+    # the budget ran out in the middle of TITLES[1] (its bibtex call): only TITLES[0] is finished,
+    # and it is published
+    assert len(list(S.OUT_DIR.glob("*/index.md"))) == 1
+
+    J = S.RunJournal(S.JOURNAL.path)
+    J.load()
+    assert not J.is_done_fresh(ADA)
+    assert [p["bib"]["title"] for p in J.pending(ADA)] == TITLES[1:]
+
+    fake = FakeScholarly({ADA: TITLES, ALAN: ["Something Else Entirely"]})
+    S = fake_scholar(fake)
+    S.main([ADA, ALAN])
+    assert fake.filled() == TITLES[1:] + ["Something Else Entirely"]
+    assert ("search", ADA) not in fake.calls
+    assert len(list(S.OUT_DIR.glob("*/index.md"))) == 6
@@ -0,0 +1,32 @@
+from conftest import FakeScholarly, bundles_of
+
+IDS = [f"rosterAuthor{k:02d}" for k in range(12)]  # no shard of 3 is empty
+
+
+def profiles():
+    # every author shares a paper with the next one, so shards hold copies of the same paper
+    return {sid: [f"Shared Study {k} of Parsing", f"Shared Study {k + 1} of Parsing", f"Solo Work by {sid}"]
+            for k, sid in enumerate(IDS)}
+
+
+def test_shards_partition_the_roster(scholar):
+    for n in (1, 2, 3, 5):
+        shards = [scholar.roster(scholar.parse_args(IDS + ["--shard", f"{i}/{n}"])) for i in range(n)]
+        assert sorted(sid for shard in shards for sid in shard) == sorted(IDS)  # disjoint and complete
+        for i, shard in enumerate(shards):
+            assert all(scholar.shard_of(sid, n) == i for sid in shard)
+
+
+def test_merged_shards_equal_an_unsharded_run(fake_scholar):
+    S = fake_scholar(FakeScholarly(profiles()), "plain")
+    S.main(IDS)
+    want = bundles_of(S.OUT_DIR)
+    assert len(want) == len(IDS) + len(IDS) + 1
+
+    for i in range(3):
+        S = fake_scholar(FakeScholarly(profiles()), "sharded")
+        S.main(IDS + ["--shard", f"{i}/3"])
+        assert not list(S.OUT_DIR.glob("*/index.md"))  # shards only fetch
+    S = fake_scholar(FakeScholarly({}), "sharded")
+    S.main(IDS + ["--merge"])
+    assert bundles_of(S.OUT_DIR) == want
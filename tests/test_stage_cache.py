@@ -0,0 +1,17 @@
+import json
+
+
+def test_dry_run_keeps_stage_digests(load_scholar):
+    S = load_scholar(DRY_RUN="1")
+    path = S.CACHE_DIR / "stage_digests.json"
+    saved = {"authors": {"a": "old"}, "merged": "m", "bundles": {}}
+    path.write_text(json.dumps(saved), encoding="utf-8")
+
+    stages = S.StageCache(path)
+    rec = S.PubRecord("A Changed Paper", ["Ada Lovelace"], 2024, 1, 1, "", "ACL", {})
+    stages.add("a", [rec])  # differs from the saved digest: merge starts
+    stages.finish()
+
+    assert stages.stream is not None
+    assert json.loads(path.read_text(encoding="utf-8")) == saved
+    assert not list(S.OUT_DIR.glob("*/index.md"))